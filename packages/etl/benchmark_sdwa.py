@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the SDWA ETL: synthetic data generator, per-phase ETL
+timings and read-query latencies
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import platform
+import random
+import re
+import sqlite3
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from etl_sdwa_to_sqlite import (
+    SDWAETLProcessor, CODE_COLUMN_VALUE_TYPES, DESCRIPTION_COLUMNS, NON_DATE_COLUMNS, read_query_file
+)
+from index_advisor import sample_parameters
+
+logger = logging.getLogger(__name__)
+
+# Approximate Georgia Q1 2025 row counts; scale factors multiply these
+BASE_ROW_COUNTS = {
+    'SDWA_PUB_WATER_SYSTEMS': 5647,
+    'SDWA_FACILITIES': 22535,
+    'SDWA_VIOLATIONS_ENFORCEMENT': 60000,
+    'SDWA_LCR_SAMPLES': 19812,
+    'SDWA_SITE_VISITS': 17438,
+    'SDWA_GEOGRAPHIC_AREAS': 7836,
+    'SDWA_SERVICE_AREAS': 5175,
+    'SDWA_EVENTS_MILESTONES': 5656,
+    'SDWA_PN_VIOLATION_ASSOC': 1172,
+}
+
+# Primacy agencies used as scale grows past one state
+STATE_CODES = [
+    'GA', 'AL', 'FL', 'SC', 'NC', 'TN', 'MS', 'KY', 'VA', 'TX',
+    'CA', 'NY', 'PA', 'OH', 'IL', 'MI', 'WA', 'OR', 'AZ', 'CO',
+]
+
+COUNTIES = [
+    'Appling', 'Bibb', 'Chatham', 'Clarke', 'Cobb', 'DeKalb', 'Fulton', 'Gwinnett',
+    'Hall', 'Henry', 'Muscogee', 'Richmond', 'Cherokee', 'Forsyth', 'Paulding',
+]
+
+NAME_WORDS = [
+    'CITY', 'COUNTY', 'WATER', 'AUTHORITY', 'MOBILE', 'HOME', 'PARK', 'SCHOOL',
+    'CHURCH', 'LAKE', 'RIVER', 'CREEK', 'HILLS', 'ESTATES', 'VILLAGE', 'CAMP',
+    'ATLANTA', 'MACON', 'AUGUSTA', 'SAVANNAH', 'ATHENS', 'PINE', 'OAK', 'MAPLE',
+]
+
+# Code values per column; reference_codes() writes them to SDWA_REF_CODE_VALUES
+CODE_VALUES = {
+    'PWS_TYPE_CODE': ['CWS', 'NTNCWS', 'TNCWS'],
+    'PWS_ACTIVITY_CODE': ['A', 'I', 'N'],
+    'OWNER_TYPE_CODE': ['F', 'L', 'M', 'N', 'P', 'S'],
+    'GW_SW_CODE': ['GW', 'SW'],
+    'PRIMARY_SOURCE_CODE': ['GW', 'SW', 'GWP', 'SWP'],
+    'VIOLATION_CODE': ['01', '02', '03', '1A', '22', '23', '46', '71', '75'],
+    'VIOLATION_CATEGORY_CODE': ['MCL', 'MR', 'TT', 'MON', 'RPT', 'Other'],
+    'CONTAMINANT_CODE': ['1040', '2456', '2950', '3100', '5000', '7000', '8000'],
+    'RULE_FAMILY_CODE': ['100', '200', '300', '400', '500'],
+    'ENFORCEMENT_ACTION_TYPE_CODE': ['SFJ', 'SFL', 'SIA', 'EOX', 'SOX'],
+    'FACILITY_TYPE_CODE': ['DS', 'WL', 'TP', 'IN', 'SS', 'ST'],
+    'VISIT_REASON_CODE': ['SNSV', 'CMPL', 'OTHR', 'SNTR'],
+    'SERVICE_AREA_TYPE_CODE': ['MU', 'RS', 'SC', 'MP', 'OA'],
+    'EVENT_MILESTONE_CODE': ['DEEM', 'ACT', 'COMP'],
+    'EVENT_REASON_CODE': ['B1', 'B2', 'CC', 'LI'],
+}
+
+VIOLATION_STATUSES = ['Resolved', 'Archived', 'Addressed', 'Unaddressed']
+ENF_ACTION_CATEGORIES = ['Formal', 'Informal', 'Resolving']
+EVAL_CODES = ['N', 'M', 'R', 'S', 'X', 'Z']
+
+# Lead and copper 90th percentile action levels (mg/L)
+LCR_CONTAMINANTS = {'PB90': 0.015, 'CU90': 1.3}
+
+GEO_AREA_TYPES = ['CN', 'CN', 'CT', 'ZC']
+
+
+def reference_codes():
+    """Every code the generator writes, as {VALUE_TYPE: [codes]}
+
+    Keyed by the VALUE_TYPE the ETL checks each column against, so a
+    generated build quarantines no row as an unknown code.
+    """
+    codes = {}
+
+    def add(value_type, values):
+        known = codes.setdefault(value_type, [])
+        known.extend(value for value in values if value not in known)
+
+    for column, values in CODE_VALUES.items():
+        add(CODE_COLUMN_VALUE_TYPES.get(column, column), values)
+    add('CONTAMINANT_CODE', LCR_CONTAMINANTS)
+    add('SITE_VISIT_EVAL_TYPE_CODE', EVAL_CODES)
+    add('PRIMACY_AGENCY_CODE', STATE_CODES)
+    add('EPA_REGION', ['04'])
+    add('AGENCY_TYPE_CODE', ['ST'])
+    add('AREA_TYPE_CODE', GEO_AREA_TYPES)
+    add('UNIT_OF_MEASURE', ['mg/L'])
+    return codes
+
+
+def table_column_types(schema_sql: str):
+    """Return (name, type) for each SDWIS column of a CREATE TABLE statement
+
+    Description columns the ETL derives while loading are left out, so the
+    generated files have the same columns as the SDWIS export.
+    """
+    derived = {f"{column}_DESC" for column in DESCRIPTION_COLUMNS}
+    return [(name, kind) for name, kind in re.findall(r'^\s*(\w+)\s+(TEXT|INTEGER|REAL)\b', schema_sql, re.MULTILINE)
+            if name not in derived]
+
+
+class SyntheticSDWAGenerator:
+    """Generate schema-faithful synthetic SDWIS CSV files
+
+    Child tables only reference systems written to SDWA_PUB_WATER_SYSTEMS,
+    and primary keys are unique per table, so the output loads cleanly with
+    foreign keys enforced.
+    """
+
+    def __init__(self, scale: float = 1.0, seed: int = 42, quarter: str = '2025Q1'):
+        self.scale = scale
+        self.quarter = quarter
+        self.random = random.Random(seed)
+        processor = SDWAETLProcessor('.', ':memory:')
+        self.column_types = {
+            table_name: table_column_types(schema_sql)
+            for table_name, schema_sql in processor.table_schemas.items()
+        }
+        # Split files carry their child table's columns, as in the SDWIS export
+        for table_name, split in processor.split_tables.items():
+            child_types = dict(self.column_types[split['child_table']])
+            self.column_types[table_name] += [(column, child_types[column]) for column in split['child_columns']]
+        self.pwsids = []
+
+        # Pre-rendered dates, cheaper than formatting one per value
+        start = date(1980, 1, 1)
+        self.dates = [(start + timedelta(days=d)).strftime('%m/%d/%Y') for d in range(0, 16000, 3)]
+
+    def row_count(self, table_name: str):
+        return max(1, int(BASE_ROW_COUNTS[table_name] * self.scale))
+
+    def generate(self, out_dir: Path):
+        """Write all ten CSV files and return their row counts"""
+        out_dir.mkdir(parents=True, exist_ok=True)
+        counts = {}
+        writers = [
+            ('SDWA_REF_CODE_VALUES', self.ref_code_rows),
+            ('SDWA_PUB_WATER_SYSTEMS', self.water_system_rows),
+            ('SDWA_FACILITIES', self.facility_rows),
+            ('SDWA_VIOLATIONS_ENFORCEMENT', self.violation_rows),
+            ('SDWA_LCR_SAMPLES', self.lcr_rows),
+            ('SDWA_SITE_VISITS', self.site_visit_rows),
+            ('SDWA_GEOGRAPHIC_AREAS', self.geographic_rows),
+            ('SDWA_SERVICE_AREAS', self.service_area_rows),
+            ('SDWA_EVENTS_MILESTONES', self.event_rows),
+            ('SDWA_PN_VIOLATION_ASSOC', self.pn_rows),
+        ]
+        for table_name, rows in writers:
+            columns = [column for column, _ in self.column_types[table_name]]
+            count = 0
+            with open(out_dir / f"{table_name}.csv", 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                for row in rows():
+                    writer.writerow([row.get(column, '') for column in columns])
+                    count += 1
+            counts[table_name] = count
+            logger.info(f"Generated {count:,} rows for {table_name}")
+        return counts
+
+    def fill(self, table_name: str, row: dict):
+        """Fill unset columns with plausible values by column name and type"""
+        rnd = self.random
+        for column, kind in self.column_types[table_name]:
+            if column in row:
+                continue
+            if column.endswith('_DATE') and column not in NON_DATE_COLUMNS:
+                row[column] = rnd.choice(self.dates) if rnd.random() < 0.7 else ''
+            elif column in CODE_VALUES:
+                row[column] = rnd.choice(CODE_VALUES[column])
+            elif column.endswith('_IND'):
+                row[column] = rnd.choice('YN')
+            elif column.endswith('_EVAL_CODE'):
+                row[column] = rnd.choice(EVAL_CODES)
+            elif kind == 'INTEGER':
+                row[column] = rnd.randint(1, 4)
+            elif kind == 'REAL':
+                row[column] = round(rnd.random() * 10, 4) if rnd.random() < 0.5 else ''
+        return row
+
+    def pick_pwsid(self):
+        return self.random.choice(self.pwsids)
+
+    def ref_code_rows(self):
+        for value_type, codes in reference_codes().items():
+            for code in codes:
+                yield {'VALUE_TYPE': value_type, 'VALUE_CODE': code,
+                       'VALUE_DESCRIPTION': f"{value_type.replace('_', ' ').title()} {code}"}
+
+    def water_system_rows(self):
+        rnd = self.random
+        count = self.row_count('SDWA_PUB_WATER_SYSTEMS')
+        per_state = BASE_ROW_COUNTS['SDWA_PUB_WATER_SYSTEMS']
+        for i in range(count):
+            state = STATE_CODES[(i // per_state) % len(STATE_CODES)]
+            pwsid = f"{state}{i:07d}"
+            self.pwsids.append(pwsid)
+            yield self.fill('SDWA_PUB_WATER_SYSTEMS', {
+                'SUBMISSIONYEARQUARTER': self.quarter,
+                'PWSID': pwsid,
+                'PWS_NAME': ' '.join(rnd.sample(NAME_WORDS, 3)),
+                'PRIMACY_AGENCY_CODE': state,
+                'STATE_CODE': state,
+                'EPA_REGION': '04',
+                'SEASON_BEGIN_DATE': '',
+                'SEASON_END_DATE': '',
+                'POPULATION_SERVED_COUNT': int(rnd.lognormvariate(5, 2)) + 25,
+                'SERVICE_CONNECTIONS_COUNT': rnd.randint(1, 5000),
+                'CITY_NAME': rnd.choice(NAME_WORDS),
+                'ZIP_CODE': f"{rnd.randint(30000, 31999)}",
+                'ORG_NAME': ' '.join(rnd.sample(NAME_WORDS, 2)),
+            })
+
+    def facility_rows(self):
+        for i in range(self.row_count('SDWA_FACILITIES')):
+            yield self.fill('SDWA_FACILITIES', {
+                'SUBMISSIONYEARQUARTER': self.quarter,
+                'PWSID': self.pick_pwsid(),
+                'FACILITY_ID': str(i),
+                'FACILITY_NAME': ' '.join(self.random.sample(NAME_WORDS, 2)),
+                'SELLER_PWSID': '',
+            })
+
+    def violation_rows(self):
+        """Violations with zero to three enforcement actions each
+
+        Like the SDWIS export, a violation with several enforcement actions
+        is repeated once per action.
+        """
+        rnd = self.random
+        target = self.row_count('SDWA_VIOLATIONS_ENFORCEMENT')
+        written = 0
+        violation_id = 0
+        while written < target:
+            violation_id += 1
+            violation = self.fill('SDWA_VIOLATIONS_ENFORCEMENT', {
+                'SUBMISSIONYEARQUARTER': self.quarter,
+                'PWSID': self.pick_pwsid(),
+                'VIOLATION_ID': str(violation_id),
+                'VIOLATION_STATUS': rnd.choice(VIOLATION_STATUSES),
+                'ENFORCEMENT_ID': '',
+            })
+            actions = rnd.choice([0, 1, 1, 2, 3])
+            if not actions:
+                yield violation
+                written += 1
+            for action in range(actions):
+                row = dict(violation)
+                row['ENFORCEMENT_ID'] = f"{violation_id}{action:02d}"
+                row['ENF_ACTION_CATEGORY'] = rnd.choice(ENF_ACTION_CATEGORIES)
+                row['ENFORCEMENT_DATE'] = rnd.choice(self.dates)
+                yield row
+                written += 1
+
+    def lcr_rows(self):
+        rnd = self.random
+        for i in range(self.row_count('SDWA_LCR_SAMPLES')):
+            contaminant = rnd.choice(list(LCR_CONTAMINANTS))
+            action_level = LCR_CONTAMINANTS[contaminant]
+            yield self.fill('SDWA_LCR_SAMPLES', {
+                'SUBMISSIONYEARQUARTER': self.quarter,
+                'PWSID': self.pick_pwsid(),
+                'SAMPLE_ID': f"S{i}",
+                'SAR_ID': i,
+                'CONTAMINANT_CODE': contaminant,
+                'SAMPLE_MEASURE': round(rnd.expovariate(3 / action_level), 4),
+                'UNIT_OF_MEASURE': 'mg/L',
+                'RESULT_SIGN_CODE': '',
+            })
+
+    def site_visit_rows(self):
+        for i in range(self.row_count('SDWA_SITE_VISITS')):
+            yield self.fill('SDWA_SITE_VISITS', {
+                'SUBMISSIONYEARQUARTER': self.quarter,
+                'PWSID': self.pick_pwsid(),
+                'VISIT_ID': str(i),
+                'VISIT_DATE': self.random.choice(self.dates),
+                'AGENCY_TYPE_CODE': 'ST',
+                'VISIT_COMMENTS': '',
+            })
+
+    def geographic_rows(self):
+        rnd = self.random
+        for i in range(self.row_count('SDWA_GEOGRAPHIC_AREAS')):
+            area_type = rnd.choice(GEO_AREA_TYPES)
+            yield {
+                'SUBMISSIONYEARQUARTER': self.quarter,
+                'PWSID': self.pick_pwsid(),
+                'GEO_ID': str(i),
+                'AREA_TYPE_CODE': area_type,
+                'COUNTY_SERVED': rnd.choice(COUNTIES) if area_type == 'CN' else '',
+                'CITY_SERVED': rnd.choice(NAME_WORDS) if area_type == 'CT' else '',
+                'ZIP_CODE_SERVED': f"{rnd.randint(30000, 31999)}" if area_type == 'ZC' else '',
+                'LAST_REPORTED_DATE': rnd.choice(self.dates),
+            }
+
+    def service_area_rows(self):
+        # One row per system at most (keyed on quarter and PWSID)
+        count = min(self.row_count('SDWA_SERVICE_AREAS'), len(self.pwsids))
+        for pwsid in self.random.sample(self.pwsids, count):
+            yield self.fill('SDWA_SERVICE_AREAS', {
+                'SUBMISSIONYEARQUARTER': self.quarter,
+                'PWSID': pwsid,
+            })
+
+    def event_rows(self):
+        for i in range(self.row_count('SDWA_EVENTS_MILESTONES')):
+            yield self.fill('SDWA_EVENTS_MILESTONES', {
+                'SUBMISSIONYEARQUARTER': self.quarter,
+                'PWSID': self.pick_pwsid(),
+                'EVENT_SCHEDULE_ID': str(i),
+                'EVENT_COMMENTS_TEXT': '',
+            })
+
+    def pn_rows(self):
+        for i in range(self.row_count('SDWA_PN_VIOLATION_ASSOC')):
+            yield self.fill('SDWA_PN_VIOLATION_ASSOC', {
+                'SUBMISSIONYEARQUARTER': self.quarter,
+                'PWSID': self.pick_pwsid(),
+                'PN_VIOLATION_ID': str(i),
+                'RELATED_VIOLATION_ID': str(self.random.randint(1, 1000)),
+            })
+
+
+def time_etl_phases(processor: SDWAETLProcessor):
+    """Run the ETL, timing each processor phase
+
+    Phase methods are wrapped on the instance, so run_etl executes exactly
+    as in production. Table loads are keyed by table name.
+    """
+    timings = {}
+
+    def timed(name, method):
+        def wrapper(*args, **kwargs):
+            key = name
+            if name == 'load_csv_file':
+                key = f"load:{args[1]}"
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                timings[key] = timings.get(key, 0.0) + time.perf_counter() - started
+        return wrapper
+
+    for name in ['create_schema', 'load_csv_file', 'load_csv_files_parallel', 'load_csv_incremental',
+                 'create_indexes', 'check_foreign_keys', 'build_aggregates', 'build_map_documents',
+                 'build_lcr_analytics', 'build_documents', 'build_search_index', 'advise_indexes',
+                 'validate_data', 'finalize_generation']:
+        if hasattr(processor, name):
+            setattr(processor, name, timed(name, getattr(processor, name)))
+
+    started = time.perf_counter()
+    processor.run_etl()
+    timings['total'] = time.perf_counter() - started
+    return timings
+
+
+def time_queries(db_path: str, queries: list, params: dict, repeat: int):
+    """Time each canonical query; returns latency stats in milliseconds"""
+    results = {}
+    conn = sqlite3.connect(db_path)
+    try:
+        for name, sql in queries:
+            samples = []
+            rows = 0
+            for _ in range(repeat):
+                started = time.perf_counter()
+                rows = len(conn.execute(sql, params).fetchall())
+                samples.append((time.perf_counter() - started) * 1000)
+            samples.sort()
+            results[name] = {
+                'rows': rows,
+                'median_ms': round(statistics.median(samples), 4),
+                'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+                'min_ms': round(samples[0], 4),
+            }
+            logger.info(f"  {name}: median {results[name]['median_ms']:.3f} ms ({rows:,} rows)")
+    finally:
+        conn.close()
+    return results
+
+
+def run_benchmark(scale: float, work_dir: Path, queries: list, repeat: int, seed: int,
+                  processor_options: dict, quarter: str = '2025Q1'):
+    """Generate data at one scale factor, load it and time reads"""
+    scale_dir = work_dir / f"scale_{scale:g}"
+    data_dir = scale_dir / 'data'
+    db_path = scale_dir / 'sdwa_benchmark.db'
+
+    logger.info(f"Generating synthetic data at scale {scale:g}...")
+    started = time.perf_counter()
+    row_counts = SyntheticSDWAGenerator(scale, seed, quarter).generate(data_dir)
+    generate_seconds = time.perf_counter() - started
+    input_bytes = sum(path.stat().st_size for path in data_dir.glob('*.csv'))
+
+    if db_path.exists():
+        db_path.unlink()
+    logger.info(f"Loading scale {scale:g} into {db_path}...")
+    processor = SDWAETLProcessor(str(data_dir), str(db_path), **processor_options)
+    phases = time_etl_phases(processor)
+
+    logger.info("Timing read queries...")
+    conn = sqlite3.connect(str(db_path))
+    params = sample_parameters(conn, quarter)
+    conn.close()
+    query_results = time_queries(str(db_path), queries, params, repeat)
+
+    return {
+        'scale': scale,
+        'row_counts': row_counts,
+        'input_bytes': input_bytes,
+        'database_bytes': db_path.stat().st_size,
+        'generate_seconds': round(generate_seconds, 4),
+        'phases_seconds': {name: round(seconds, 4) for name, seconds in phases.items()},
+        'rows_per_second': round(sum(row_counts.values()) / phases['total'], 1),
+        'queries': query_results,
+        'query_parameters': params,
+        'etl_metrics': processor.metrics.report(),
+    }
+
+
+def compare_results(current: dict, baseline: dict):
+    """Log phase and query changes relative to a previous results file"""
+    baseline_runs = {run['scale']: run for run in baseline.get('runs', [])}
+    for run in current['runs']:
+        previous = baseline_runs.get(run['scale'])
+        if not previous:
+            continue
+        logger.info(f"Scale {run['scale']:g} vs baseline:")
+        for name, seconds in run['phases_seconds'].items():
+            before = previous['phases_seconds'].get(name)
+            if before:
+                logger.info(f"  {name}: {before:.3f}s -> {seconds:.3f}s ({(seconds / before - 1) * 100:+.1f}%)")
+        for name, stats in run['queries'].items():
+            before = previous['queries'].get(name)
+            if before and before['median_ms']:
+                change = (stats['median_ms'] / before['median_ms'] - 1) * 100
+                logger.info(f"  {name}: {before['median_ms']:.3f} ms -> {stats['median_ms']:.3f} ms ({change:+.1f}%)")
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Benchmark the SDWA ETL on synthetic data')
+    parser.add_argument('--scale', type=float, action='append',
+                        help='Scale factor relative to Georgia (repeatable; default: 1)')
+    parser.add_argument('--work-dir', type=str, default='./benchmark',
+                        help='Directory for generated CSVs and databases (default: ./benchmark)')
+    parser.add_argument('--output', type=str, default='benchmark_results.json',
+                        help='Results file (default: benchmark_results.json)')
+    parser.add_argument('--queries', type=str, default=str(Path(__file__).parent / 'canonical_queries.sql'),
+                        help='SQL file of named read queries (default: canonical_queries.sql)')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='Executions per read query (default: 20)')
+    parser.add_argument('--seed', type=int, default=42,
+                        help='Random seed for the generator (default: 42)')
+    parser.add_argument('--baseline', type=str,
+                        help='Previous results file to compare against')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='ETL parser processes (default: 1)')
+    parser.add_argument('--bulk', action='store_true',
+                        help='Benchmark the bulk-load mode')
+
+    args = parser.parse_args()
+    logging.getLogger('etl_sdwa_to_sqlite').setLevel(logging.WARNING)
+
+    queries = read_query_file(Path(args.queries))
+    processor_options = {'workers': args.workers, 'bulk': args.bulk}
+
+    runs = []
+    for scale in args.scale or [1.0]:
+        runs.append(run_benchmark(scale, Path(args.work_dir), queries, args.repeat, args.seed,
+                                  processor_options))
+
+    results = {
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'options': processor_options,
+        'runs': runs,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            compare_results(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+-- Canonical read queries modeled on packages/web/src/db/queries.ts
+--
+-- Each query starts with a "-- name:" line. Parameters use SQLite named
+-- placeholders (:pwsid, :quarter, :county, :violation_id, :term,
+-- :value_type, :value_code) and are filled with sample values taken from
+-- the loaded database.
+
+-- name: water_system_by_id
+SELECT * FROM SDWA_PUB_WATER_SYSTEMS
+WHERE PWSID = :pwsid AND SUBMISSIONYEARQUARTER = :quarter;
+
+-- name: violations_by_pwsid
+SELECT * FROM SDWA_VIOLATIONS_ENFORCEMENT
+WHERE PWSID = :pwsid AND SUBMISSIONYEARQUARTER = :quarter
+ORDER BY NON_COMPL_PER_BEGIN_DATE DESC;
+
+-- name: unaddressed_violations
+SELECT v.PWSID, p.PWS_NAME, v.VIOLATION_ID, v.VIOLATION_CODE, v.VIOLATION_STATUS,
+       v.CONTAMINANT_CODE, v.IS_HEALTH_BASED_IND, v.NON_COMPL_PER_BEGIN_DATE
+FROM SDWA_VIOLATIONS_ENFORCEMENT v
+LEFT JOIN SDWA_PUB_WATER_SYSTEMS p
+    ON v.PWSID = p.PWSID AND v.SUBMISSIONYEARQUARTER = p.SUBMISSIONYEARQUARTER
+WHERE v.VIOLATION_STATUS = 'Unaddressed'
+ORDER BY v.NON_COMPL_PER_BEGIN_DATE DESC;
+
+-- name: facilities_by_pwsid
+SELECT * FROM SDWA_FACILITIES
+WHERE PWSID = :pwsid AND SUBMISSIONYEARQUARTER = :quarter;
+
+-- name: lcr_samples_by_pwsid
+SELECT * FROM SDWA_LCR_SAMPLES
+WHERE PWSID = :pwsid AND SUBMISSIONYEARQUARTER = :quarter
+ORDER BY SAMPLING_END_DATE DESC;
+
+-- name: recent_site_visits
+SELECT s.VISIT_ID, s.PWSID, p.PWS_NAME, s.VISIT_DATE, s.VISIT_REASON_CODE,
+       s.MANAGEMENT_OPS_EVAL_CODE, s.TREATMENT_EVAL_CODE, s.DISTRIBUTION_EVAL_CODE
+FROM SDWA_SITE_VISITS s
+LEFT JOIN SDWA_PUB_WATER_SYSTEMS p
+    ON s.PWSID = p.PWSID AND s.SUBMISSIONYEARQUARTER = p.SUBMISSIONYEARQUARTER
+WHERE s.SUBMISSIONYEARQUARTER = :quarter
+ORDER BY s.VISIT_DATE DESC
+LIMIT 100;
+
+-- name: water_systems_by_county
+SELECT p.PWSID, p.PWS_NAME, p.POPULATION_SERVED_COUNT, p.PWS_TYPE_CODE, p.PWS_ACTIVITY_CODE
+FROM SDWA_PUB_WATER_SYSTEMS p
+WHERE p.SUBMISSIONYEARQUARTER = :quarter
+    AND EXISTS (
+        SELECT 1 FROM SDWA_GEOGRAPHIC_AREAS g
+        WHERE g.SUBMISSIONYEARQUARTER = p.SUBMISSIONYEARQUARTER AND g.PWSID = p.PWSID
+            AND g.COUNTY_SERVED = :county
+    );
+
+-- name: code_description
+SELECT VALUE_DESCRIPTION FROM SDWA_REF_CODE_VALUES
+WHERE VALUE_TYPE = :value_type AND VALUE_CODE = :value_code;
+
+-- name: violation_stats
+SELECT COUNT(*),
+       SUM(CASE WHEN IS_HEALTH_BASED_IND = 'Y' THEN 1 ELSE 0 END),
+       SUM(CASE WHEN VIOLATION_STATUS = 'Unaddressed' THEN 1 ELSE 0 END),
+       SUM(CASE WHEN VIOLATION_STATUS = 'Resolved' THEN 1 ELSE 0 END)
+FROM SDWA_VIOLATIONS_ENFORCEMENT
+WHERE SUBMISSIONYEARQUARTER = :quarter;
+
+-- name: search_water_systems
+SELECT * FROM SDWA_PUB_WATER_SYSTEMS
+WHERE PWS_NAME LIKE '%' || :term || '%' AND SUBMISSIONYEARQUARTER = :quarter
+LIMIT 50;
+
+-- name: violations_filtered
+SELECT v.VIOLATION_ID, v.PWSID, p.PWS_NAME, v.VIOLATION_CODE, v.VIOLATION_CATEGORY_CODE,
+       v.CONTAMINANT_CODE, v.IS_HEALTH_BASED_IND, v.VIOLATION_STATUS,
+       v.COMPL_PER_BEGIN_DATE, v.COMPL_PER_END_DATE, v.NON_COMPL_PER_BEGIN_DATE,
+       (SELECT e.ENFORCEMENT_DATE FROM SDWA_ENFORCEMENT_ACTIONS e
+        WHERE e.SUBMISSIONYEARQUARTER = v.SUBMISSIONYEARQUARTER AND e.PWSID = v.PWSID
+            AND e.VIOLATION_ID = v.VIOLATION_ID
+        ORDER BY e.ENFORCEMENT_DATE DESC, e.ENFORCEMENT_ID DESC LIMIT 1) AS ENFORCEMENT_DATE,
+       (SELECT e.ENFORCEMENT_ACTION_TYPE_CODE FROM SDWA_ENFORCEMENT_ACTIONS e
+        WHERE e.SUBMISSIONYEARQUARTER = v.SUBMISSIONYEARQUARTER AND e.PWSID = v.PWSID
+            AND e.VIOLATION_ID = v.VIOLATION_ID
+        ORDER BY e.ENFORCEMENT_DATE DESC, e.ENFORCEMENT_ID DESC LIMIT 1) AS ENFORCEMENT_ACTION_TYPE_CODE
+FROM SDWA_VIOLATIONS_ENFORCEMENT v
+LEFT JOIN SDWA_PUB_WATER_SYSTEMS p
+    ON v.PWSID = p.PWSID AND v.SUBMISSIONYEARQUARTER = p.SUBMISSIONYEARQUARTER
+WHERE v.SUBMISSIONYEARQUARTER = :quarter
+    AND v.VIOLATION_STATUS = 'Unaddressed'
+    AND v.IS_HEALTH_BASED_IND = 'Y'
+ORDER BY v.NON_COMPL_PER_BEGIN_DATE DESC;
+
+-- name: enforcements_by_violation
+SELECT ENFORCEMENT_ID, ENFORCEMENT_DATE, ENFORCEMENT_ACTION_TYPE_CODE,
+       ENF_ACTION_CATEGORY, ENF_ORIGINATOR_CODE
+FROM SDWA_ENFORCEMENT_ACTIONS
+WHERE PWSID = :pwsid AND VIOLATION_ID = :violation_id AND SUBMISSIONYEARQUARTER = :quarter
+ORDER BY ENFORCEMENT_DATE;
+
+-- name: all_site_visits
+SELECT s.VISIT_ID, s.PWSID, p.PWS_NAME, s.VISIT_DATE, s.VISIT_REASON_CODE, s.AGENCY_TYPE_CODE
+FROM SDWA_SITE_VISITS s
+LEFT JOIN SDWA_PUB_WATER_SYSTEMS p
+    ON s.PWSID = p.PWSID AND s.SUBMISSIONYEARQUARTER = p.SUBMISSIONYEARQUARTER
+WHERE s.SUBMISSIONYEARQUARTER = :quarter
+ORDER BY s.VISIT_DATE DESC;
+
+-- name: geographic_areas_by_pwsid
+SELECT * FROM SDWA_GEOGRAPHIC_AREAS
+WHERE PWSID = :pwsid AND SUBMISSIONYEARQUARTER = :quarter;
+
+-- name: all_water_systems
+SELECT * FROM SDWA_PUB_WATER_SYSTEMS
+WHERE SUBMISSIONYEARQUARTER = :quarter
+ORDER BY PWS_NAME;
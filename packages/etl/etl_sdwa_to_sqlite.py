@@ -4,13 +4,39 @@ ETL tool to load SDWA CSV data into SQLite database
 """
 
 import sqlite3
+import bz2
 import csv
+import gzip
+import hashlib
+import io
+import json
+import lzma
 import os
+import re
 import sys
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import groupby, islice
 import logging
 from pathlib import Path
 import argparse
+import cProfile
+import pstats
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+try:
+    import numpy as np
+except ImportError:  # Optional: LCR analytics fall back to pure Python
+    np = None
 
 # Configure logging
 logging.basicConfig(
@@ -19,15 +45,1186 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+# Connection settings for bulk loads: the database is rebuilt from source on
+# failure, so durability is traded for speed until the load completes
+BULK_LOAD_PRAGMAS = [
+    "PRAGMA journal_mode = MEMORY",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -262144",
+    "PRAGMA locking_mode = EXCLUSIVE",
+]
+
+
+# Seasonal month-day values, not calendar dates
+NON_DATE_COLUMNS = {'SEASON_BEGIN_DATE', 'SEASON_END_DATE'}
+
+# SDWIS marker for a period that has not ended yet
+OPEN_ENDED_DATE = '--->'
+
+# 90th percentile lead and copper action levels (mg/L); an LCR sample
+# measure above its level is an action level exceedance
+LCR_ACTION_LEVELS = {'PB90': 0.015, 'CU90': 1.3}
+
+# LCR results in each rolling window of AGG_LCR_SERIES
+LCR_ROLLING_WINDOW = 4
+
+# LCR rows per analytics batch (whole series, so batches can run a little over)
+LCR_BATCH_ROWS = 50000
+
+# Map aggregation levels and the SDWA_GEOGRAPHIC_AREAS column naming the area
+GEO_LEVELS = {
+    'county': 'COUNTY_SERVED',
+    'city': 'CITY_SERVED',
+    'zip': 'ZIP_CODE_SERVED'
+}
+
+# AGG_GEO_SUMMARY measures, in the order map documents list them
+GEO_MEASURES = [
+    ('SYSTEM_COUNT', 'systems'),
+    ('ACTIVE_SYSTEM_COUNT', 'active_systems'),
+    ('POPULATION_SERVED', 'population'),
+    ('OPEN_HEALTH_BASED_VIOLATIONS', 'open_health_based_violations'),
+    ('SYSTEMS_WITH_OPEN_HEALTH_BASED', 'systems_with_open_health_based'),
+    ('PB90_EXCEEDANCE_SAMPLES', 'pb90_exceedance_samples'),
+    ('PB90_EXCEEDANCE_SYSTEMS', 'pb90_exceedance_systems')
+]
+
+# CSV files in load order (reference table and parent systems first,
+# so foreign keys always point at rows that are already loaded)
+CSV_FILES = [
+    ('SDWA_REF_CODE_VALUES.csv', 'SDWA_REF_CODE_VALUES'),
+    ('SDWA_PUB_WATER_SYSTEMS.csv', 'SDWA_PUB_WATER_SYSTEMS'),
+    ('SDWA_FACILITIES.csv', 'SDWA_FACILITIES'),
+    ('SDWA_VIOLATIONS_ENFORCEMENT.csv', 'SDWA_VIOLATIONS_ENFORCEMENT'),
+    ('SDWA_LCR_SAMPLES.csv', 'SDWA_LCR_SAMPLES'),
+    ('SDWA_SITE_VISITS.csv', 'SDWA_SITE_VISITS'),
+    ('SDWA_GEOGRAPHIC_AREAS.csv', 'SDWA_GEOGRAPHIC_AREAS'),
+    ('SDWA_SERVICE_AREAS.csv', 'SDWA_SERVICE_AREAS'),
+    ('SDWA_EVENTS_MILESTONES.csv', 'SDWA_EVENTS_MILESTONES'),
+    ('SDWA_PN_VIOLATION_ASSOC.csv', 'SDWA_PN_VIOLATION_ASSOC')
+]
+
+
+def to_iso_date(value: str):
+    """Convert an SDWIS MM/DD/YYYY date to sortable ISO-8601 YYYY-MM-DD"""
+    if value == OPEN_ENDED_DATE:
+        return value
+    if len(value) == 10 and value[2] == '/' and value[5] == '/':
+        month, day, year = value[:2], value[3:5], value[6:]
+        if (month + day + year).isdigit() and '01' <= month <= '12' and '01' <= day <= '31':
+            return f"{year}-{month}-{day}"
+    elif len(value) == 10 and value[4] == '-' and value[7] == '-':
+        # Already ISO-8601
+        return value
+    raise ValueError(f"invalid date: {value!r}")
+
+
+# Converters applied at load time, by column kind
+COLUMN_CONVERTERS = {
+    'date': to_iso_date,
+    'integer': int,
+    'real': float,
+}
+
+
+def schema_column_kinds(schema_sql: str):
+    """Derive converter kinds from a CREATE TABLE statement
+    
+    Columns named *_DATE are dates (except NON_DATE_COLUMNS); INTEGER and
+    REAL columns are numeric; everything else is stored as text.
+    """
+    kinds = {}
+    for name, sql_type in re.findall(r'^\s*(\w+)\s+(TEXT|INTEGER|REAL)\b', schema_sql, re.MULTILINE):
+        if name.endswith('_DATE') and name not in NON_DATE_COLUMNS:
+            kinds[name] = 'date'
+        elif sql_type in ('INTEGER', 'REAL'):
+            kinds[name] = sql_type.lower()
+    return kinds
+
+
+def schema_primary_key(schema_sql: str):
+    """Return the PRIMARY KEY columns of a CREATE TABLE statement"""
+    match = re.search(r'PRIMARY KEY\s*\(([^)]*)\)', schema_sql)
+    if not match:
+        return []
+    return [column.strip() for column in match.group(1).split(',')]
+
+
+# Column to SDWA_REF_CODE_VALUES.VALUE_TYPE mapping. A column named exactly
+# like a VALUE_TYPE (VIOLATION_CODE, CONTAMINANT_CODE, RULE_FAMILY_CODE,
+# VISIT_REASON_CODE, PWS_TYPE_CODE, ...) uses that type; these are the
+# columns whose VALUE_TYPE has a different name
+CODE_COLUMN_VALUE_TYPES = {
+    'PWS_ACTIVITY_CODE': 'ACTIVITY_CODE',
+    'FACILITY_ACTIVITY_CODE': 'ACTIVITY_CODE',
+    'VIOL_ORIGINATOR_CODE': 'ORIGINATOR_CODE',
+    'ENF_ORIGINATOR_CODE': 'ORIGINATOR_CODE',
+    'MANAGEMENT_OPS_EVAL_CODE': 'SITE_VISIT_EVAL_TYPE_CODE',
+    'SOURCE_WATER_EVAL_CODE': 'SITE_VISIT_EVAL_TYPE_CODE',
+    'SECURITY_EVAL_CODE': 'SITE_VISIT_EVAL_TYPE_CODE',
+    'PUMPS_EVAL_CODE': 'SITE_VISIT_EVAL_TYPE_CODE',
+    'OTHER_EVAL_CODE': 'SITE_VISIT_EVAL_TYPE_CODE',
+    'COMPLIANCE_EVAL_CODE': 'SITE_VISIT_EVAL_TYPE_CODE',
+    'DATA_VERIFICATION_EVAL_CODE': 'SITE_VISIT_EVAL_TYPE_CODE',
+    'TREATMENT_EVAL_CODE': 'SITE_VISIT_EVAL_TYPE_CODE',
+    'FINISHED_WATER_STOR_EVAL_CODE': 'SITE_VISIT_EVAL_TYPE_CODE',
+    'DISTRIBUTION_EVAL_CODE': 'SITE_VISIT_EVAL_TYPE_CODE',
+    'FINANCIAL_EVAL_CODE': 'SITE_VISIT_EVAL_TYPE_CODE',
+}
+
+
+# High-traffic code columns stored with their description alongside, in a
+# <column>_DESC column filled while loading
+DESCRIPTION_COLUMNS = [
+    'VIOLATION_CODE',
+    'CONTAMINANT_CODE',
+    'RULE_FAMILY_CODE',
+    'VISIT_REASON_CODE',
+    'PWS_TYPE_CODE',
+]
+
+
+def code_value_type(column: str, value_types):
+    """Return the VALUE_TYPE a column's codes are defined under, or None"""
+    value_type = CODE_COLUMN_VALUE_TYPES.get(column, column)
+    return value_type if value_type in value_types else None
+
+
+class CodeDecoder:
+    """SDWA_REF_CODE_VALUES descriptions in memory, keyed by (VALUE_TYPE, VALUE_CODE)
+    
+    Loaded once per run and extended with reference rows as they load, so
+    decoding never queries the database.
+    """
+    
+    def __init__(self):
+        self.descriptions = {}
+        self.value_types = set()
+        
+    @classmethod
+    def from_connection(cls, conn: sqlite3.Connection):
+        decoder = cls()
+        decoder.load(conn)
+        return decoder
+        
+    def load(self, conn: sqlite3.Connection):
+        for value_type, value_code, description in conn.execute(
+                "SELECT VALUE_TYPE, VALUE_CODE, VALUE_DESCRIPTION FROM SDWA_REF_CODE_VALUES"):
+            self.add(value_type, value_code, description)
+            
+    def add(self, value_type: str, value_code: str, description: str):
+        self.descriptions[(value_type, value_code)] = description
+        self.value_types.add(value_type)
+        
+    def describe(self, column: str, code: str):
+        """Description of a code found in a column (or under a VALUE_TYPE), or None"""
+        value_type = code_value_type(column, self.value_types)
+        if value_type is None:
+            return None
+        return self.descriptions.get((value_type, code))
+        
+    def decode_batch(self, items):
+        """Decode many (column or VALUE_TYPE, code) pairs at once
+        
+        Returns a dict mapping each distinct pair to its description (None
+        when the code is unknown).
+        """
+        return {(column, code): self.describe(column, code) for column, code in set(items)}
+        
+    def code_columns(self, columns: list):
+        """(index, column, VALUE_TYPE) for the columns of a row that hold codes"""
+        return [
+            (index, column, value_type) for index, column in enumerate(columns)
+            if (value_type := code_value_type(column, self.value_types))
+        ]
+        
+    def with_descriptions(self, rows, code_columns: list):
+        """Yield rows with the description of each (index, VALUE_TYPE, target) code
+        
+        A target inside the row overwrites that column; targets past its end
+        are appended in order.
+        """
+        descriptions = self.descriptions
+        appended = [(index, value_type) for index, value_type, target in code_columns if target is None]
+        replaced = [(index, value_type, target) for index, value_type, target in code_columns
+                    if target is not None]
+        for row in rows:
+            if replaced:
+                row = list(row)
+                for index, value_type, target in replaced:
+                    row[target] = descriptions.get((value_type, row[index]))
+            yield tuple(row) + tuple(descriptions.get((value_type, row[index]))
+                                     for index, value_type in appended)
+
+
+def decode_codes(conn: sqlite3.Connection, items):
+    """Decode (column or VALUE_TYPE, code) pairs with one read of the reference table"""
+    return CodeDecoder.from_connection(conn).decode_batch(items)
+
+
+class ConversionErrors:
+    """Values that failed type conversion, counted by column
+    
+    Also counts rows skipped outright for a missing primary key, and keeps
+    every failure with its row as an issue for the quarantine table.
+    """
+    
+    max_samples = 5
+    
+    def __init__(self):
+        self.rows = 0
+        self.skipped = 0
+        self.by_column = {}
+        self.samples = []
+        # (rule, column, value, action, row) for ETL_QUARANTINE
+        self.issues = []
+        
+    def add(self, column: str, value: str, kind: str = None, row=None):
+        self.by_column[column] = self.by_column.get(column, 0) + 1
+        if len(self.samples) < self.max_samples:
+            self.samples.append((column, value))
+        if row is not None:
+            self.issues.append((f"invalid_{kind}", column, value, 'flagged', row))
+            
+    def reject(self, rule: str, column: str, row):
+        self.skipped += 1
+        self.issues.append((rule, column, None, 'rejected', row))
+        
+    def drain(self):
+        """Return and forget the issues recorded so far"""
+        issues, self.issues = self.issues, []
+        return issues
+        
+    def merge(self, other):
+        self.rows += other.rows
+        self.skipped += other.skipped
+        for column, count in other.by_column.items():
+            self.by_column[column] = self.by_column.get(column, 0) + count
+        self.samples.extend(other.samples[:self.max_samples - len(self.samples)])
+        self.issues.extend(other.issues)
+        
+    def log(self, table_name: str):
+        if not self.rows:
+            return
+        logger.warning(f"  {self.rows:,} rows in {table_name} had values that failed conversion (stored as-is)")
+        for column, count in sorted(self.by_column.items()):
+            logger.warning(f"    {column}: {count:,} values")
+        for column, value in self.samples:
+            logger.warning(f"    e.g. {column} = {value!r}")
+
+
+def iter_row_values(table_name: str, columns: list, rows, column_kinds: dict = None,
+                    errors: ConversionErrors = None, key_columns: list = None):
+    """Yield insert tuples for parsed CSV rows, skipping invalid ones
+    
+    column_kinds maps column names to COLUMN_CONVERTERS keys. Values that
+    fail conversion are kept unchanged and recorded in errors; rows missing
+    a key_columns value are skipped and recorded as rejected.
+    """
+    key_indexes = [(columns.index(column), column) for column in key_columns or [] if column in columns]
+    
+    converters = [
+        (index, column, column_kinds[column], COLUMN_CONVERTERS[column_kinds[column]])
+        for index, column in enumerate(columns)
+        if column_kinds and column in column_kinds
+    ]
+    
+    for row in rows:
+        # Skip rows with missing primary key fields
+        missing = next((column for index, column in key_indexes if not row[index]), None)
+        if missing:
+            if errors is not None:
+                errors.reject('missing_key', missing, row)
+            continue
+            
+        # Convert empty strings to None for proper NULL handling
+        row_values = [value if value != '' else None for value in row]
+        
+        failed = False
+        for index, column, kind, convert in converters:
+            value = row_values[index]
+            if value is not None:
+                try:
+                    row_values[index] = convert(value)
+                except ValueError:
+                    failed = True
+                    if errors is not None:
+                        errors.add(column, value, kind, row_values)
+        if failed and errors is not None:
+            errors.rows += 1
+            
+        yield tuple(row_values)
+
+
+def parse_csv_chunk(table_name: str, columns: list, chunk: str, column_kinds: dict = None,
+                    key_columns: list = None):
+    """Parse a block of whole CSV records (runs in a worker process)
+    
+    Returns the insert tuples, the conversion errors seen and the CPU
+    seconds the worker spent.
+    """
+    cpu_started = time.process_time()
+    errors = ConversionErrors()
+    rows = list(iter_row_values(table_name, columns, csv.reader(io.StringIO(chunk)),
+                                column_kinds, errors, key_columns))
+    return rows, errors, time.process_time() - cpu_started
+
+
+def iter_csv_chunks(f, chunk_rows: int):
+    """Split an open CSV file into text blocks of whole records
+    
+    A line ends a record only when the quotes seen so far are balanced, so
+    quoted fields with embedded newlines never straddle two blocks.
+    """
+    lines = []
+    record_count = 0
+    in_quotes = False
+    
+    for line in f:
+        lines.append(line)
+        if line.count('"') % 2:
+            in_quotes = not in_quotes
+        if not in_quotes:
+            record_count += 1
+            if record_count >= chunk_rows:
+                yield ''.join(lines)
+                lines = []
+                record_count = 0
+                
+    if lines:
+        yield ''.join(lines)
+
+
+def peak_rss_bytes(who=None):
+    """Return peak resident set size in bytes, or None if unavailable"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who is None else who)
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+
+
+class ETLMetrics:
+    """Per-table, per-phase ETL measurements
+    
+    Each phase records wall and CPU time, rows and input bytes (with rates),
+    batches flushed, rejected rows and peak RSS at the end of the phase.
+    """
+    
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.phases = []
+        
+    def start_phase(self, phase: str, table: str = None, input_bytes: int = None):
+        """Begin measuring a phase; returns its record for the caller to fill"""
+        return {
+            'phase': phase,
+            'table': table,
+            'rows': 0,
+            'input_bytes': input_bytes,
+            'batches': 0,
+            'rejected_rows': 0,
+            'conversion_failures': 0,
+            'rule_failures': {},
+            'worker_cpu_seconds': 0.0,
+            '_wall': time.perf_counter(),
+            '_cpu': time.process_time(),
+        }
+        
+    def end_phase(self, record: dict):
+        """Finish measuring a phase and derive its rates"""
+        wall = time.perf_counter() - record.pop('_wall')
+        record['wall_seconds'] = round(wall, 6)
+        record['cpu_seconds'] = round(time.process_time() - record.pop('_cpu'), 6)
+        record['worker_cpu_seconds'] = round(record['worker_cpu_seconds'], 6)
+        record['rows_per_second'] = round(record['rows'] / wall, 1) if wall > 0 else None
+        if record['input_bytes'] is not None and wall > 0:
+            record['input_bytes_per_second'] = round(record['input_bytes'] / wall, 1)
+        else:
+            record['input_bytes_per_second'] = None
+        record['peak_rss_bytes'] = peak_rss_bytes()
+        if resource is not None:
+            record['peak_worker_rss_bytes'] = peak_rss_bytes(resource.RUSAGE_CHILDREN)
+        self.phases.append(record)
+        return record
+        
+    @contextmanager
+    def phase(self, phase: str, table: str = None, input_bytes: int = None):
+        record = self.start_phase(phase, table, input_bytes)
+        try:
+            yield record
+        finally:
+            self.end_phase(record)
+            
+    def report(self):
+        """Return the metrics as a JSON-serializable dict"""
+        finished_at = datetime.now()
+        return {
+            'started_at': self.started_at.isoformat(),
+            'finished_at': finished_at.isoformat(),
+            'wall_seconds': round((finished_at - self.started_at).total_seconds(), 6),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'phases': self.phases,
+        }
+        
+    def write(self, path: str):
+        """Write the JSON report to a file"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+        logger.info(f"Metrics written to {path}")
+
+
+def read_query_file(path: Path):
+    """Read named queries from a SQL file with "-- name: <name>" headers
+    
+    Returns a list of (name, sql) pairs in file order.
+    """
+    queries = []
+    name, lines = None, []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            match = re.match(r'--\s*name:\s*(\S+)', line)
+            if match:
+                if name:
+                    queries.append((name, ''.join(lines).strip().rstrip(';')))
+                name, lines = match.group(1), []
+            elif name and not line.startswith('--'):
+                lines.append(line)
+    if name:
+        queries.append((name, ''.join(lines).strip().rstrip(';')))
+    return queries
+
+
+def fts_query(term: str):
+    """Build an FTS5 prefix query matching every word of a search term"""
+    words = re.findall(r'\w+', term)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_water_systems(conn: sqlite3.Connection, term: str, quarter: str = None, limit: int = 50):
+    """Search water systems by name, PWSID, city, organization or area served
+    
+    Uses the SDWA_SEARCH full-text index; every word of the term is matched
+    as a prefix. Results are ranked by BM25 with name and PWSID matches
+    weighted highest.
+    """
+    query = fts_query(term)
+    if not query:
+        return []
+        
+    sql = """
+        SELECT PWSID, PWS_NAME, SUBMISSIONYEARQUARTER, CITY_NAME, COUNTIES_SERVED,
+               bm25(SDWA_SEARCH, 10.0, 10.0, 3.0, 2.0, 2.0, 1.0, 1.0, 0.0) AS rank
+        FROM SDWA_SEARCH
+        WHERE SDWA_SEARCH MATCH ?
+    """
+    params = [query]
+    if quarter:
+        sql += " AND SUBMISSIONYEARQUARTER = ?"
+        params.append(quarter)
+    sql += " ORDER BY rank LIMIT ?"
+    params.append(limit)
+    
+    columns = ['pwsid', 'pws_name', 'quarter', 'city_name', 'counties_served', 'rank']
+    return [dict(zip(columns, row)) for row in conn.execute(sql, params)]
+
+
+def geo_area_systems(column: str):
+    """Query the distinct (quarter, PWSID, area) rows of one GEO_LEVELS column
+    
+    The one rule for which systems serve an area, shared by AGG_GEO_SUMMARY
+    and AGG_COUNTY_SUMMARY: blank and NULL area names are no area.
+    """
+    return f"""
+        SELECT DISTINCT SUBMISSIONYEARQUARTER, PWSID, {column} AS AREA_NAME
+        FROM SDWA_GEOGRAPHIC_AREAS
+        WHERE {column} <> ''
+    """
+
+
+def geo_summary_query():
+    """Build the AGG_GEO_SUMMARY query: one row per quarter, level and area
+    
+    A system serving several areas of a level counts in each of them, but
+    its population is split evenly between them, so allocated populations
+    add up to the population actually served. Open violations are
+    Unaddressed or Addressed; a PB90 exceedance is a lead 90th percentile
+    above the action level, and a system exceeds if its latest PB90 does.
+    """
+    lead_level = LCR_ACTION_LEVELS['PB90']
+    levels = []
+    for level, column in GEO_LEVELS.items():
+        levels.append(f"""
+            SELECT a.SUBMISSIONYEARQUARTER, '{level}', a.AREA_NAME,
+                   COUNT(*),
+                   SUM(p.PWS_ACTIVITY_CODE = 'A'),
+                   CAST(ROUND(COALESCE(SUM(p.POPULATION_SERVED_COUNT * a.SHARE), 0)) AS INTEGER),
+                   COALESCE(SUM(v.OPEN_HEALTH_BASED), 0),
+                   COUNT(v.PWSID),
+                   COALESCE(SUM(l.EXCEEDANCES), 0),
+                   COALESCE(SUM(l.LATEST_EXCEEDS), 0)
+            FROM (
+                SELECT SUBMISSIONYEARQUARTER, PWSID, AREA_NAME,
+                       1.0 / COUNT(*) OVER (PARTITION BY SUBMISSIONYEARQUARTER, PWSID) AS SHARE
+                FROM ({geo_area_systems(column)})
+            ) a
+            JOIN SDWA_PUB_WATER_SYSTEMS p
+                ON p.SUBMISSIONYEARQUARTER = a.SUBMISSIONYEARQUARTER AND p.PWSID = a.PWSID
+            LEFT JOIN open_health_based v
+                ON v.SUBMISSIONYEARQUARTER = a.SUBMISSIONYEARQUARTER AND v.PWSID = a.PWSID
+            LEFT JOIN lead_exceedances l
+                ON l.SUBMISSIONYEARQUARTER = a.SUBMISSIONYEARQUARTER AND l.PWSID = a.PWSID
+            GROUP BY a.SUBMISSIONYEARQUARTER, a.AREA_NAME
+        """)
+    return f"""
+        WITH open_health_based AS (
+            SELECT SUBMISSIONYEARQUARTER, PWSID, COUNT(*) AS OPEN_HEALTH_BASED
+            FROM SDWA_VIOLATIONS_ENFORCEMENT
+            WHERE IS_HEALTH_BASED_IND = 'Y' AND VIOLATION_STATUS IN ('Unaddressed', 'Addressed')
+            GROUP BY SUBMISSIONYEARQUARTER, PWSID
+        ),
+        lead_exceedances AS (
+            SELECT SUBMISSIONYEARQUARTER, PWSID,
+                   SUM(SAMPLE_MEASURE > {lead_level}) AS EXCEEDANCES,
+                   MAX(LATEST = 1 AND SAMPLE_MEASURE > {lead_level}) AS LATEST_EXCEEDS
+            FROM (
+                SELECT SUBMISSIONYEARQUARTER, PWSID, SAMPLE_MEASURE,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY SUBMISSIONYEARQUARTER, PWSID
+                           ORDER BY SAMPLING_END_DATE DESC, SAMPLE_ID DESC
+                       ) AS LATEST
+                FROM SDWA_LCR_SAMPLES
+                WHERE CONTAMINANT_CODE = 'PB90'
+            )
+            GROUP BY SUBMISSIONYEARQUARTER, PWSID
+        )
+        {' UNION ALL '.join(levels)}
+    """
+
+
+def read_map_document(conn: sqlite3.Connection, level: str, quarter: str):
+    """Return the pre-built map document for a level and quarter, or None
+    
+    Documents are compact JSON: {"quarter", "level", "columns": [measure,
+    ...], "areas": {area name: [value, ...]}}, with values in column order.
+    """
+    row = conn.execute(
+        "SELECT DOCUMENT FROM AGG_MAP_DOCUMENTS WHERE SUBMISSIONYEARQUARTER = ? AND AREA_LEVEL = ?",
+        (quarter, level)
+    ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def percentile(sorted_values: list, fraction: float):
+    """Linearly interpolated percentile of sorted values (NumPy's default method)"""
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def lcr_statistics_python(series: list, window: int):
+    """Rolling and per-series LCR statistics, one series at a time
+    
+    series is [(key, level, measures)] with measures in sampling order.
+    Returns per-point and per-series columns as lists; see
+    lcr_statistics_numpy for the same computation over a whole batch.
+    """
+    points = {'rolling_mean': [], 'rolling_max': [], 'exceeds': [], 'streak': [], 'change': []}
+    totals = {'mean': [], 'median': [], 'p90': [], 'max': [], 'exceedances': [], 'last_exceedance': []}
+    for _, level, measures in series:
+        streak = 0
+        last_exceedance = -1
+        for index, measure in enumerate(measures):
+            recent = measures[max(0, index - window + 1):index + 1]
+            exceeds = measure > level
+            streak = streak + 1 if exceeds else 0
+            if exceeds:
+                last_exceedance = index
+            points['rolling_mean'].append(sum(recent) / len(recent))
+            points['rolling_max'].append(max(recent))
+            points['exceeds'].append(exceeds)
+            points['streak'].append(streak)
+            points['change'].append(measure - measures[index - 1] if index else None)
+        ordered = sorted(measures)
+        totals['mean'].append(sum(measures) / len(measures))
+        totals['median'].append(percentile(ordered, 0.5))
+        totals['p90'].append(percentile(ordered, 0.9))
+        totals['max'].append(ordered[-1])
+        totals['exceedances'].append(sum(measure > level for measure in measures))
+        totals['last_exceedance'].append(last_exceedance)
+    return points, totals
+
+
+def lcr_statistics_numpy(series: list, window: int):
+    """Vectorized lcr_statistics_python over all series of a batch at once
+    
+    The series are laid end to end in one array. Rolling windows are
+    summed from shifted copies masked at series starts, oldest first, so
+    sums match the pure Python ones exactly; per-series percentiles index a
+    copy sorted by (series, value).
+    """
+    counts = np.array([len(measures) for _, _, measures in series])
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    values = np.fromiter((measure for _, _, measures in series for measure in measures), float, int(counts.sum()))
+    levels = np.repeat([level for _, level, _ in series], counts)
+    series_ids = np.repeat(np.arange(len(series)), counts)
+    series_start = starts[series_ids]
+    index = np.arange(len(values))
+    
+    rolling_sum = np.zeros(len(values))
+    rolling_max = np.full(len(values), -np.inf)
+    for offset in range(window - 1, -1, -1):
+        inside = index - offset >= series_start
+        shifted = values[np.where(inside, index - offset, 0)]
+        rolling_sum += np.where(inside, shifted, 0.0)
+        rolling_max = np.maximum(rolling_max, np.where(inside, shifted, -np.inf))
+    rolling_mean = rolling_sum / (index - np.maximum(index - window + 1, series_start) + 1)
+    
+    exceeds = values > levels
+    # Streaks restart after every result at or below the level and at each series start
+    restart = np.maximum.accumulate(np.maximum(np.where(exceeds, -1, index), series_start - 1))
+    streak = np.where(exceeds, index - restart, 0)
+    previous = values[np.maximum(index - 1, 0)]
+    change = [None if first else delta
+              for first, delta in zip((index == series_start).tolist(), (values - previous).tolist())]
+    
+    ordered = values[np.lexsort((values, series_ids))]
+    
+    def series_percentile(fraction):
+        position = (counts - 1) * fraction
+        lower = position.astype(int)
+        upper = np.minimum(lower + 1, counts - 1)
+        low_values = ordered[starts + lower]
+        return low_values + (ordered[starts + upper] - low_values) * (position - lower)
+        
+    points = {
+        'rolling_mean': rolling_mean.tolist(),
+        'rolling_max': rolling_max.tolist(),
+        'exceeds': exceeds.tolist(),
+        'streak': streak.tolist(),
+        'change': change
+    }
+    totals = {
+        'mean': [sum(measures) / len(measures) for _, _, measures in series],
+        'median': series_percentile(0.5).tolist(),
+        'p90': series_percentile(0.9).tolist(),
+        'max': ordered[starts + counts - 1].tolist(),
+        'exceedances': np.add.reduceat(exceeds.astype(int), starts).tolist(),
+        'last_exceedance': (np.maximum.reduceat(np.where(exceeds, index, -1), starts)
+                            - np.where(np.maximum.reduceat(exceeds, starts), starts, 0)).tolist()
+    }
+    return points, totals
+
+
+def decode_document(blob: bytes):
+    """Decode an SDWA_SYSTEM_DOCUMENTS document into row dicts
+    
+    Documents are zlib-compressed JSON storing each section column-wise
+    ({"columns": [...], "rows": [[...], ...]}, without the key columns).
+    Sections come back as lists of dicts, with each violation's enforcement
+    actions nested under it.
+    """
+    document = json.loads(zlib.decompress(blob))
+    for section, value in document.items():
+        if isinstance(value, dict) and 'rows' in value:
+            columns = value['columns']
+            document[section] = [dict(zip(columns, row)) for row in value['rows']]
+            
+    actions = {}
+    for action in document.pop('enforcement_actions', []):
+        actions.setdefault(action['VIOLATION_ID'], []).append(action)
+    for violation in document.get('violations', []):
+        violation['enforcement_actions'] = actions.get(violation['VIOLATION_ID'], [])
+    return document
+
+
+def read_system_document(conn: sqlite3.Connection, pwsid: str, quarter: str):
+    """Return a water system's pre-built detail document, or None
+    
+    One primary-key lookup in SDWA_SYSTEM_DOCUMENTS instead of a query per
+    child table.
+    """
+    row = conn.execute(
+        "SELECT DOCUMENT FROM SDWA_SYSTEM_DOCUMENTS WHERE SUBMISSIONYEARQUARTER = ? AND PWSID = ?",
+        (quarter, pwsid)
+    ).fetchone()
+    return decode_document(row[0]) if row else None
+
+
+def iter_key_groups(cursor, key_count: int = 2):
+    """Group an executed query's rows by their first key_count columns
+    
+    The query must be ordered by those columns. Yields (key, rows) with
+    each row's remaining columns as a tuple.
+    """
+    for key, rows in groupby(cursor, key=lambda row: row[:key_count]):
+        yield key, [row[key_count:] for row in rows]
+
+
+# Compressed single-file inputs, by suffix after ".csv"
+COMPRESSED_OPENERS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+
+class CSVSource:
+    """A CSV input: a plain file, a compressed file or a zip archive member
+    
+    Compressed inputs are decompressed as a stream while parsing, so no
+    extracted copy is ever written to disk.
+    """
+    
+    def __init__(self, path: Path, member: str = None):
+        self.path = Path(path)
+        self.member = member
+        
+    @property
+    def name(self):
+        if self.member:
+            return f"{self.path.name}:{self.member}"
+        return self.path.name
+        
+    def stat(self):
+        """Return the on-disk file's stat (the archive for zip members)"""
+        return self.path.stat()
+        
+    def content_hash(self, digest=None):
+        """Return a hash identifying the CSV content
+        
+        Zip members use the CRC-32 and size from the archive directory, so an
+        unchanged member is recognised without decompressing it. Other files
+        use the SHA-256 of their decompressed CSV bytes; digest, if given, is
+        that hash already computed by a load that read the whole file.
+        """
+        if self.member:
+            with zipfile.ZipFile(self.path) as archive:
+                info = archive.getinfo(self.member)
+            return f"zip-crc32:{info.CRC:08x}:{info.file_size}"
+        if digest is None:
+            digest = self.stream_digest()[0]
+        return digest.hexdigest()
+        
+    def stream_digest(self, offset: int = None):
+        """Hash the decompressed CSV bytes up to offset (all of them by default)
+        
+        Returns the SHA-256 object, which a load can keep updating from that
+        point, and whether the stream ends at offset.
+        """
+        digest = hashlib.sha256()
+        remaining = offset
+        with self.open_binary() as raw:
+            while remaining is None or remaining > 0:
+                size = 1024 * 1024 if remaining is None else min(remaining, 1024 * 1024)
+                block = raw.read(size)
+                if not block:
+                    break
+                digest.update(block)
+                if remaining is not None:
+                    remaining -= len(block)
+            at_end = remaining is None or not raw.read(1)
+        return digest, at_end
+        
+    @contextmanager
+    def open_binary(self):
+        """Open the CSV as a decompressed binary stream"""
+        if self.member:
+            with zipfile.ZipFile(self.path) as archive, archive.open(self.member) as raw:
+                yield raw
+            return
+            
+        opener = COMPRESSED_OPENERS.get(self.path.suffix.lower(), open)
+        with opener(self.path, 'rb') as raw:
+            yield raw
+            
+    @contextmanager
+    def open(self):
+        """Open the CSV as a text stream suitable for csv.reader"""
+        with self.open_binary() as raw:
+            yield io.TextIOWrapper(raw, encoding='utf-8', newline='')
+            
+    def __str__(self):
+        return self.name
+
+
+class OffsetLineReader:
+    """Decoded lines of a binary CSV stream with the byte offset consumed
+    
+    csv.reader pulls lines only as it needs them, so right after it returns
+    a record the offset is the end of that record: a safe point to resume
+    from. Offsets count decompressed bytes; seeking a compressed stream
+    decompresses and discards up to the offset without parsing anything.
+    The lines read are hashed as they go, so digest always covers the
+    bytes before offset and no separate pass over the file is needed.
+    """
+    
+    def __init__(self, raw):
+        self.raw = raw
+        self.offset = 0
+        self.digest = hashlib.sha256()
+        
+    def readline(self):
+        line = self.raw.readline()
+        self.offset += len(line)
+        self.digest.update(line)
+        return line.decode('utf-8')
+        
+    def seek(self, offset: int, digest):
+        """Continue from offset; digest is the hash of the bytes before it"""
+        self.raw.seek(offset)
+        self.offset = offset
+        self.digest = digest.copy()
+        
+    def __iter__(self):
+        for line in self.raw:
+            self.offset += len(line)
+            self.digest.update(line)
+            yield line.decode('utf-8')
+
+
+def find_csv_source(data_dir: Path, csv_filename: str):
+    """Locate a CSV by name as a plain, compressed or zipped file
+    
+    Looks for the plain file first, then a .gz/.bz2/.xz copy, then a member
+    with that base name in any zip archive in the directory.
+    """
+    csv_path = data_dir / csv_filename
+    if csv_path.exists():
+        return CSVSource(csv_path)
+        
+    for suffix in COMPRESSED_OPENERS:
+        compressed = data_dir / f"{csv_filename}{suffix}"
+        if compressed.exists():
+            return CSVSource(compressed)
+            
+    for archive_path in sorted(data_dir.glob('*.zip')):
+        with zipfile.ZipFile(archive_path) as archive:
+            for member in archive.namelist():
+                if Path(member).name.lower() == csv_filename.lower():
+                    return CSVSource(archive_path, member)
+                    
+    return None
+
+
+class DataQuality:
+    """Inline data-quality rules for rows streaming into the database
+    
+    Parse-time rules (primary key completeness, date and number formats)
+    arrive as ConversionErrors issues. This class adds the rules that need
+    reference state, water system keys and code values, which it collects
+    from the rows as the parent and reference tables load, so no rule scans
+    a loaded table. Every failure is buffered for ETL_QUARANTINE and counted
+    per table and rule: rejected rows are not loaded, flagged rows are.
+    """
+    
+    def __init__(self, table_schemas: dict, decoder: CodeDecoder):
+        self.fk_tables = {
+            table_name for table_name, schema_sql in table_schemas.items()
+            if 'REFERENCES SDWA_PUB_WATER_SYSTEMS' in schema_sql
+        }
+        # Code values come from the processor's decoder, which follows the
+        # reference rows as they load
+        self.decoder = decoder
+        self.pws_keys = None
+        self.counts = {}
+        self.pending = []
+        
+    def load_reference_state(self, conn):
+        """Seed water system keys once from the table an earlier run loaded
+        
+        Empty on a fresh build; incremental and resumed runs need it for
+        the parent file they skip.
+        """
+        if self.pws_keys is not None:
+            return
+        self.pws_keys = set(conn.execute("SELECT SUBMISSIONYEARQUARTER, PWSID FROM SDWA_PUB_WATER_SYSTEMS"))
+        
+    def check(self, table_name: str, file_name: str, columns: list, rows):
+        """Yield the rows that pass the reference rules, quarantining failures
+        
+        load_reference_state must have been called first.
+        """
+        key_indexes = None
+        if table_name in self.fk_tables or table_name == 'SDWA_PUB_WATER_SYSTEMS':
+            key_indexes = (columns.index('SUBMISSIONYEARQUARTER'), columns.index('PWSID'))
+        descriptions = self.decoder.descriptions
+        code_columns = self.decoder.code_columns(columns)
+        
+        for row in rows:
+            if key_indexes:
+                key = (row[key_indexes[0]], row[key_indexes[1]])
+                if table_name == 'SDWA_PUB_WATER_SYSTEMS':
+                    self.pws_keys.add(key)
+                elif key not in self.pws_keys:
+                    self.quarantine(table_name, file_name, 'unknown_pwsid', 'PWSID', key[1],
+                                    'rejected', columns, row)
+                    continue
+                    
+            for index, column, value_type in code_columns:
+                value = row[index]
+                if value is not None and (value_type, value) not in descriptions:
+                    self.quarantine(table_name, file_name, 'unknown_code', column, value,
+                                    'flagged', columns, row)
+                    
+            yield row
+            
+    def record(self, table_name: str, file_name: str, columns: list, errors: ConversionErrors):
+        """Quarantine the parse-time issues collected in errors"""
+        for rule, column, value, action, row in errors.drain():
+            self.quarantine(table_name, file_name, rule, column, value, action, columns, row)
+            
+    def quarantine(self, table_name: str, file_name: str, rule: str, column: str, value,
+                   action: str, columns: list, row):
+        counts = self.counts.setdefault(table_name, {})
+        counts[rule] = counts.get(rule, 0) + 1
+        self.pending.append((
+            table_name, file_name, rule, column, None if value is None else str(value), action,
+            json.dumps(dict(zip(columns, row))), datetime.now().isoformat()
+        ))
+        
+    def flush(self, cursor):
+        """Write buffered quarantine rows; the caller commits them with the batch"""
+        if self.pending:
+            cursor.executemany(
+                """INSERT INTO ETL_QUARANTINE
+                   (TABLE_NAME, FILE_NAME, RULE, COLUMN_NAME, VALUE, ACTION, ROW_DATA, QUARANTINED_AT)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                self.pending
+            )
+            self.pending = []
+            
+    def reset_table(self, cursor, table_name: str):
+        """Forget a table's quarantined rows before it is loaded again"""
+        cursor.execute("DELETE FROM ETL_QUARANTINE WHERE TABLE_NAME = ?", (table_name,))
+        self.counts.pop(table_name, None)
+        
+    def rejected(self, table_name: str):
+        """Rows of a table the reference rules kept out of the database"""
+        return self.counts.get(table_name, {}).get('unknown_pwsid', 0)
+        
+    def log(self, table_name: str):
+        for rule, count in sorted(self.counts.get(table_name, {}).items()):
+            logger.warning(f"  Data quality: {count:,} {rule} in {table_name}")
+            
+
+class GenerationStore:
+    """Published database generations behind a symlink at the database path
+    
+    Each build is written to building.db in a <db>.generations directory,
+    renamed to <generation id>.db once it passes its checks, and published
+    by atomically replacing the symlink at the database path. Readers that
+    open the path get either the old or the new generation, never a partial
+    one, and connections already open keep reading their generation.
+    """
+    
+    SIDECAR_SUFFIXES = ['-wal', '-shm', '-journal']
+    
+    def __init__(self, db_path: Path, keep: int = 3):
+        self.db_path = Path(db_path)
+        self.directory = self.db_path.with_name(f"{self.db_path.name}.generations")
+        self.build_path = self.directory / 'building.db'
+        self.keep = keep
+        
+    @staticmethod
+    def generation_order(path: Path):
+        """Sort key for generation files, oldest first
+        
+        Ids are fixed-width timestamps down to the microsecond. Ids from
+        older releases have whole seconds and may carry a -N collision
+        suffix, which must sort after the id it collided with.
+        """
+        timestamp, _, suffix = path.stem.partition('-')
+        return timestamp.ljust(len('YYYYmmddTHHMMSSffffff'), '0'), int(suffix) if suffix.isdigit() else 0
+        
+    def generations(self):
+        """Return published generation files, oldest first"""
+        return sorted((path for path in self.directory.glob('*.db') if path != self.build_path),
+                      key=self.generation_order)
+        
+    def current(self):
+        """Return the file the database path currently resolves to, if any"""
+        if self.db_path.exists():
+            return self.db_path.resolve()
+        return None
+        
+    def new_generation_id(self):
+        """A fixed-width timestamp id, so ids sort in build order"""
+        generation_id = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        while (self.directory / f"{generation_id}.db").exists():
+            generation_id = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        return generation_id
+        
+    def prepare_build(self, resume: bool = False, copy_current: bool = False):
+        """Create the build file location, discarding a stale build unless resuming
+        
+        With copy_current the published database is copied (with the SQLite
+        backup API) as the starting point, e.g. for an incremental update.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if resume and self.build_path.exists():
+            logger.info(f"Resuming build in {self.build_path}")
+            return self.build_path
+            
+        self.remove(self.build_path)
+        current = self.current()
+        if copy_current and current:
+            logger.info(f"Copying published database {current} to {self.build_path}")
+            source = sqlite3.connect(f"file:{current}?mode=ro", uri=True)
+            target = sqlite3.connect(self.build_path)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+        return self.build_path
+        
+    def publish(self, generation_id: str):
+        """Rename the finished build into place and atomically point the database path at it"""
+        target = self.directory / f"{generation_id}.db"
+        os.replace(self.build_path, target)
+        
+        # A database file from before publishing is kept as a generation
+        if self.db_path.exists() and not self.db_path.is_symlink():
+            legacy = self.directory / f"{datetime.fromtimestamp(self.db_path.stat().st_mtime):%Y%m%dT%H%M%S%f}-legacy.db"
+            os.link(self.db_path, legacy)
+            
+        self.point_to(target)
+        logger.info(f"Published generation {generation_id}: {self.db_path} -> {target}")
+        self.prune()
+        return target
+        
+    def point_to(self, target: Path):
+        """Atomically replace the database path with a symlink to target"""
+        link = self.db_path.with_name(f".{self.db_path.name}.{os.getpid()}.link")
+        os.symlink(os.path.relpath(target, self.db_path.parent), link)
+        os.replace(link, self.db_path)
+        
+    def previous(self):
+        """Return the generation published before the current one"""
+        current = self.current()
+        older = [path for path in self.generations()
+                 if current and self.generation_order(path) < self.generation_order(current)]
+        if not older:
+            raise FileNotFoundError(f"No generation older than {current}")
+        return older[-1]
+        
+    def rollback(self):
+        """Point the database path back at the generation before the current one"""
+        previous = self.previous()
+        self.point_to(previous)
+        logger.info(f"Rolled back {self.db_path} to {previous.name}")
+        return previous
+        
+    def prune(self):
+        """Delete all but the newest keep generations (never the current one)"""
+        current = self.current()
+        for path in self.generations()[:-self.keep or None]:
+            if path.resolve() != current:
+                self.remove(path)
+                logger.info(f"Removed old generation {path.name}")
+                
+    def remove(self, path: Path):
+        """Delete a database file and its journal, WAL and shared-memory files"""
+        for candidate in [path] + [path.with_name(path.name + suffix) for suffix in self.SIDECAR_SUFFIXES]:
+            if candidate.exists():
+                candidate.unlink()
+
+
+class RowSplitter:
+    """Split wide CSV rows into deduplicated parent rows and child rows
+    
+    SDWIS repeats a violation once per enforcement action. Each repeated
+    row yields one child row (its key and child columns), while the parent
+    row (every other column) is emitted only the first time its key is
+    seen. Keys already emitted are kept in a set, so repeats need not be
+    consecutive in the file.
+    """
+    
+    def __init__(self, columns: list, key_columns: list, child_columns: list):
+        self.key_indexes = [columns.index(col) for col in key_columns]
+        self.parent_indexes = [i for i, col in enumerate(columns) if col not in child_columns]
+        self.child_indexes = self.key_indexes + [columns.index(col) for col in child_columns]
+        # A child row exists only when its first column (its ID) is present
+        self.child_id_index = columns.index(child_columns[0])
+        self.seen_keys = set()
+        
+    def parent_columns(self, columns: list):
+        """The parent table's insert columns, in parent row order"""
+        return [columns[i] for i in self.parent_indexes]
+        
+    def split(self, rows):
+        """Return (parent_rows, child_rows) for a batch of insert tuples"""
+        parents = []
+        children = []
+        seen_keys = self.seen_keys
+        for row in rows:
+            key = tuple([row[i] for i in self.key_indexes])
+            if key not in seen_keys:
+                seen_keys.add(key)
+                parents.append(tuple([row[i] for i in self.parent_indexes]))
+            if row[self.child_id_index] is not None:
+                children.append(tuple([row[i] for i in self.child_indexes]))
+        return parents, children
+
+
 class SDWAETLProcessor:
     """ETL processor for SDWA data"""
     
-    def __init__(self, data_dir: str, db_path: str):
+    def __init__(self, data_dir: str, db_path: str, workers: int = 1,
+                 bulk: bool = False, batch_size: int = 0, incremental: bool = False,
+                 convert_types: bool = True, metrics_out: str = None, profile_out: str = None,
+                 advise_queries: str = None, resume: bool = False,
+                 generation_id: str = None, vacuum: bool = False, journal_mode: str = 'wal'):
         self.data_dir = Path(data_dir)
         self.db_path = db_path
+        self.workers = workers
+        self.bulk = bulk
+        # Rows per transaction; 0 commits once per table
+        self.batch_size = batch_size
+        self.incremental = incremental
+        # Continue table loads from their ETL_CHECKPOINTS rows
+        self.resume = resume
+        self.convert_types = convert_types
+        self.metrics = ETLMetrics()
+        self.metrics_out = metrics_out
+        # cProfile output for the table load loop
+        self.profile_out = profile_out
+        # Set when building a generation to publish: the build is optimized
+        # and checked before main() swaps it into place
+        self.generation_id = generation_id
+        self.vacuum = vacuum
+        self.journal_mode = journal_mode
+        # Query file the index advisor tunes indexes for
+        self.advise_queries = advise_queries
         self.conn = None
         self.cursor = None
         
+        # CSV files in load order
+        self.csv_files = list(CSV_FILES)
+        
+        # Files split into a parent table and a child table while loading.
+        # Enforcement actions get their own rows instead of rewriting the
+        # violation once per action.
+        self.split_tables = {
+            'SDWA_VIOLATIONS_ENFORCEMENT': {
+                'child_table': 'SDWA_ENFORCEMENT_ACTIONS',
+                'key_columns': ['SUBMISSIONYEARQUARTER', 'PWSID', 'VIOLATION_ID'],
+                'child_columns': [
+                    'ENFORCEMENT_ID',
+                    'ENFORCEMENT_DATE',
+                    'ENFORCEMENT_ACTION_TYPE_CODE',
+                    'ENF_ACTION_CATEGORY',
+                    'ENF_ORIGINATOR_CODE',
+                    'ENF_FIRST_REPORTED_DATE',
+                    'ENF_LAST_REPORTED_DATE'
+                ]
+            }
+        }
+        
         # Define table schemas based on data model
         self.table_schemas = {
             'SDWA_PUB_WATER_SYSTEMS': """
@@ -42,6 +1239,7 @@ class SDWAETLProcessor:
                     PWS_ACTIVITY_CODE TEXT,
                     PWS_DEACTIVATION_DATE TEXT,
                     PWS_TYPE_CODE TEXT,
+                    PWS_TYPE_CODE_DESC TEXT,
                     DBPR_SCHEDULE_CAT_CODE TEXT,
                     CDS_ID TEXT,
                     GW_SW_CODE TEXT,
@@ -126,9 +1324,11 @@ class SDWAETLProcessor:
                     NON_COMPL_PER_END_DATE TEXT,
                     PWS_DEACTIVATION_DATE TEXT,
                     VIOLATION_CODE TEXT,
+                    VIOLATION_CODE_DESC TEXT,
                     VIOLATION_CATEGORY_CODE TEXT,
                     IS_HEALTH_BASED_IND TEXT,
                     CONTAMINANT_CODE TEXT,
+                    CONTAMINANT_CODE_DESC TEXT,
                     VIOL_MEASURE REAL,
                     UNIT_OF_MEASURE TEXT,
                     FEDERAL_MCL TEXT,
@@ -145,18 +1345,30 @@ class SDWAETLProcessor:
                     RULE_CODE TEXT,
                     RULE_GROUP_CODE TEXT,
                     RULE_FAMILY_CODE TEXT,
+                    RULE_FAMILY_CODE_DESC TEXT,
                     VIOL_FIRST_REPORTED_DATE TEXT,
                     VIOL_LAST_REPORTED_DATE TEXT,
-                    ENFORCEMENT_ID TEXT,
+                    PRIMARY KEY (SUBMISSIONYEARQUARTER, PWSID, VIOLATION_ID),
+                    FOREIGN KEY (SUBMISSIONYEARQUARTER, PWSID) 
+                        REFERENCES SDWA_PUB_WATER_SYSTEMS(SUBMISSIONYEARQUARTER, PWSID)
+                )
+            """,
+            
+            'SDWA_ENFORCEMENT_ACTIONS': """
+                CREATE TABLE IF NOT EXISTS SDWA_ENFORCEMENT_ACTIONS (
+                    SUBMISSIONYEARQUARTER TEXT NOT NULL,
+                    PWSID TEXT NOT NULL,
+                    VIOLATION_ID TEXT NOT NULL,
+                    ENFORCEMENT_ID TEXT NOT NULL,
                     ENFORCEMENT_DATE TEXT,
                     ENFORCEMENT_ACTION_TYPE_CODE TEXT,
                     ENF_ACTION_CATEGORY TEXT,
                     ENF_ORIGINATOR_CODE TEXT,
                     ENF_FIRST_REPORTED_DATE TEXT,
                     ENF_LAST_REPORTED_DATE TEXT,
-                    PRIMARY KEY (SUBMISSIONYEARQUARTER, PWSID, VIOLATION_ID),
-                    FOREIGN KEY (SUBMISSIONYEARQUARTER, PWSID) 
-                        REFERENCES SDWA_PUB_WATER_SYSTEMS(SUBMISSIONYEARQUARTER, PWSID)
+                    PRIMARY KEY (SUBMISSIONYEARQUARTER, PWSID, VIOLATION_ID, ENFORCEMENT_ID),
+                    FOREIGN KEY (SUBMISSIONYEARQUARTER, PWSID, VIOLATION_ID) 
+                        REFERENCES SDWA_VIOLATIONS_ENFORCEMENT(SUBMISSIONYEARQUARTER, PWSID, VIOLATION_ID)
                 )
             """,
             
@@ -172,6 +1384,7 @@ class SDWAETLProcessor:
                     SAMPLE_LAST_REPORTED_DATE TEXT,
                     SAR_ID INTEGER NOT NULL,
                     CONTAMINANT_CODE TEXT,
+                    CONTAMINANT_CODE_DESC TEXT,
                     RESULT_SIGN_CODE TEXT,
                     SAMPLE_MEASURE REAL,
                     UNIT_OF_MEASURE TEXT,
@@ -191,6 +1404,7 @@ class SDWAETLProcessor:
                     VISIT_DATE TEXT,
                     AGENCY_TYPE_CODE TEXT,
                     VISIT_REASON_CODE TEXT,
+                    VISIT_REASON_CODE_DESC TEXT,
                     MANAGEMENT_OPS_EVAL_CODE TEXT,
                     SOURCE_WATER_EVAL_CODE TEXT,
                     SECURITY_EVAL_CODE TEXT,
@@ -273,7 +1487,9 @@ class SDWAETLProcessor:
                     NON_COMPL_PER_BEGIN_DATE TEXT,
                     NON_COMPL_PER_END_DATE TEXT,
                     VIOLATION_CODE TEXT,
+                    VIOLATION_CODE_DESC TEXT,
                     CONTAMINANT_CODE TEXT,
+                    CONTAMINANT_CODE_DESC TEXT,
                     FIRST_REPORTED_DATE TEXT,
                     LAST_REPORTED_DATE TEXT,
                     PRIMARY KEY (SUBMISSIONYEARQUARTER, PWSID, PN_VIOLATION_ID),
@@ -292,6 +1508,99 @@ class SDWAETLProcessor:
             """
         }
         
+        # ETL bookkeeping tables
+        self.etl_schemas = {
+            'ETL_MANIFEST': """
+                CREATE TABLE IF NOT EXISTS ETL_MANIFEST (
+                    FILE_NAME TEXT NOT NULL,
+                    TABLE_NAME TEXT NOT NULL,
+                    FILE_SIZE INTEGER NOT NULL,
+                    FILE_MTIME REAL NOT NULL,
+                    CONTENT_HASH TEXT NOT NULL,
+                    ROW_COUNT INTEGER,
+                    LOADED_AT TEXT NOT NULL,
+                    PRIMARY KEY (FILE_NAME)
+                )
+            """,
+            
+            'ETL_CHECKPOINTS': """
+                CREATE TABLE IF NOT EXISTS ETL_CHECKPOINTS (
+                    TABLE_NAME TEXT NOT NULL,
+                    FILE_NAME TEXT NOT NULL,
+                    CONTENT_HASH TEXT NOT NULL,
+                    ROWS_COMMITTED INTEGER NOT NULL,
+                    BYTE_OFFSET INTEGER NOT NULL,
+                    COMPLETED INTEGER NOT NULL DEFAULT 0,
+                    UPDATED_AT TEXT NOT NULL,
+                    PRIMARY KEY (TABLE_NAME)
+                )
+            """,
+            
+            'ETL_GENERATION': """
+                CREATE TABLE IF NOT EXISTS ETL_GENERATION (
+                    GENERATION_ID TEXT NOT NULL,
+                    BUILT_AT TEXT NOT NULL,
+                    DATA_DIR TEXT,
+                    PRIMARY KEY (GENERATION_ID)
+                )
+            """,
+            
+            'ETL_QUARANTINE': """
+                CREATE TABLE IF NOT EXISTS ETL_QUARANTINE (
+                    QUARANTINE_ID INTEGER PRIMARY KEY,
+                    TABLE_NAME TEXT NOT NULL,
+                    FILE_NAME TEXT NOT NULL,
+                    RULE TEXT NOT NULL,
+                    COLUMN_NAME TEXT,
+                    VALUE TEXT,
+                    ACTION TEXT NOT NULL,
+                    ROW_DATA TEXT NOT NULL,
+                    QUARANTINED_AT TEXT NOT NULL
+                )
+            """,
+            
+            'ETL_AGGREGATES': """
+                CREATE TABLE IF NOT EXISTS ETL_AGGREGATES (
+                    TABLE_NAME TEXT NOT NULL,
+                    SOURCE_ROW_COUNTS TEXT NOT NULL,
+                    ROW_COUNT INTEGER,
+                    BUILT_AT TEXT NOT NULL,
+                    PRIMARY KEY (TABLE_NAME)
+                )
+            """
+        }
+        
+        # Rows missing any primary key value are rejected while parsing
+        self.key_columns = {
+            table_name: schema_primary_key(schema_sql)
+            for table_name, schema_sql in self.table_schemas.items()
+        }
+        # Reference code descriptions, loaded once when the run starts
+        self.decoder = CodeDecoder()
+        # Code columns stored with a decoded <column>_DESC column, by table
+        self.description_columns = {
+            table_name: [column for column in DESCRIPTION_COLUMNS
+                         if re.search(rf'\b{column}_DESC\b', schema_sql)]
+            for table_name, schema_sql in self.table_schemas.items()
+        }
+        # Reference rules applied as rows stream in; failures go to ETL_QUARANTINE
+        self.quality = DataQuality(self.table_schemas, self.decoder)
+        
+        # Load-time converters (ISO dates, INTEGER and REAL values) by table
+        self.column_kinds = {}
+        if self.convert_types:
+            self.column_kinds = {
+                table_name: schema_column_kinds(schema_sql)
+                for table_name, schema_sql in self.table_schemas.items()
+            }
+            # A split file's rows carry the child columns too; convert them
+            # with the child table's kinds before they are split off
+            for table_name, split in self.split_tables.items():
+                self.column_kinds[table_name] = {
+                    **self.column_kinds[split['child_table']],
+                    **self.column_kinds[table_name],
+                }
+            
         # Define indexes for performance
         self.indexes = [
             "CREATE INDEX IF NOT EXISTS idx_pws_activity ON SDWA_PUB_WATER_SYSTEMS(PWS_ACTIVITY_CODE)",
@@ -312,13 +1621,191 @@ class SDWAETLProcessor:
             "CREATE INDEX IF NOT EXISTS idx_ref_type ON SDWA_REF_CODE_VALUES(VALUE_TYPE)"
         ]
         
+        # Summary tables rebuilt after loading, so dashboard pages read one
+        # indexed row instead of grouping violations joined to systems
+        self.aggregate_tables = {
+            'AGG_PWS_VIOLATIONS': {
+                'sources': ['SDWA_VIOLATIONS_ENFORCEMENT', 'SDWA_PUB_WATER_SYSTEMS'],
+                'schema': """
+                    CREATE TABLE AGG_PWS_VIOLATIONS (
+                        SUBMISSIONYEARQUARTER TEXT NOT NULL,
+                        PWSID TEXT NOT NULL,
+                        PWS_NAME TEXT,
+                        TOTAL_VIOLATIONS INTEGER NOT NULL,
+                        HEALTH_BASED_VIOLATIONS INTEGER NOT NULL,
+                        UNADDRESSED_VIOLATIONS INTEGER NOT NULL,
+                        UNADDRESSED_HEALTH_BASED_VIOLATIONS INTEGER NOT NULL,
+                        ADDRESSED_VIOLATIONS INTEGER NOT NULL,
+                        RESOLVED_VIOLATIONS INTEGER NOT NULL,
+                        ARCHIVED_VIOLATIONS INTEGER NOT NULL,
+                        PRIMARY KEY (SUBMISSIONYEARQUARTER, PWSID)
+                    )
+                """,
+                'query': """
+                    SELECT v.SUBMISSIONYEARQUARTER, v.PWSID, p.PWS_NAME,
+                           COUNT(*),
+                           SUM(v.IS_HEALTH_BASED_IND = 'Y'),
+                           SUM(v.VIOLATION_STATUS = 'Unaddressed'),
+                           SUM(v.VIOLATION_STATUS = 'Unaddressed' AND v.IS_HEALTH_BASED_IND = 'Y'),
+                           SUM(v.VIOLATION_STATUS = 'Addressed'),
+                           SUM(v.VIOLATION_STATUS = 'Resolved'),
+                           SUM(v.VIOLATION_STATUS = 'Archived')
+                    FROM SDWA_VIOLATIONS_ENFORCEMENT v
+                    LEFT JOIN SDWA_PUB_WATER_SYSTEMS p
+                        ON p.SUBMISSIONYEARQUARTER = v.SUBMISSIONYEARQUARTER AND p.PWSID = v.PWSID
+                    GROUP BY v.SUBMISSIONYEARQUARTER, v.PWSID
+                """,
+                'indexes': [
+                    "CREATE INDEX idx_agg_pws_unaddressed ON AGG_PWS_VIOLATIONS(SUBMISSIONYEARQUARTER, UNADDRESSED_VIOLATIONS)"
+                ]
+            },
+            
+            'AGG_VIOLATION_STATS': {
+                'sources': ['SDWA_VIOLATIONS_ENFORCEMENT'],
+                'schema': """
+                    CREATE TABLE AGG_VIOLATION_STATS (
+                        SUBMISSIONYEARQUARTER TEXT NOT NULL,
+                        TOTAL_VIOLATIONS INTEGER NOT NULL,
+                        HEALTH_BASED_VIOLATIONS INTEGER NOT NULL,
+                        UNADDRESSED_VIOLATIONS INTEGER NOT NULL,
+                        RESOLVED_VIOLATIONS INTEGER NOT NULL,
+                        SYSTEMS_WITH_VIOLATIONS INTEGER NOT NULL,
+                        SYSTEMS_WITH_UNADDRESSED INTEGER NOT NULL,
+                        PRIMARY KEY (SUBMISSIONYEARQUARTER)
+                    )
+                """,
+                'query': """
+                    SELECT SUBMISSIONYEARQUARTER,
+                           COUNT(*),
+                           SUM(IS_HEALTH_BASED_IND = 'Y'),
+                           SUM(VIOLATION_STATUS = 'Unaddressed'),
+                           SUM(VIOLATION_STATUS = 'Resolved'),
+                           COUNT(DISTINCT PWSID),
+                           COUNT(DISTINCT CASE WHEN VIOLATION_STATUS = 'Unaddressed' THEN PWSID END)
+                    FROM SDWA_VIOLATIONS_ENFORCEMENT
+                    GROUP BY SUBMISSIONYEARQUARTER
+                """,
+                'indexes': []
+            },
+            
+            'AGG_CONTAMINANT_SUMMARY': {
+                'sources': ['SDWA_VIOLATIONS_ENFORCEMENT'],
+                'schema': """
+                    CREATE TABLE AGG_CONTAMINANT_SUMMARY (
+                        SUBMISSIONYEARQUARTER TEXT NOT NULL,
+                        RULE_FAMILY_CODE TEXT,
+                        CONTAMINANT_CODE TEXT,
+                        TOTAL_VIOLATIONS INTEGER NOT NULL,
+                        HEALTH_BASED_VIOLATIONS INTEGER NOT NULL,
+                        UNADDRESSED_VIOLATIONS INTEGER NOT NULL,
+                        SYSTEMS_WITH_VIOLATIONS INTEGER NOT NULL
+                    )
+                """,
+                'query': """
+                    SELECT SUBMISSIONYEARQUARTER, RULE_FAMILY_CODE, CONTAMINANT_CODE,
+                           COUNT(*),
+                           SUM(IS_HEALTH_BASED_IND = 'Y'),
+                           SUM(VIOLATION_STATUS = 'Unaddressed'),
+                           COUNT(DISTINCT PWSID)
+                    FROM SDWA_VIOLATIONS_ENFORCEMENT
+                    GROUP BY SUBMISSIONYEARQUARTER, RULE_FAMILY_CODE, CONTAMINANT_CODE
+                """,
+                'indexes': [
+                    "CREATE INDEX idx_agg_contaminant ON AGG_CONTAMINANT_SUMMARY(SUBMISSIONYEARQUARTER, CONTAMINANT_CODE)",
+                    "CREATE INDEX idx_agg_rule_family ON AGG_CONTAMINANT_SUMMARY(SUBMISSIONYEARQUARTER, RULE_FAMILY_CODE)"
+                ]
+            }
+        }
+        
+        # Per-area map measures; AGG_MAP_DOCUMENTS serializes them per
+        # quarter and level
+        self.aggregate_tables['AGG_GEO_SUMMARY'] = {
+            'sources': ['SDWA_GEOGRAPHIC_AREAS', 'SDWA_PUB_WATER_SYSTEMS', 'SDWA_VIOLATIONS_ENFORCEMENT',
+                        'SDWA_LCR_SAMPLES'],
+            'schema': f"""
+                CREATE TABLE AGG_GEO_SUMMARY (
+                    SUBMISSIONYEARQUARTER TEXT NOT NULL,
+                    AREA_LEVEL TEXT NOT NULL,
+                    AREA_NAME TEXT NOT NULL,
+                    {', '.join(f'{column} INTEGER NOT NULL' for column, _ in GEO_MEASURES)},
+                    PRIMARY KEY (SUBMISSIONYEARQUARTER, AREA_LEVEL, AREA_NAME)
+                )
+            """,
+            'query': geo_summary_query(),
+            'indexes': [
+                "CREATE INDEX idx_agg_geo_open ON AGG_GEO_SUMMARY(SUBMISSIONYEARQUARTER, AREA_LEVEL, OPEN_HEALTH_BASED_VIOLATIONS)"
+            ]
+        }
+        
+        # Dashboard county totals: the map's county rows (same systems, same
+        # allocated population) plus violation totals, built after them
+        self.aggregate_tables['AGG_COUNTY_SUMMARY'] = {
+            'sources': self.aggregate_tables['AGG_GEO_SUMMARY']['sources'],
+            'schema': """
+                CREATE TABLE AGG_COUNTY_SUMMARY (
+                    SUBMISSIONYEARQUARTER TEXT NOT NULL,
+                    COUNTY_SERVED TEXT NOT NULL,
+                    SYSTEM_COUNT INTEGER NOT NULL,
+                    ACTIVE_SYSTEM_COUNT INTEGER NOT NULL,
+                    POPULATION_SERVED INTEGER NOT NULL,
+                    TOTAL_VIOLATIONS INTEGER NOT NULL,
+                    HEALTH_BASED_VIOLATIONS INTEGER NOT NULL,
+                    UNADDRESSED_VIOLATIONS INTEGER NOT NULL,
+                    SYSTEMS_WITH_VIOLATIONS INTEGER NOT NULL,
+                    PRIMARY KEY (SUBMISSIONYEARQUARTER, COUNTY_SERVED)
+                )
+            """,
+            'query': f"""
+                WITH county_violations AS (
+                    SELECT c.SUBMISSIONYEARQUARTER, c.AREA_NAME,
+                           COUNT(*) AS TOTAL,
+                           SUM(v.IS_HEALTH_BASED_IND = 'Y') AS HEALTH_BASED,
+                           SUM(v.VIOLATION_STATUS = 'Unaddressed') AS UNADDRESSED,
+                           COUNT(DISTINCT v.PWSID) AS SYSTEMS
+                    FROM ({geo_area_systems(GEO_LEVELS['county'])}) c
+                    JOIN SDWA_VIOLATIONS_ENFORCEMENT v
+                        ON v.SUBMISSIONYEARQUARTER = c.SUBMISSIONYEARQUARTER AND v.PWSID = c.PWSID
+                    GROUP BY c.SUBMISSIONYEARQUARTER, c.AREA_NAME
+                )
+                SELECT g.SUBMISSIONYEARQUARTER, g.AREA_NAME,
+                       g.SYSTEM_COUNT, g.ACTIVE_SYSTEM_COUNT, g.POPULATION_SERVED,
+                       COALESCE(v.TOTAL, 0),
+                       COALESCE(v.HEALTH_BASED, 0),
+                       COALESCE(v.UNADDRESSED, 0),
+                       COALESCE(v.SYSTEMS, 0)
+                FROM AGG_GEO_SUMMARY g
+                LEFT JOIN county_violations v
+                    ON v.SUBMISSIONYEARQUARTER = g.SUBMISSIONYEARQUARTER AND v.AREA_NAME = g.AREA_NAME
+                WHERE g.AREA_LEVEL = 'county'
+            """,
+            'indexes': []
+        }
+        
+        # Child rows embedded in each SDWA_SYSTEM_DOCUMENTS document, by
+        # section: source table and the order rows are listed in
+        self.document_sections = {
+            'facilities': ('SDWA_FACILITIES', 'FACILITY_ID'),
+            'violations': ('SDWA_VIOLATIONS_ENFORCEMENT', 'NON_COMPL_PER_BEGIN_DATE DESC, VIOLATION_ID'),
+            'enforcement_actions': ('SDWA_ENFORCEMENT_ACTIONS', 'VIOLATION_ID, ENFORCEMENT_DATE, ENFORCEMENT_ID'),
+            'lcr_samples': ('SDWA_LCR_SAMPLES', 'SAMPLING_END_DATE DESC, SAMPLE_ID, SAR_ID'),
+            'geographic_areas': ('SDWA_GEOGRAPHIC_AREAS', 'GEO_ID, AREA_TYPE_CODE'),
+            'site_visits': ('SDWA_SITE_VISITS', 'VISIT_DATE DESC, VISIT_ID')
+        }
+        
     def connect_db(self):
         """Connect to SQLite database"""
         try:
             self.conn = sqlite3.connect(self.db_path)
             self.cursor = self.conn.cursor()
-            # Enable foreign keys
-            self.cursor.execute("PRAGMA foreign_keys = ON")
+            if self.bulk:
+                for pragma in BULK_LOAD_PRAGMAS:
+                    self.cursor.execute(pragma)
+            if self.bulk or self.incremental:
+                # Defer foreign key enforcement to a single check after loading
+                self.cursor.execute("PRAGMA foreign_keys = OFF")
+            else:
+                # Enable foreign keys
+                self.cursor.execute("PRAGMA foreign_keys = ON")
             logger.info(f"Connected to database: {self.db_path}")
         except sqlite3.Error as e:
             logger.error(f"Database connection failed: {e}")
@@ -341,6 +1828,7 @@ class SDWAETLProcessor:
                 'SDWA_PUB_WATER_SYSTEMS',
                 'SDWA_FACILITIES',
                 'SDWA_VIOLATIONS_ENFORCEMENT',
+                'SDWA_ENFORCEMENT_ACTIONS',
                 'SDWA_LCR_SAMPLES',
                 'SDWA_SITE_VISITS',
                 'SDWA_GEOGRAPHIC_AREAS',
@@ -352,8 +1840,12 @@ class SDWAETLProcessor:
             for table_name in table_order:
                 if table_name in self.table_schemas:
                     self.cursor.execute(self.table_schemas[table_name])
+                    self.add_missing_columns(table_name)
                     logger.info(f"Created table: {table_name}")
                     
+            for schema_sql in self.etl_schemas.values():
+                self.cursor.execute(schema_sql)
+                
             self.conn.commit()
             logger.info("Schema creation completed")
             
@@ -362,6 +1854,59 @@ class SDWAETLProcessor:
             self.conn.rollback()
             raise
             
+    def add_missing_columns(self, table_name: str):
+        """Add columns a table's schema gained since an existing database was built
+        
+        New description columns are filled from SDWA_REF_CODE_VALUES, since
+        an incremental run only reloads changed files.
+        """
+        self.cursor.execute(f"PRAGMA table_info({table_name})")
+        existing = {row[1] for row in self.cursor.fetchall()}
+        schema_sql = self.table_schemas[table_name]
+        for name, sql_type in re.findall(r'^\s*(\w+)\s+(TEXT|INTEGER|REAL)\b', schema_sql, re.MULTILINE):
+            if name in existing:
+                continue
+            self.cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {name} {sql_type}")
+            logger.info(f"Added column {table_name}.{name}")
+            code_column = name[:-len('_DESC')]
+            if name.endswith('_DESC') and code_column in self.description_columns.get(table_name, []):
+                self.cursor.execute(
+                    f"""UPDATE {table_name} SET {name} = (
+                            SELECT VALUE_DESCRIPTION FROM SDWA_REF_CODE_VALUES r
+                            WHERE r.VALUE_TYPE = ? AND r.VALUE_CODE = {table_name}.{code_column}
+                        )""",
+                    (CODE_COLUMN_VALUE_TYPES.get(code_column, code_column),)
+                )
+                
+    def description_plan(self, table_name: str, columns: list):
+        """Return the insert columns for a CSV header and the codes to decode
+        
+        Description columns are appended after the CSV columns, unless the
+        CSV already has one, which is then overwritten with the decoded value.
+        The codes are (index, VALUE_TYPE, target) with target the CSV index of
+        an existing description column, or None for appended ones.
+        """
+        described = [column for column in self.description_columns.get(table_name, []) if column in columns]
+        code_columns = [
+            (columns.index(column), CODE_COLUMN_VALUE_TYPES.get(column, column),
+             columns.index(f"{column}_DESC") if f"{column}_DESC" in columns else None)
+            for column in described
+        ]
+        appended = [f"{column}_DESC" for column in described if f"{column}_DESC" not in columns]
+        return columns + appended, code_columns
+        
+    def described_rows(self, table_name: str, columns: list, code_columns: list, rows):
+        """Yield rows with their description columns, learning reference rows as they load"""
+        if table_name == 'SDWA_REF_CODE_VALUES':
+            indexes = [columns.index(column) for column in ('VALUE_TYPE', 'VALUE_CODE', 'VALUE_DESCRIPTION')]
+            for row in rows:
+                self.decoder.add(*[row[index] for index in indexes])
+                yield row
+        elif code_columns:
+            yield from self.decoder.with_descriptions(rows, code_columns)
+        else:
+            yield from rows
+            
     def create_indexes(self):
         """Create database indexes"""
         logger.info("Creating indexes...")
@@ -378,56 +1923,1007 @@ class SDWAETLProcessor:
             self.conn.rollback()
             raise
             
-    def load_csv_file(self, csv_file: Path, table_name: str):
-        """Load a CSV file into a database table"""
-        logger.info(f"Loading {csv_file.name} into {table_name}...")
+    def table_row_counts(self, table_names: list):
+        """Return current row counts for the given tables"""
+        counts = {}
+        for table_name in table_names:
+            self.cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
+            counts[table_name] = self.cursor.fetchone()[0]
+        return counts
+        
+    def build_aggregates(self):
+        """Materialize summary tables and record their source row counts"""
+        logger.info("Building aggregate tables...")
+        
+        try:
+            for table_name, aggregate in self.aggregate_tables.items():
+                self.cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
+                self.cursor.execute(aggregate['schema'])
+                self.cursor.execute(f"INSERT INTO {table_name} {aggregate['query']}")
+                row_count = self.cursor.rowcount
+                for index_sql in aggregate['indexes']:
+                    self.cursor.execute(index_sql)
+                    
+                # Source row counts let readers detect a stale summary
+                self.cursor.execute(
+                    """INSERT OR REPLACE INTO ETL_AGGREGATES
+                       (TABLE_NAME, SOURCE_ROW_COUNTS, ROW_COUNT, BUILT_AT)
+                       VALUES (?, ?, ?, ?)""",
+                    (table_name, json.dumps(self.table_row_counts(aggregate['sources'])),
+                     row_count, datetime.now().isoformat())
+                )
+                logger.info(f"  Built {table_name}: {row_count:,} rows")
+                
+            self.conn.commit()
+            
+        except sqlite3.Error as e:
+            logger.error(f"Aggregate build failed: {e}")
+            self.conn.rollback()
+            raise
+            
+    def stale_aggregates(self):
+        """Return aggregate tables whose source row counts have changed"""
+        self.cursor.execute("SELECT TABLE_NAME, SOURCE_ROW_COUNTS FROM ETL_AGGREGATES")
+        recorded = self.cursor.fetchall()
+        return [
+            table_name for table_name, source_counts in recorded
+            if self.table_row_counts(list(json.loads(source_counts))) != json.loads(source_counts)
+        ]
+        
+    def build_lcr_analytics(self):
+        """Build AGG_LCR_SERIES and AGG_LCR_SYSTEM_STATS from the PB90/CU90 results
+        
+        Every system's results per contaminant form a series ordered by
+        sampling period. Each point gets rolling statistics over the last
+        LCR_ROLLING_WINDOW results, an action-level exceedance flag and the
+        run of consecutive exceedances it ends; each series gets summary
+        statistics. Whole series are computed in batches, with NumPy when it
+        is installed.
+        """
+        backend = 'numpy' if np is not None else 'python'
+        compute = lcr_statistics_numpy if np is not None else lcr_statistics_python
+        logger.info(f"Building LCR analytics ({backend})...")
+        window = LCR_ROLLING_WINDOW
+        
+        def sortable_date(value):
+            # Raw-value loads keep MM/DD/YYYY dates, which do not sort
+            if self.convert_types or not value:
+                return value
+            try:
+                return to_iso_date(value)
+            except ValueError:
+                return value
+                
+        def round_measure(value):
+            return round(value, 6) if value is not None else None
+            
+        def write_batch(series):
+            points, totals = compute([(key, level, [sample[-1] for sample in samples])
+                                      for key, level, samples in series], window)
+            point_rows = []
+            position = 0
+            for key, level, samples in series:
+                for sequence, (end_date, start_date, sample_id, sar_id, measure) in enumerate(samples, 1):
+                    point_rows.append((
+                        *key, sequence, end_date, start_date, sample_id, sar_id, measure,
+                        round_measure(points['rolling_mean'][position]),
+                        points['rolling_max'][position],
+                        int(points['exceeds'][position]),
+                        points['streak'][position],
+                        round_measure(points['change'][position])
+                    ))
+                    position += 1
+            self.cursor.executemany(f"INSERT INTO AGG_LCR_SERIES VALUES ({','.join('?' * 14)})", point_rows)
+            
+            stats_rows = []
+            for number, (key, level, samples) in enumerate(series):
+                last_exceedance = totals['last_exceedance'][number]
+                stats_rows.append((
+                    *key, level, len(samples), samples[0][0], samples[-1][0], samples[-1][-1],
+                    int(samples[-1][-1] > level),
+                    round_measure(totals['mean'][number]),
+                    round_measure(totals['median'][number]),
+                    round_measure(totals['p90'][number]),
+                    totals['max'][number],
+                    totals['exceedances'][number],
+                    samples[last_exceedance][0] if last_exceedance >= 0 else None
+                ))
+            self.cursor.executemany(f"INSERT INTO AGG_LCR_SYSTEM_STATS VALUES ({','.join('?' * 15)})", stats_rows)
+            return len(point_rows), len(stats_rows)
+            
+        try:
+            self.cursor.execute("DROP TABLE IF EXISTS AGG_LCR_SERIES")
+            self.cursor.execute("DROP TABLE IF EXISTS AGG_LCR_SYSTEM_STATS")
+            self.cursor.execute("""
+                CREATE TABLE AGG_LCR_SERIES (
+                    SUBMISSIONYEARQUARTER TEXT NOT NULL,
+                    PWSID TEXT NOT NULL,
+                    CONTAMINANT_CODE TEXT NOT NULL,
+                    SEQUENCE INTEGER NOT NULL,
+                    SAMPLING_END_DATE TEXT,
+                    SAMPLING_START_DATE TEXT,
+                    SAMPLE_ID TEXT,
+                    SAR_ID INTEGER,
+                    SAMPLE_MEASURE REAL NOT NULL,
+                    ROLLING_MEAN REAL NOT NULL,
+                    ROLLING_MAX REAL NOT NULL,
+                    EXCEEDS_ACTION_LEVEL INTEGER NOT NULL,
+                    CONSECUTIVE_EXCEEDANCES INTEGER NOT NULL,
+                    CHANGE_FROM_PREVIOUS REAL,
+                    PRIMARY KEY (SUBMISSIONYEARQUARTER, PWSID, CONTAMINANT_CODE, SEQUENCE)
+                )
+            """)
+            self.cursor.execute("""
+                CREATE TABLE AGG_LCR_SYSTEM_STATS (
+                    SUBMISSIONYEARQUARTER TEXT NOT NULL,
+                    PWSID TEXT NOT NULL,
+                    CONTAMINANT_CODE TEXT NOT NULL,
+                    ACTION_LEVEL REAL NOT NULL,
+                    SAMPLE_COUNT INTEGER NOT NULL,
+                    FIRST_SAMPLE_DATE TEXT,
+                    LAST_SAMPLE_DATE TEXT,
+                    LATEST_MEASURE REAL NOT NULL,
+                    LATEST_EXCEEDS INTEGER NOT NULL,
+                    MEAN_MEASURE REAL NOT NULL,
+                    MEDIAN_MEASURE REAL NOT NULL,
+                    P90_MEASURE REAL NOT NULL,
+                    MAX_MEASURE REAL NOT NULL,
+                    EXCEEDANCE_COUNT INTEGER NOT NULL,
+                    LAST_EXCEEDANCE_DATE TEXT,
+                    PRIMARY KEY (SUBMISSIONYEARQUARTER, PWSID, CONTAMINANT_CODE)
+                )
+            """)
+            
+            codes = list(LCR_ACTION_LEVELS)
+            samples = self.conn.execute(f"""
+                SELECT SUBMISSIONYEARQUARTER, PWSID, CONTAMINANT_CODE,
+                       SAMPLING_END_DATE, SAMPLING_START_DATE, SAMPLE_ID, SAR_ID, SAMPLE_MEASURE
+                FROM SDWA_LCR_SAMPLES
+                WHERE CONTAMINANT_CODE IN ({','.join('?' * len(codes))}) AND SAMPLE_MEASURE IS NOT NULL
+                ORDER BY SUBMISSIONYEARQUARTER, PWSID, CONTAMINANT_CODE
+            """, codes)
+            
+            batch = []
+            batch_rows = 0
+            point_count = 0
+            series_count = 0
+            for key, rows in iter_key_groups(samples, key_count=3):
+                ordered = sorted(
+                    ((sortable_date(end_date), sortable_date(start_date), sample_id, sar_id, float(measure))
+                     for end_date, start_date, sample_id, sar_id, measure in rows),
+                    key=lambda sample: (sample[0] or '', sample[1] or '', str(sample[2]), sample[3] or 0)
+                )
+                batch.append((key, LCR_ACTION_LEVELS[key[2]], ordered))
+                batch_rows += len(ordered)
+                if batch_rows >= LCR_BATCH_ROWS:
+                    points, series = write_batch(batch)
+                    point_count += points
+                    series_count += series
+                    batch = []
+                    batch_rows = 0
+            if batch:
+                points, series = write_batch(batch)
+                point_count += points
+                series_count += series
+                
+            self.cursor.execute("""
+                CREATE INDEX idx_lcr_series_exceeds
+                ON AGG_LCR_SERIES(SUBMISSIONYEARQUARTER, CONTAMINANT_CODE, EXCEEDS_ACTION_LEVEL, SAMPLING_END_DATE)
+            """)
+            self.cursor.execute("""
+                CREATE INDEX idx_lcr_stats_latest
+                ON AGG_LCR_SYSTEM_STATS(SUBMISSIONYEARQUARTER, CONTAMINANT_CODE, LATEST_EXCEEDS, LATEST_MEASURE)
+            """)
+            
+            for table_name, row_count in (('AGG_LCR_SERIES', point_count), ('AGG_LCR_SYSTEM_STATS', series_count)):
+                self.cursor.execute(
+                    """INSERT OR REPLACE INTO ETL_AGGREGATES
+                       (TABLE_NAME, SOURCE_ROW_COUNTS, ROW_COUNT, BUILT_AT)
+                       VALUES (?, ?, ?, ?)""",
+                    (table_name, json.dumps(self.table_row_counts(['SDWA_LCR_SAMPLES'])),
+                     row_count, datetime.now().isoformat())
+                )
+            self.conn.commit()
+            logger.info(f"  Built {series_count:,} LCR series ({point_count:,} results)")
+            
+        except sqlite3.Error as e:
+            logger.error(f"LCR analytics build failed: {e}")
+            self.conn.rollback()
+            raise
+            
+    def build_map_documents(self):
+        """Serialize AGG_GEO_SUMMARY into one JSON map document per quarter and level
+        
+        A map load is then a single primary-key fetch of ready-to-send JSON;
+        see read_map_document for the layout.
+        """
+        logger.info("Building map documents...")
         
         try:
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                csv_reader = csv.DictReader(f)
+            self.cursor.execute("DROP TABLE IF EXISTS AGG_MAP_DOCUMENTS")
+            self.cursor.execute("""
+                CREATE TABLE AGG_MAP_DOCUMENTS (
+                    SUBMISSIONYEARQUARTER TEXT NOT NULL,
+                    AREA_LEVEL TEXT NOT NULL,
+                    AREA_COUNT INTEGER NOT NULL,
+                    DOCUMENT TEXT NOT NULL,
+                    DOCUMENT_BYTES INTEGER NOT NULL,
+                    PRIMARY KEY (SUBMISSIONYEARQUARTER, AREA_LEVEL)
+                )
+            """)
+            
+            areas = {}
+            for row in self.conn.execute(f"""
+                SELECT SUBMISSIONYEARQUARTER, AREA_LEVEL, AREA_NAME,
+                       {', '.join(column for column, _ in GEO_MEASURES)}
+                FROM AGG_GEO_SUMMARY
+                ORDER BY SUBMISSIONYEARQUARTER, AREA_LEVEL, AREA_NAME
+            """):
+                areas.setdefault(row[:2], {})[row[2]] = list(row[3:])
+                
+            # Every loaded quarter gets every level, so a map fetch never misses
+            quarters = [row[0] for row in self.conn.execute(
+                "SELECT DISTINCT SUBMISSIONYEARQUARTER FROM SDWA_PUB_WATER_SYSTEMS ORDER BY 1"
+            )]
+            documents = []
+            for quarter in quarters:
+                for level in GEO_LEVELS:
+                    document = {
+                        'quarter': quarter,
+                        'level': level,
+                        'columns': [name for _, name in GEO_MEASURES],
+                        'areas': areas.get((quarter, level), {})
+                    }
+                    serialized = json.dumps(document, separators=(',', ':'))
+                    documents.append((quarter, level, len(document['areas']), serialized,
+                                      len(serialized.encode('utf-8'))))
+            self.cursor.executemany("INSERT INTO AGG_MAP_DOCUMENTS VALUES (?, ?, ?, ?, ?)", documents)
+            
+            self.cursor.execute(
+                """INSERT OR REPLACE INTO ETL_AGGREGATES
+                   (TABLE_NAME, SOURCE_ROW_COUNTS, ROW_COUNT, BUILT_AT)
+                   VALUES (?, ?, ?, ?)""",
+                ('AGG_MAP_DOCUMENTS', json.dumps(self.table_row_counts(self.aggregate_tables['AGG_GEO_SUMMARY']['sources'])),
+                 len(documents), datetime.now().isoformat())
+            )
+            self.conn.commit()
+            logger.info(f"  Built {len(documents):,} map documents "
+                        f"({sum(document[4] for document in documents):,} bytes)")
+            
+        except sqlite3.Error as e:
+            logger.error(f"Map document build failed: {e}")
+            self.conn.rollback()
+            raise
+            
+    def build_documents(self):
+        """Build SDWA_SYSTEM_DOCUMENTS: one compressed detail document per system and quarter
+        
+        Each document holds the system row, its child rows by section and
+        descriptions for the reference codes it contains. Every source is
+        read once in (SUBMISSIONYEARQUARTER, PWSID) order along its primary
+        key and merged with the systems, so only one system's rows are in
+        memory at a time. See decode_document for the stored layout.
+        """
+        logger.info("Building system documents...")
+        
+        if not self.decoder.descriptions:
+            self.decoder.load(self.conn)
+        descriptions = self.decoder.descriptions
+        
+        def row_columns(cursor):
+            # Columns after the two key columns, and the positions of those holding codes
+            columns = [description[0] for description in cursor.description][2:]
+            return columns, self.decoder.code_columns(columns)
+            
+        def collect_codes(rows, code_columns, codes):
+            for row in rows:
+                for index, column, value_type in code_columns:
+                    description = descriptions.get((value_type, row[index]))
+                    if description is not None:
+                        codes.setdefault(column, {})[row[index]] = description
+                        
+        def take(section, key):
+            # Rows of the section for key, skipping keys without a system
+            state = sections[section]
+            while state[1] is not None and state[1][0] < key:
+                state[1] = next(state[0], None)
+            if state[1] is not None and state[1][0] == key:
+                rows = state[1][1]
+                state[1] = next(state[0], None)
+                return rows
+            return []
+            
+        try:
+            # Replaced before any read cursor opens: DROP TABLE fails while
+            # statements are pending
+            self.cursor.execute("DROP TABLE IF EXISTS SDWA_SYSTEM_DOCUMENTS")
+            self.cursor.execute("""
+                CREATE TABLE SDWA_SYSTEM_DOCUMENTS (
+                    SUBMISSIONYEARQUARTER TEXT NOT NULL,
+                    PWSID TEXT NOT NULL,
+                    DOCUMENT BLOB NOT NULL,
+                    DOCUMENT_BYTES INTEGER NOT NULL,
+                    PRIMARY KEY (SUBMISSIONYEARQUARTER, PWSID)
+                )
+            """)
+            insert_sql = "INSERT INTO SDWA_SYSTEM_DOCUMENTS VALUES (?, ?, ?, ?)"
+            
+            # One open cursor per section, each positioned on its next group
+            sections = {}
+            for section, (table_name, order) in self.document_sections.items():
+                cursor = self.conn.execute(
+                    f"SELECT * FROM {table_name} ORDER BY SUBMISSIONYEARQUARTER, PWSID, {order}"
+                )
+                groups = iter_key_groups(cursor)
+                sections[section] = [groups, next(groups, None), *row_columns(cursor)]
+                
+            systems = self.conn.execute(
+                "SELECT * FROM SDWA_PUB_WATER_SYSTEMS ORDER BY SUBMISSIONYEARQUARTER, PWSID"
+            )
+            system_columns, system_codes = row_columns(systems)
+            batch = []
+            document_count = 0
+            raw_bytes = 0
+            stored_bytes = 0
+            for key, (system,) in iter_key_groups(systems):
+                codes = {}
+                collect_codes([system], system_codes, codes)
+                document = {
+                    'system': {column: value for column, value in zip(system_columns, system)
+                               if value is not None}
+                }
+                for section in self.document_sections:
+                    rows = take(section, key)
+                    columns, code_columns = sections[section][2:]
+                    collect_codes(rows, code_columns, codes)
+                    document[section] = {'columns': columns, 'rows': rows}
+                document['codes'] = codes
+                
+                raw = json.dumps(document, separators=(',', ':')).encode('utf-8')
+                # Level 1: most of the size reduction of the default level at a fraction of the time
+                blob = zlib.compress(raw, 1)
+                raw_bytes += len(raw)
+                stored_bytes += len(blob)
+                batch.append((key[0], key[1], blob, len(raw)))
+                if len(batch) >= 1000:
+                    self.cursor.executemany(insert_sql, batch)
+                    document_count += len(batch)
+                    batch = []
+            self.cursor.executemany(insert_sql, batch)
+            document_count += len(batch)
+            
+            # Recorded with the aggregates so stale documents are detectable
+            sources = ['SDWA_PUB_WATER_SYSTEMS'] + [table for table, _ in self.document_sections.values()]
+            self.cursor.execute(
+                """INSERT OR REPLACE INTO ETL_AGGREGATES
+                   (TABLE_NAME, SOURCE_ROW_COUNTS, ROW_COUNT, BUILT_AT)
+                   VALUES (?, ?, ?, ?)""",
+                ('SDWA_SYSTEM_DOCUMENTS', json.dumps(self.table_row_counts(sources)),
+                 document_count, datetime.now().isoformat())
+            )
+            self.conn.commit()
+            logger.info(f"  Built {document_count:,} documents "
+                        f"({stored_bytes:,} bytes compressed from {raw_bytes:,})")
+            
+        except sqlite3.Error as e:
+            logger.error(f"System document build failed: {e}")
+            self.conn.rollback()
+            raise
+            
+    def build_search_index(self):
+        """Build the SDWA_SEARCH full-text index over water systems
+        
+        One FTS5 document per system and quarter, covering name, PWSID, city,
+        organization and the cities, counties and zip codes served. Prefix
+        indexes keep search-as-you-type queries off full scans.
+        """
+        logger.info("Building search index...")
+        
+        try:
+            self.cursor.execute("DROP TABLE IF EXISTS SDWA_SEARCH")
+            self.cursor.execute("""
+                CREATE VIRTUAL TABLE SDWA_SEARCH USING fts5(
+                    PWS_NAME,
+                    PWSID,
+                    CITY_NAME,
+                    ORG_NAME,
+                    CITIES_SERVED,
+                    COUNTIES_SERVED,
+                    ZIPS_SERVED,
+                    SUBMISSIONYEARQUARTER UNINDEXED,
+                    prefix = '2 3 4'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Skipping search index (FTS5 unavailable): {e}")
+            return
+            
+        try:
+            self.cursor.execute("""
+                INSERT INTO SDWA_SEARCH (
+                    PWS_NAME, PWSID, CITY_NAME, ORG_NAME,
+                    CITIES_SERVED, COUNTIES_SERVED, ZIPS_SERVED, SUBMISSIONYEARQUARTER
+                )
+                SELECT p.PWS_NAME, p.PWSID, p.CITY_NAME, p.ORG_NAME,
+                       g.CITIES, g.COUNTIES, g.ZIPS, p.SUBMISSIONYEARQUARTER
+                FROM SDWA_PUB_WATER_SYSTEMS p
+                LEFT JOIN (
+                    SELECT SUBMISSIONYEARQUARTER, PWSID,
+                           group_concat(DISTINCT CITY_SERVED) AS CITIES,
+                           group_concat(DISTINCT COUNTY_SERVED) AS COUNTIES,
+                           group_concat(DISTINCT ZIP_CODE_SERVED) AS ZIPS
+                    FROM SDWA_GEOGRAPHIC_AREAS
+                    GROUP BY SUBMISSIONYEARQUARTER, PWSID
+                ) g ON g.SUBMISSIONYEARQUARTER = p.SUBMISSIONYEARQUARTER AND g.PWSID = p.PWSID
+            """)
+            self.conn.commit()
+            logger.info(f"Indexed {self.cursor.rowcount:,} water systems for search")
+            
+        except sqlite3.Error as e:
+            logger.error(f"Search index build failed: {e}")
+            self.conn.rollback()
+            raise
+            
+    def load_csv_file(self, csv_file, table_name: str, into: dict = None):
+        """Load a CSV file into a database table
+        
+        Rows are converted according to table_name but may be inserted into
+        other tables (e.g. staging tables): into maps table names, including
+        the child table of a split file, to target tables. Loads into the
+        table itself record an ETL_CHECKPOINTS row with every commit. Rows
+        failing a data-quality rule are quarantined in the same transactions.
+        Returns the number of CSV rows loaded.
+        """
+        if not isinstance(csv_file, CSVSource):
+            csv_file = CSVSource(csv_file)
+        targets = into or {}
+        target = targets.get(table_name, table_name)
+        
+        start = None
+        if not into:
+            start = self.checkpoint_start(csv_file, table_name)
+            if start is None:
+                return None
+        logger.info(f"Loading {csv_file.name} into {target}...")
+        
+        try:
+            with self.metrics.phase('load', target, csv_file.stat().st_size) as metrics, \
+                    csv_file.open_binary() as raw:
+                lines = OffsetLineReader(raw)
                 
                 # Get column names from CSV
-                columns = csv_reader.fieldnames
+                columns = next(csv.reader([lines.readline()]))
+                if start and start['offset']:
+                    lines.seek(start['offset'], start['digest'])
+                csv_reader = csv.reader(lines)
                 
-                # Prepare insert statement
-                placeholders = ','.join(['?' for _ in columns])
-                insert_sql = f"INSERT OR REPLACE INTO {table_name} ({','.join(columns)}) VALUES ({placeholders})"
+                # Prepare insert statement, with decoded description columns
+                insert_columns, code_columns = self.description_plan(table_name, columns)
+                placeholders = ','.join(['?' for _ in insert_columns])
+                insert_sql = f"INSERT OR REPLACE INTO {target} ({','.join(insert_columns)}) VALUES ({placeholders})"
                 
-                # Track progress
+                # Track progress while rows stream through executemany
                 row_count = 0
-                batch_size = 1000
-                batch_data = []
+                errors = ConversionErrors()
+                column_kinds = self.column_kinds.get(table_name)
                 
-                for row in csv_reader:
-                    # Skip rows with missing primary key fields for violations table
-                    if table_name == 'SDWA_VIOLATIONS_ENFORCEMENT' and not row.get('VIOLATION_ID'):
-                        continue
-                        
-                    # Convert empty strings to None for proper NULL handling
-                    row_values = [row[col] if row[col] != '' else None for col in columns]
-                    batch_data.append(row_values)
+                # A load from the top replaces the table's quarantined rows
+                self.quality.load_reference_state(self.conn)
+                if not start or not start['offset']:
+                    self.quality.reset_table(self.cursor, table_name)
                     
-                    if len(batch_data) >= batch_size:
-                        self.cursor.executemany(insert_sql, batch_data)
-                        row_count += len(batch_data)
-                        batch_data = []
-                        
+                def counted_rows():
+                    nonlocal row_count
+                    parsed = iter_row_values(table_name, columns, csv_reader, column_kinds,
+                                             errors, self.key_columns.get(table_name))
+                    checked = self.quality.check(table_name, csv_file.name, columns, parsed)
+                    for row_values in self.described_rows(table_name, columns, code_columns, checked):
+                        # Counted before yielding, so a batch cut by islice is fully counted
+                        row_count += 1
+                        yield row_values
                         if row_count % 10000 == 0:
                             logger.info(f"  Processed {row_count:,} rows...")
+                            
+                def before_commit(completed: bool = False):
+                    # Quarantined rows and the checkpoint go in the same
+                    # transaction as the rows they cover
+                    self.quality.record(table_name, csv_file.name, columns, errors)
+                    self.quality.flush(self.cursor)
+                    if start:
+                        self.save_checkpoint(table_name, csv_file, lines.digest.hexdigest(),
+                                             start['rows'] + row_count, lines.offset, completed)
+                        if completed:
+                            self.save_manifest(csv_file, table_name, csv_file.content_hash(lines.digest),
+                                               start['rows'] + row_count)
+                        
+                rows = counted_rows()
+                if table_name in self.split_tables:
+                    metrics['batches'] = self.insert_split_rows(table_name, insert_columns, rows, targets,
+                                                                before_commit)
+                elif self.batch_size > 0:
+                    # Commit every batch_size rows
+                    while True:
+                        loaded = row_count
+                        self.cursor.executemany(insert_sql, islice(rows, self.batch_size))
+                        if row_count == loaded:
+                            break
+                        before_commit()
+                        self.conn.commit()
+                        metrics['batches'] += 1
+                else:
+                    # One transaction for the whole table
+                    self.cursor.executemany(insert_sql, rows)
+                    metrics['batches'] += 1
+                    
+                before_commit(completed=True)
+                self.conn.commit()
+                logger.info(f"  Loaded {row_count:,} rows into {target}")
+                errors.log(table_name)
+                self.quality.log(table_name)
+                metrics.update(
+                    rows=row_count,
+                    rejected_rows=errors.skipped + self.quality.rejected(table_name),
+                    conversion_failures=errors.rows,
+                    rule_failures=dict(self.quality.counts.get(table_name, {}))
+                )
+                return row_count
                 
-                # Insert remaining rows
-                if batch_data:
-                    self.cursor.executemany(insert_sql, batch_data)
-                    row_count += len(batch_data)
+        except Exception as e:
+            logger.error(f"Failed to load {csv_file.name}: {e}")
+            self.conn.rollback()
+            raise
+            
+    def checkpoint_start(self, csv_file: CSVSource, table_name: str):
+        """Return where to start loading a file: byte offset, rows already committed and prefix hash
+        
+        A checkpoint's hash covers the file's bytes before its offset (all of
+        them once completed), so loads hash what they stream and only resume
+        reads a file to check it. Without resume every load starts from the
+        top. With resume a table whose checkpoint matches the file continues
+        from the recorded offset, or returns None if it was completed. A
+        checkpoint for different file content is discarded along with the
+        table's partially loaded rows.
+        """
+        start = {'digest': hashlib.sha256(), 'offset': 0, 'rows': 0}
+        if not self.resume:
+            return start
+            
+        self.cursor.execute(
+            "SELECT CONTENT_HASH, ROWS_COMMITTED, BYTE_OFFSET, COMPLETED FROM ETL_CHECKPOINTS WHERE TABLE_NAME = ?",
+            (table_name,)
+        )
+        previous = self.cursor.fetchone()
+        if not previous:
+            return start
+            
+        digest, at_end = csv_file.stream_digest(previous[2])
+        if digest.hexdigest() != previous[0] or (previous[3] and not at_end):
+            logger.warning(f"{csv_file.name} changed since its checkpoint; reloading {table_name} from the start")
+            # Rows referencing the table go first, children before parents, so
+            # the deletes hold with foreign keys enforced; their checkpoints go
+            # too, so those files reload once this one has
+            dependents = self.dependent_tables(table_name)
+            if dependents:
+                logger.warning(f"  Clearing dependent tables for reload: {', '.join(dependents)}")
+            tables = dependents + [table_name]
+            for table in tables:
+                self.cursor.execute(f"DELETE FROM {table}")
+            self.cursor.execute(
+                f"DELETE FROM ETL_CHECKPOINTS WHERE TABLE_NAME IN ({','.join('?' * len(tables))})", tables
+            )
+            self.conn.commit()
+            return start
+            
+        if previous[3]:
+            logger.info(f"Skipping {csv_file.name}: already loaded ({previous[1]:,} rows)")
+            return None
+            
+        logger.info(f"Resuming {csv_file.name} after {previous[1]:,} rows (byte offset {previous[2]:,})")
+        start.update(rows=previous[1], offset=previous[2], digest=digest)
+        return start
+        
+    def dependent_tables(self, table_name: str):
+        """Tables whose foreign keys lead to table_name, each after its own dependents"""
+        ordered = []
+        for child, schema_sql in self.table_schemas.items():
+            if child != table_name and re.search(rf'REFERENCES {table_name}\b', schema_sql):
+                for table in self.dependent_tables(child) + [child]:
+                    if table not in ordered:
+                        ordered.append(table)
+        return ordered
+        
+    def save_checkpoint(self, table_name: str, csv_file: CSVSource, content_hash: str,
+                        rows: int, offset: int, completed: bool = False):
+        """Record a table's committed progress; the caller commits it with the rows"""
+        self.cursor.execute(
+            """INSERT OR REPLACE INTO ETL_CHECKPOINTS
+               (TABLE_NAME, FILE_NAME, CONTENT_HASH, ROWS_COMMITTED, BYTE_OFFSET, COMPLETED, UPDATED_AT)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (table_name, csv_file.name, content_hash, rows, offset, int(completed), datetime.now().isoformat())
+        )
+        
+    def split_statements(self, table_name: str, columns: list, targets: dict = None):
+        """Return a RowSplitter and parent/child INSERT statements for a split file"""
+        targets = targets or {}
+        split = self.split_tables[table_name]
+        child_table = split['child_table']
+        child_columns = split['key_columns'] + split['child_columns']
+        splitter = RowSplitter(columns, split['key_columns'], split['child_columns'])
+        parent_columns = splitter.parent_columns(columns)
+        
+        # Violations are written once; a key repeated by an earlier load
+        # (a resumed batch) is ignored rather than deleted and reinserted
+        parent_sql = (f"INSERT OR IGNORE INTO {targets.get(table_name, table_name)} "
+                      f"({','.join(parent_columns)}) VALUES ({','.join(['?' for _ in parent_columns])})")
+        child_sql = (f"INSERT OR REPLACE INTO {targets.get(child_table, child_table)} "
+                     f"({','.join(child_columns)}) VALUES ({','.join(['?' for _ in child_columns])})")
+        return splitter, parent_sql, child_sql
+        
+    def insert_split_rows(self, table_name: str, columns: list, rows, targets: dict = None,
+                          before_commit=None):
+        """Insert a split file's rows in one streaming pass
+        
+        Each batch of CSV rows becomes deduplicated parent rows and child rows.
+        before_commit, if given, is called before each intermediate commit.
+        Returns the number of batches written.
+        """
+        splitter, parent_sql, child_sql = self.split_statements(table_name, columns, targets)
+        batch_rows = self.batch_size or 10000
+        parent_count = 0
+        child_count = 0
+        batches = 0
+        
+        while True:
+            batch = list(islice(rows, batch_rows))
+            if not batch:
+                break
+            parents, children = splitter.split(batch)
+            self.cursor.executemany(parent_sql, parents)
+            self.cursor.executemany(child_sql, children)
+            parent_count += len(parents)
+            child_count += len(children)
+            batches += 1
+            if self.batch_size > 0:
+                if before_commit:
+                    before_commit()
+                self.conn.commit()
                 
+        child_table = self.split_tables[table_name]['child_table']
+        logger.info(f"  Split into {parent_count:,} {table_name} and {child_count:,} {child_table} rows")
+        return batches
+        
+    def primary_key_columns(self, table_name: str):
+        """Return a table's primary key columns in key order"""
+        self.cursor.execute(f"PRAGMA table_info({table_name})")
+        key_columns = [(row[5], row[1]) for row in self.cursor.fetchall() if row[5]]
+        return [name for _, name in sorted(key_columns)]
+        
+    def load_csv_incremental(self, csv_file: CSVSource, table_name: str):
+        """Load a CSV file only if it changed since the last recorded load"""
+        stat = csv_file.stat()
+        self.cursor.execute(
+            "SELECT FILE_SIZE, FILE_MTIME, CONTENT_HASH FROM ETL_MANIFEST WHERE FILE_NAME = ?",
+            (csv_file.name,)
+        )
+        previous = self.cursor.fetchone()
+        
+        # Size and mtime unchanged: trust the manifest without rehashing
+        if previous and previous[0] == stat.st_size and previous[1] == stat.st_mtime:
+            logger.info(f"Skipping unchanged {csv_file.name}")
+            return
+            
+        content_hash = csv_file.content_hash()
+        if previous and previous[2] == content_hash:
+            logger.info(f"Skipping unchanged {csv_file.name} (touched but identical)")
+            row_count = None
+        else:
+            row_count = self.apply_csv_delta(csv_file, table_name)
+            
+        self.save_manifest(csv_file, table_name, content_hash, row_count, stat)
+        self.conn.commit()
+        
+    def save_manifest(self, csv_file: CSVSource, table_name: str, content_hash: str,
+                      row_count: int = None, stat=None):
+        """Record a loaded file in ETL_MANIFEST; the caller commits it
+        
+        Every load path records the files it loads in full, so the first
+        incremental run after a full build skips the files that are unchanged.
+        A row_count of None keeps the previously recorded count.
+        """
+        stat = stat or csv_file.stat()
+        self.cursor.execute(
+            """INSERT OR REPLACE INTO ETL_MANIFEST
+               (FILE_NAME, TABLE_NAME, FILE_SIZE, FILE_MTIME, CONTENT_HASH, ROW_COUNT, LOADED_AT)
+               VALUES (?, ?, ?, ?, ?, COALESCE(?, (SELECT ROW_COUNT FROM ETL_MANIFEST WHERE FILE_NAME = ?)), ?)""",
+            (csv_file.name, table_name, stat.st_size, stat.st_mtime, content_hash,
+             row_count, csv_file.name, datetime.now().isoformat())
+        )
+        
+    def apply_csv_delta(self, csv_file: CSVSource, table_name: str):
+        """Apply row-level inserts, updates and deletes from a changed CSV file
+        
+        The file is staged into temporary tables (one per target table, so
+        two for a split file) and each is compared with its target on the
+        primary key. Deletes are scoped to the quarters present in the file,
+        so other SUBMISSIONYEARQUARTER snapshots are untouched. Changes are
+        left uncommitted for the caller. Returns the staged row count.
+        """
+        tables = [table_name]
+        if table_name in self.split_tables:
+            tables.append(self.split_tables[table_name]['child_table'])
+        stages = {table: f"STAGE_{table}" for table in tables}
+        
+        for table, stage in stages.items():
+            key_columns = self.primary_key_columns(table)
+            self.cursor.execute(f"DROP TABLE IF EXISTS temp.{stage}")
+            self.cursor.execute(f"CREATE TEMP TABLE {stage} AS SELECT * FROM main.{table} WHERE 0")
+            self.cursor.execute(f"CREATE UNIQUE INDEX temp.{stage}_pk ON {stage} ({','.join(key_columns)})")
+            
+        try:
+            row_count = self.load_csv_file(
+                csv_file, table_name, into={table: f"temp.{stage}" for table, stage in stages.items()}
+            )
+            quarters = f"SELECT DISTINCT SUBMISSIONYEARQUARTER FROM temp.{stages[table_name]}"
+            for table, stage in stages.items():
+                self.apply_stage_delta(table, stage, quarters)
+                
+        finally:
+            for stage in stages.values():
+                self.cursor.execute(f"DROP TABLE IF EXISTS temp.{stage}")
+                
+        return row_count
+        
+    def apply_stage_delta(self, table_name: str, stage: str, quarters: str):
+        """Apply the differences between a staging table and its target
+        
+        quarters is a query returning the SUBMISSIONYEARQUARTER values the
+        staged file covers; only target rows in those quarters are deleted.
+        """
+        changed = f"CHANGED_{table_name}"
+        key_columns = self.primary_key_columns(table_name)
+        key_match = ' AND '.join(f"s.{col} = t.{col}" for col in key_columns)
+        scope = ''
+        if 'SUBMISSIONYEARQUARTER' in key_columns:
+            scope = f"WHERE SUBMISSIONYEARQUARTER IN ({quarters})"
+            
+        try:
+            # Rows that are new or differ in any column
+            self.cursor.execute(f"DROP TABLE IF EXISTS temp.{changed}")
+            self.cursor.execute(f"""
+                CREATE TEMP TABLE {changed} AS
+                SELECT * FROM temp.{stage}
+                EXCEPT
+                SELECT * FROM main.{table_name} {scope}
+            """)
+            self.cursor.execute(f"""
+                SELECT COUNT(*) FROM temp.{changed} s
+                WHERE NOT EXISTS (SELECT 1 FROM main.{table_name} t WHERE {key_match})
+            """)
+            inserted = self.cursor.fetchone()[0]
+            self.cursor.execute(f"SELECT COUNT(*) FROM temp.{changed}")
+            updated = self.cursor.fetchone()[0] - inserted
+            
+            # Rows in the file's quarters whose keys are gone from the file
+            self.cursor.execute(f"""
+                DELETE FROM main.{table_name} WHERE rowid IN (
+                    SELECT t.rowid FROM (SELECT rowid, * FROM main.{table_name} {scope}) t
+                    WHERE NOT EXISTS (SELECT 1 FROM temp.{stage} s WHERE {key_match})
+                )
+            """)
+            deleted = self.cursor.rowcount
+            
+            self.cursor.execute(f"INSERT OR REPLACE INTO main.{table_name} SELECT * FROM temp.{changed}")
+            logger.info(f"  {table_name}: {inserted:,} inserted, {updated:,} updated, {deleted:,} deleted")
+            
+        finally:
+            self.cursor.execute(f"DROP TABLE IF EXISTS temp.{changed}")
+            
+    def load_csv_files_parallel(self, csv_paths: list):
+        """Load CSV files with parsing in a process pool and a single writer
+        
+        Worker processes parse and convert blocks of records; this process
+        writes the parsed batches strictly in submission order, so tables are
+        still loaded in the order given (reference and parent tables first).
+        The writer applies the reference data-quality rules, which need the
+        keys and codes of the tables written before.
+        """
+        logger.info(f"Loading {len(csv_paths)} files with {self.workers} parser processes...")
+        
+        chunk_rows = 1000
+        max_pending = self.workers * 4
+        pending = deque()
+        current = {'table': None, 'file': None, 'insert_sql': None, 'split': None, 'code_columns': None,
+                   'rows': 0, 'uncommitted': 0, 'errors': None, 'metrics': None, 'start': None, 'position': None}
+        
+        # Resume points are settled before any rows are written
+        starts = [(csv_file, table_name, self.checkpoint_start(csv_file, table_name))
+                  for csv_file, table_name in csv_paths]
+        self.quality.load_reference_state(self.conn)
+        
+        def submit_chunks():
+            for csv_file, table_name, start in starts:
+                if start is None:
+                    continue
+                with csv_file.open_binary() as raw:
+                    lines = OffsetLineReader(raw)
+                    columns = next(csv.reader([lines.readline()]))
+                    if start['offset']:
+                        lines.seek(start['offset'], start['digest'])
+                    for chunk in iter_csv_chunks(lines, chunk_rows):
+                        # Chunks are read ahead of the writer, so each carries
+                        # the position (offset and hash) its checkpoint records
+                        yield csv_file, table_name, columns, chunk, start, (lines.offset, lines.digest.copy())
+                        
+        def before_commit(completed: bool = False):
+            start = current['start']
+            self.quality.flush(self.cursor)
+            offset, digest = current['position']
+            self.save_checkpoint(current['table'], current['file'], digest.hexdigest(),
+                                 start['rows'] + current['rows'], offset, completed)
+            if completed:
+                self.save_manifest(current['file'], current['table'], current['file'].content_hash(digest),
+                                   start['rows'] + current['rows'])
+            
+        def finish_table():
+            if current['table']:
+                table_name = current['table']
+                before_commit(completed=True)
                 self.conn.commit()
-                logger.info(f"  Loaded {row_count:,} rows into {table_name}")
+                logger.info(f"  Loaded {current['rows']:,} rows into {table_name}")
+                current['errors'].log(table_name)
+                self.quality.log(table_name)
+                current['metrics'].update(
+                    rows=current['rows'],
+                    rejected_rows=current['errors'].skipped + self.quality.rejected(table_name),
+                    conversion_failures=current['errors'].rows,
+                    rule_failures=dict(self.quality.counts.get(table_name, {}))
+                )
+                self.metrics.end_phase(current['metrics'])
                 
+        def write_chunk(csv_file, table_name, columns, future, start, position):
+            if table_name != current['table']:
+                finish_table()
+                logger.info(f"Loading {csv_file.name} into {table_name}...")
+                insert_columns, code_columns = self.description_plan(table_name, columns)
+                placeholders = ','.join(['?' for _ in insert_columns])
+                current.update(
+                    table=table_name,
+                    file=csv_file,
+                    insert_sql=f"INSERT OR REPLACE INTO {table_name} ({','.join(insert_columns)}) VALUES ({placeholders})",
+                    split=None,
+                    code_columns=code_columns,
+                    rows=0,
+                    uncommitted=0,
+                    errors=ConversionErrors(),
+                    metrics=self.metrics.start_phase('load', table_name, csv_file.stat().st_size),
+                    start=start
+                )
+                if table_name in self.split_tables:
+                    current['split'] = self.split_statements(table_name, insert_columns)
+                if not start['offset']:
+                    self.quality.reset_table(self.cursor, table_name)
+                    
+            batch_data, errors, worker_cpu_seconds = future.result()
+            current['position'] = position
+            self.quality.record(table_name, csv_file.name, columns, errors)
+            current['errors'].merge(errors)
+            current['metrics']['worker_cpu_seconds'] += worker_cpu_seconds
+            batch_data = list(self.described_rows(
+                table_name, columns, current['code_columns'],
+                self.quality.check(table_name, csv_file.name, columns, batch_data)
+            ))
+            if batch_data:
+                if current['split']:
+                    splitter, parent_sql, child_sql = current['split']
+                    parents, children = splitter.split(batch_data)
+                    self.cursor.executemany(parent_sql, parents)
+                    self.cursor.executemany(child_sql, children)
+                else:
+                    self.cursor.executemany(current['insert_sql'], batch_data)
+                current['metrics']['batches'] += 1
+                previous_rows = current['rows']
+                current['rows'] += len(batch_data)
+                current['uncommitted'] += len(batch_data)
+                if self.batch_size > 0 and current['uncommitted'] >= self.batch_size:
+                    before_commit()
+                    self.conn.commit()
+                    current['uncommitted'] = 0
+                if current['rows'] // 10000 > previous_rows // 10000:
+                    logger.info(f"  Processed {current['rows']:,} rows...")
+                    
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                for csv_file, table_name, columns, chunk, start, position in submit_chunks():
+                    future = executor.submit(parse_csv_chunk, table_name, columns, chunk,
+                                             self.column_kinds.get(table_name),
+                                             self.key_columns.get(table_name))
+                    pending.append((csv_file, table_name, columns, future, start, position))
+                    if len(pending) >= max_pending:
+                        write_chunk(*pending.popleft())
+                        
+                while pending:
+                    write_chunk(*pending.popleft())
+                    
+            finish_table()
+            
         except Exception as e:
-            logger.error(f"Failed to load {csv_file.name}: {e}")
+            failed = current['file'].name if current['file'] else 'CSV files'
+            logger.error(f"Failed to load {failed}: {e}")
             self.conn.rollback()
             raise
             
+    def advise_indexes(self):
+        """Create the composite and covering indexes the query workload benefits from
+        
+        Runs the index advisor over the advise_queries file: each query is
+        explained and timed, candidate indexes are created and ANALYZE run,
+        and only indexes that a query uses and gets measurably faster with
+        are kept.
+        """
+        # Imported here: the advisor module imports from this one
+        from index_advisor import IndexAdvisor, latest_quarter, sample_parameters
+        
+        logger.info(f"Advising indexes for {self.advise_queries}...")
+        params = sample_parameters(self.conn, latest_quarter(self.conn))
+        advisor = IndexAdvisor(self.conn, read_query_file(Path(self.advise_queries)), params)
+        report = advisor.run(apply=True)
+        kept = [index['name'] for index in report['indexes'] if index['kept']]
+        logger.info(f"  Kept {len(kept)} of {len(report['indexes'])} proposed indexes")
+        return report
+        
+    def check_foreign_keys(self):
+        """Verify foreign keys in one pass after a bulk load"""
+        logger.info("Checking foreign keys...")
+        
+        self.cursor.execute("PRAGMA foreign_key_check")
+        orphans = {}
+        for table_name, _rowid, parent, _fkid in self.cursor:
+            orphans[(table_name, parent)] = orphans.get((table_name, parent), 0) + 1
+            
+        if orphans:
+            for (table_name, parent), count in sorted(orphans.items()):
+                logger.error(f"  {count:,} rows in {table_name} reference missing {parent} rows")
+            raise sqlite3.IntegrityError(f"Foreign key check failed for {len(orphans)} table(s)")
+            
+        logger.info("  No foreign key violations")
+        
+    def finalize_generation(self):
+        """Stamp, optimize and check a database build before it is published
+        
+        Records the generation in ETL_GENERATION, refreshes planner
+        statistics, optionally VACUUMs, runs the integrity and foreign key
+        checks and leaves the file in the journal mode readers will use.
+        Any failed check raises, so the build is never published.
+        """
+        logger.info(f"Finalizing generation {self.generation_id}...")
+        
+        self.cursor.execute("DELETE FROM ETL_GENERATION")
+        self.cursor.execute(
+            "INSERT INTO ETL_GENERATION (GENERATION_ID, BUILT_AT, DATA_DIR) VALUES (?, ?, ?)",
+            (self.generation_id, datetime.now().isoformat(), str(self.data_dir))
+        )
+        self.conn.commit()
+        
+        self.cursor.execute("ANALYZE")
+        self.cursor.execute("PRAGMA optimize")
+        self.conn.commit()
+        if self.vacuum:
+            logger.info("  Vacuuming...")
+            self.cursor.execute("VACUUM")
+            
+        self.cursor.execute("PRAGMA integrity_check")
+        problems = [row[0] for row in self.cursor.fetchall() if row[0] != 'ok']
+        if problems:
+            for problem in problems[:10]:
+                logger.error(f"  {problem}")
+            raise sqlite3.DatabaseError(f"Integrity check failed with {len(problems)} problem(s)")
+        logger.info("  Integrity check passed")
+        self.check_foreign_keys()
+        
+        # The WAL is checkpointed and removed when the connection closes
+        self.cursor.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        logger.info(f"  Journal mode: {self.cursor.fetchone()[0]}")
+            
     def validate_data(self):
         """Perform basic data validation"""
         logger.info("Validating loaded data...")
@@ -435,6 +2931,7 @@ class SDWAETLProcessor:
         validations = [
             ("SELECT COUNT(*) FROM SDWA_PUB_WATER_SYSTEMS", "Total water systems"),
             ("SELECT COUNT(*) FROM SDWA_VIOLATIONS_ENFORCEMENT", "Total violations"),
+            ("SELECT COUNT(*) FROM SDWA_ENFORCEMENT_ACTIONS", "Enforcement actions"),
             ("SELECT COUNT(*) FROM SDWA_PUB_WATER_SYSTEMS WHERE PWS_ACTIVITY_CODE = 'A'", "Active water systems"),
             ("SELECT COUNT(DISTINCT PWSID) FROM SDWA_VIOLATIONS_ENFORCEMENT WHERE VIOLATION_STATUS = 'Unaddressed'", "Systems with unaddressed violations"),
             ("SELECT COUNT(*) FROM SDWA_REF_CODE_VALUES", "Reference code values")
@@ -445,6 +2942,14 @@ class SDWAETLProcessor:
             count = self.cursor.fetchone()[0]
             logger.info(f"  {description}: {count:,}")
             
+        # Data-quality failures recorded while loading
+        self.cursor.execute("""
+            SELECT TABLE_NAME, RULE, ACTION, COUNT(*) FROM ETL_QUARANTINE
+            GROUP BY TABLE_NAME, RULE, ACTION ORDER BY TABLE_NAME, RULE
+        """)
+        for table_name, rule, action, count in self.cursor.fetchall():
+            logger.info(f"  Quarantined ({action}) {table_name} {rule}: {count:,}")
+            
     def run_etl(self):
         """Run the complete ETL process"""
         start_time = datetime.now()
@@ -455,35 +2960,79 @@ class SDWAETLProcessor:
             self.connect_db()
             
             # Create schema
-            self.create_schema()
+            with self.metrics.phase('schema'):
+                self.create_schema()
+                
+            # Reference descriptions for decoding and code checks; a fresh
+            # build adds them as SDWA_REF_CODE_VALUES loads
+            self.decoder.load(self.conn)
             
             # Load CSV files in correct order
-            csv_files = [
-                ('SDWA_REF_CODE_VALUES.csv', 'SDWA_REF_CODE_VALUES'),
-                ('SDWA_PUB_WATER_SYSTEMS.csv', 'SDWA_PUB_WATER_SYSTEMS'),
-                ('SDWA_FACILITIES.csv', 'SDWA_FACILITIES'),
-                ('SDWA_VIOLATIONS_ENFORCEMENT.csv', 'SDWA_VIOLATIONS_ENFORCEMENT'),
-                ('SDWA_LCR_SAMPLES.csv', 'SDWA_LCR_SAMPLES'),
-                ('SDWA_SITE_VISITS.csv', 'SDWA_SITE_VISITS'),
-                ('SDWA_GEOGRAPHIC_AREAS.csv', 'SDWA_GEOGRAPHIC_AREAS'),
-                ('SDWA_SERVICE_AREAS.csv', 'SDWA_SERVICE_AREAS'),
-                ('SDWA_EVENTS_MILESTONES.csv', 'SDWA_EVENTS_MILESTONES'),
-                ('SDWA_PN_VIOLATION_ASSOC.csv', 'SDWA_PN_VIOLATION_ASSOC')
-            ]
-            
-            for csv_filename, table_name in csv_files:
-                csv_path = self.data_dir / csv_filename
-                if csv_path.exists():
-                    self.load_csv_file(csv_path, table_name)
+            csv_paths = []
+            for csv_filename, table_name in self.csv_files:
+                csv_source = find_csv_source(self.data_dir, csv_filename)
+                if csv_source:
+                    csv_paths.append((csv_source, table_name))
                 else:
                     logger.warning(f"CSV file not found: {csv_filename}")
                     
-            # Create indexes
-            self.create_indexes()
-            
+            profiler = cProfile.Profile() if self.profile_out else None
+            if profiler:
+                profiler.enable()
+                
+            if self.incremental:
+                for csv_path, table_name in csv_paths:
+                    self.load_csv_incremental(csv_path, table_name)
+            elif self.workers > 1:
+                self.load_csv_files_parallel(csv_paths)
+            else:
+                for csv_path, table_name in csv_paths:
+                    self.load_csv_file(csv_path, table_name)
+                    
+            if profiler:
+                profiler.disable()
+                self.write_profile(profiler)
+                
+            # Create indexes once all data is in
+            with self.metrics.phase('index'):
+                self.create_indexes()
+                
+            # Materialize dashboard summary tables
+            with self.metrics.phase('aggregate'):
+                self.build_aggregates()
+                self.build_map_documents()
+                
+            # Lead and copper time series and exceedance history
+            with self.metrics.phase('lcr_analytics'):
+                self.build_lcr_analytics()
+                
+            # Pre-render one detail document per water system
+            with self.metrics.phase('documents'):
+                self.build_documents()
+                
+            # Build full-text search index
+            with self.metrics.phase('search_index'):
+                self.build_search_index()
+                
+            # Add the indexes the canonical read queries measurably need
+            if self.advise_queries:
+                with self.metrics.phase('advise_indexes'):
+                    self.advise_indexes()
+                    
+            # Foreign keys were not enforced during a bulk or incremental load
+            if self.bulk or self.incremental:
+                with self.metrics.phase('validation', 'foreign_keys'):
+                    self.check_foreign_keys()
+                    
             # Validate data
-            self.validate_data()
-            
+            with self.metrics.phase('validation'):
+                self.validate_data()
+                
+            # Optimize and check a generation before it is published
+            if self.generation_id:
+                with self.metrics.phase('publish'):
+                    self.finalize_generation()
+                    
             # Calculate duration
             end_time = datetime.now()
             duration = end_time - start_time
@@ -495,7 +3044,20 @@ class SDWAETLProcessor:
             
         finally:
             self.close_db()
-            
+            if self.metrics_out:
+                self.metrics.write(self.metrics_out)
+                
+    def write_profile(self, profiler: cProfile.Profile):
+        """Save load-loop profile stats and log the top entries"""
+        profiler.dump_stats(self.profile_out)
+        logger.info(f"Load profile written to {self.profile_out}")
+        
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(15)
+        for line in summary.getvalue().splitlines():
+            if line.strip():
+                logger.info(f"  {line}")
+                
 
 def main():
     """Main entry point"""
@@ -506,9 +3068,47 @@ def main():
                         help='Path to SQLite database file (default: ./sdwa_georgia.db)')
     parser.add_argument('--replace', action='store_true',
                         help='Replace existing database if it exists')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of CSV parser processes; 0 uses all CPUs (default: 1)')
+    parser.add_argument('--bulk', action='store_true',
+                        help='Bulk-load mode: fast load-time PRAGMAs, foreign keys checked once after loading')
+    parser.add_argument('--batch-size', type=int, default=0,
+                        help='Rows per transaction; 0 commits once per table (default: 0)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Update an existing database, applying only row-level changes from changed CSV files')
+    parser.add_argument('--raw-values', action='store_true',
+                        help='Store CSV values as-is instead of ISO dates and typed numbers')
+    parser.add_argument('--metrics-out', type=str,
+                        help='Write a per-table, per-phase JSON metrics report to this file')
+    parser.add_argument('--profile', type=str, metavar='PROFILE_OUT',
+                        help='Profile the table load loop with cProfile and save stats to this file')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted load of an existing database from its checkpoints')
+    parser.add_argument('--publish', action='store_true',
+                        help='Build a new generation beside the database and atomically swap it into place')
+    parser.add_argument('--keep-generations', type=int, default=3,
+                        help='Published generations to keep for rollback (default: 3)')
+    parser.add_argument('--vacuum', action='store_true',
+                        help='VACUUM a published generation before swapping it in')
+    parser.add_argument('--journal-mode', type=str, default='wal', choices=['wal', 'delete'],
+                        help='Journal mode of a published generation (default: wal)')
+    parser.add_argument('--rollback', action='store_true',
+                        help='Point the database path back at the previous published generation and exit')
+    parser.add_argument('--advise-indexes', type=str, metavar='QUERY_FILE',
+                        help='Explain and time the named queries in this file and add the indexes that speed them up')
     
     args = parser.parse_args()
+    db_path = Path(args.db_path)
+    store = GenerationStore(db_path, keep=args.keep_generations)
     
+    if args.rollback:
+        try:
+            store.rollback()
+        except (OSError, FileNotFoundError) as e:
+            logger.error(f"Rollback failed: {e}")
+            sys.exit(1)
+        return
+        
     # Check if data directory exists
     data_dir = Path(args.data_dir)
     if not data_dir.exists():
@@ -516,27 +3116,63 @@ def main():
         sys.exit(1)
         
     # Handle existing database
-    db_path = Path(args.db_path)
-    if db_path.exists():
+    if args.resume and (args.replace or args.incremental):
+        logger.error("--resume cannot be combined with --replace or --incremental")
+        sys.exit(1)
+    if args.incremental and args.workers != 1:
+        # Changed files are staged and diffed one at a time
+        logger.error("--workers cannot be combined with --incremental")
+        sys.exit(1)
+    generation_id = None
+    build_path = db_path
+    if args.publish:
+        # The published database is never written; a new generation is
+        # built beside it (starting from a copy for incremental updates)
+        generation_id = store.new_generation_id()
+        build_path = store.prepare_build(resume=args.resume, copy_current=args.incremental)
+    elif db_path.exists() and not (args.incremental or args.resume):
         if args.replace:
             logger.info(f"Removing existing database: {db_path}")
             db_path.unlink()
         else:
             logger.warning(f"Database already exists: {db_path}")
-            logger.warning("Use --replace flag to overwrite or specify a different path")
+            logger.warning("Use --replace flag to overwrite, --incremental to update, --resume to continue an interrupted load, --publish to build and swap in a new generation, or specify a different path")
             sys.exit(1)
             
     # Run ETL
-    processor = SDWAETLProcessor(str(data_dir), str(db_path))
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    processor = SDWAETLProcessor(
+        str(data_dir),
+        str(build_path),
+        workers=workers,
+        bulk=args.bulk,
+        batch_size=args.batch_size,
+        incremental=args.incremental,
+        convert_types=not args.raw_values,
+        metrics_out=args.metrics_out,
+        profile_out=args.profile,
+        advise_queries=args.advise_indexes,
+        resume=args.resume,
+        generation_id=generation_id,
+        vacuum=args.vacuum,
+        journal_mode=args.journal_mode
+    )
     
     try:
         processor.run_etl()
-        logger.info(f"Database created successfully: {db_path}")
+        if args.publish:
+            store.publish(generation_id)
+        elif args.incremental or args.resume:
+            logger.info(f"Database updated successfully: {db_path}")
+        else:
+            logger.info(f"Database created successfully: {db_path}")
         
     except Exception as e:
         logger.error(f"ETL failed: {e}")
+        if args.publish:
+            logger.error(f"Published database left unchanged; failed build kept at {build_path} for --resume")
         sys.exit(1)
         
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
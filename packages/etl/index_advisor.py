@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Workload-driven index advisor: explains a file of canonical read queries,
+flags full scans, partial index matches, table lookups and temp B-tree sorts,
+and proposes composite and covering indexes that are kept only when the
+measured timings improve
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+
+from etl_sdwa_to_sqlite import read_query_file
+
+logger = logging.getLogger(__name__)
+
+# Wider indexes cost more on load than they save on reads
+MAX_INDEX_COLUMNS = 6
+
+# An index is kept only for a query it speeds up by at least this share of
+# its median time and this many milliseconds; smaller gains are timing noise
+MIN_IMPROVEMENT_RATIO = 0.2
+MIN_IMPROVEMENT_MS = 0.1
+
+TABLE_REF = re.compile(r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+NOT_ALIASES = {'WHERE', 'ON', 'LEFT', 'INNER', 'CROSS', 'JOIN', 'ORDER', 'GROUP', 'LIMIT', 'USING'}
+COLUMN_REF = re.compile(r'\b(?:(\w+)\.)?(\w+)\b')
+# column = :param, ?, 'literal' or number (not column = column)
+EQUALITY = re.compile(r"\b(?:(\w+)\.)?(\w+)\s*(?<![<>!])=\s*(?::\w+|\?|'[^']*'|-?\d+(?:\.\d+)?)")
+RANGE = re.compile(r'\b(?:(\w+)\.)?(\w+)\s*(?:<=?|>=?|\bBETWEEN\b)', re.IGNORECASE)
+PLAN_ACCESS = re.compile(r'^(SCAN|SEARCH) (\w+)(?: USING (COVERING )?INDEX (\w+)(?: \((.*)\))?)?')
+
+
+def clause(sql: str, start: str, ends: list):
+    """Return the text between a keyword and the first of the end keywords"""
+    match = re.search(rf'\b{start}\b', sql, re.IGNORECASE)
+    if not match:
+        return ''
+    rest = sql[match.end():]
+    end = len(rest)
+    for keyword in ends:
+        found = re.search(rf'\b{keyword}\b|;', rest, re.IGNORECASE)
+        if found:
+            end = min(end, found.start())
+    return rest[:end]
+
+
+class QueryShape:
+    """Tables, filter, sort and referenced columns of one SQL query
+
+    Columns are resolved against the live schema, so unqualified names are
+    attributed to the first table in the query that has them.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, sql: str):
+        self.sql = sql
+        self.tables = {}
+        for table, alias in TABLE_REF.findall(sql):
+            if alias.upper() in NOT_ALIASES:
+                alias = ''
+            columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+            if columns:
+                self.tables[alias or table] = (table, columns)
+
+        select_list = clause(sql, 'SELECT', ['FROM'])
+        where = clause(sql, 'WHERE', ['GROUP BY', 'ORDER BY', 'LIMIT'])
+        order_by = clause(sql, 'ORDER BY', ['LIMIT']) or clause(sql, 'GROUP BY', ['HAVING', 'ORDER BY', 'LIMIT'])
+
+        self.equality = self.resolve(EQUALITY.findall(where))
+        self.ranges = self.resolve(RANGE.findall(where))
+        self.order = self.resolve(COLUMN_REF.findall(re.sub(r'\b(?:ASC|DESC)\b', '', order_by, flags=re.IGNORECASE)))
+        self.select_all = bool(re.search(r'(^|[\s,.])\*', select_list))
+        self.referenced = self.resolve(COLUMN_REF.findall(sql))
+
+    def resolve(self, refs: list):
+        """Map (qualifier, name) pairs to {alias: [column, ...]} in order of appearance"""
+        resolved = {}
+        for qualifier, name in refs:
+            owner = next((alias for alias, (_, columns) in self.tables.items()
+                          if qualifier in ('', alias) and name in columns), None)
+            if owner and name not in resolved.setdefault(owner, []):
+                resolved[owner].append(name)
+        return resolved
+
+    def candidate(self, alias: str):
+        """Return the composite (and if small enough, covering) index columns for a table"""
+        equality = self.equality.get(alias, [])
+        # Quarter first: every app query pins a snapshot before anything else
+        equality = sorted(equality, key=lambda col: col != 'SUBMISSIONYEARQUARTER')
+        columns = list(equality)
+        ranges = [col for col in self.ranges.get(alias, []) if col not in columns]
+        if ranges:
+            columns.append(ranges[0])
+        elif self.order and list(self.order) == [alias]:
+            columns += [col for col in self.order[alias] if col not in columns]
+        if not columns:
+            return []
+
+        covering = columns + [col for col in self.referenced.get(alias, []) if col not in columns]
+        if not self.select_all and len(covering) <= MAX_INDEX_COLUMNS:
+            return covering
+        return columns
+
+
+class IndexAdvisor:
+    """Explain, index and re-time a set of named queries on an open connection"""
+
+    def __init__(self, conn: sqlite3.Connection, queries: list, params: dict = None, repeat: int = 5,
+                 min_ratio: float = MIN_IMPROVEMENT_RATIO, min_ms: float = MIN_IMPROVEMENT_MS):
+        self.conn = conn
+        self.queries = queries
+        self.params = params
+        self.repeat = repeat
+        self.min_ratio = min_ratio
+        self.min_ms = min_ms
+
+    def improved(self, before_ms: float, after_ms: float):
+        """Whether a timing change clears both minimum improvements"""
+        gain = before_ms - after_ms
+        return gain >= self.min_ms and gain >= before_ms * self.min_ratio
+
+    def explain(self, sql: str):
+        """Return the EXPLAIN QUERY PLAN detail lines for a query"""
+        return [row[3] for row in self.conn.execute(f"EXPLAIN QUERY PLAN {sql}", self.params)]
+
+    def plan_issues(self, shape: QueryShape, plan: list):
+        """Return (issue, alias) pairs for the plan steps worth indexing"""
+        issues = []
+        for detail in plan:
+            if detail.startswith('USE TEMP B-TREE'):
+                purpose = detail.split(' FOR ', 1)[-1]
+                owners = list(shape.order) if purpose in ('ORDER BY', 'GROUP BY') else []
+                issues.append((f"temp b-tree for {purpose.lower()}", owners[0] if len(owners) == 1 else None))
+                continue
+            match = PLAN_ACCESS.match(detail)
+            if not match or match.group(2) not in shape.tables or 'VIRTUAL TABLE' in detail:
+                continue
+            access, alias, covering, index, constraints = match.groups()
+            if access == 'SCAN' and not index:
+                issues.append(('full scan', alias))
+            elif access == 'SEARCH' and (constraints or '').count('=') < len(shape.equality.get(alias, [])):
+                issues.append(('partial index match', alias))
+            elif access == 'SEARCH' and not covering and not shape.select_all \
+                    and len(shape.referenced.get(alias, [])) <= MAX_INDEX_COLUMNS:
+                issues.append(('table lookups', alias))
+        return issues
+
+    def time_query(self, sql: str):
+        """Median execution time in milliseconds"""
+        samples = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            self.conn.execute(sql, self.params).fetchall()
+            samples.append((time.perf_counter() - started) * 1000)
+        return round(statistics.median(samples), 4)
+
+    def existing_indexes(self, table: str):
+        """Return {index name: [columns]} for a table, including primary key indexes"""
+        return {
+            row[1]: [info[2] for info in self.conn.execute(f"PRAGMA index_info({row[1]})")]
+            for row in self.conn.execute(f"PRAGMA index_list({table})")
+        }
+
+    def propose(self, analysis: dict):
+        """Collect one candidate index per distinct column list"""
+        candidates = {}
+        for name, query in analysis.items():
+            for alias in {alias for _, alias in query['issues'] if alias}:
+                table = query['shape'].tables[alias][0]
+                columns = query['shape'].candidate(alias)
+                if not columns:
+                    continue
+                if any(existing[:len(columns)] == columns
+                       for existing in self.existing_indexes(table).values()):
+                    continue
+                key = (table, tuple(columns))
+                candidates.setdefault(key, set()).add(name)
+
+        # An index whose columns prefix a wider candidate adds nothing
+        kept = {}
+        for (table, columns), names in candidates.items():
+            wider = [other for other in candidates
+                     if other[0] == table and len(other[1]) > len(columns) and other[1][:len(columns)] == columns]
+            if not wider:
+                kept.setdefault((table, columns), set()).update(names)
+            else:
+                kept.setdefault(wider[0], set()).update(names)
+
+        proposals = []
+        for (table, columns), names in kept.items():
+            # Named by a hash of the columns so re-runs find the same index
+            digest = hashlib.sha1(','.join(columns).encode('utf-8')).hexdigest()[:8]
+            index_name = f"idx_adv_{table.replace('SDWA_', '').lower()}_{digest}"
+            proposals.append({
+                'name': index_name,
+                'table': table,
+                'columns': list(columns),
+                'sql': f"CREATE INDEX IF NOT EXISTS {index_name} ON {table}({', '.join(columns)})",
+                'queries': sorted(names),
+            })
+        return proposals
+
+    def run(self, apply: bool = False):
+        """Analyze the workload, try the proposed indexes and return a report
+
+        Proposed indexes are created and ANALYZE is run before re-timing. An
+        index is kept only if a query uses it and gets faster by at least
+        min_ratio of its time and min_ms; unless apply is set, the kept
+        indexes are dropped again once measured.
+        """
+        analysis = {}
+        for name, sql in self.queries:
+            shape = QueryShape(self.conn, sql)
+            plan = self.explain(sql)
+            analysis[name] = {'shape': shape, 'plan': plan, 'issues': self.plan_issues(shape, plan),
+                              'before_ms': self.time_query(sql)}
+            for issue, alias in analysis[name]['issues']:
+                logger.info(f"  {name}: {issue}{f' on {alias}' if alias else ''}")
+
+        proposals = self.propose(analysis)
+        for proposal in proposals:
+            logger.info(f"  Trying {proposal['sql']}")
+            self.conn.execute(proposal['sql'])
+        self.conn.execute("ANALYZE")
+
+        for name, sql in self.queries:
+            analysis[name]['after_plan'] = self.explain(sql)
+            analysis[name]['after_ms'] = self.time_query(sql)
+
+        for proposal in proposals:
+            used_by = [name for name in analysis
+                       if any(re.search(rf"\bINDEX {proposal['name']}\b", detail)
+                              for detail in analysis[name]['after_plan'])]
+            proposal['used_by'] = used_by
+            proposal['improved'] = [name for name in used_by
+                                    if self.improved(analysis[name]['before_ms'], analysis[name]['after_ms'])]
+            proposal['kept'] = bool(proposal['improved'])
+            if not proposal['kept'] or not apply:
+                self.conn.execute(f"DROP INDEX IF EXISTS {proposal['name']}")
+        self.conn.commit()
+
+        used_indexes = {re.search(r'INDEX (\w+)', detail).group(1)
+                        for query in analysis.values()
+                        for detail in query['plan'] + query['after_plan'] if 'INDEX ' in detail}
+        tables = {table for query in analysis.values() for table, _ in query['shape'].tables.values()}
+        unused = sorted(index for table in tables for index in self.existing_indexes(table)
+                        if index not in used_indexes and not index.startswith('sqlite_'))
+
+        report = {
+            'created_at': datetime.now().isoformat(),
+            'applied': apply,
+            'min_improvement': {'ratio': self.min_ratio, 'ms': self.min_ms},
+            'parameters': self.params,
+            'queries': {
+                name: {
+                    'issues': [f"{issue}{f' on {alias}' if alias else ''}" for issue, alias in query['issues']],
+                    'plan_before': query['plan'],
+                    'plan_after': query['after_plan'],
+                    'before_ms': query['before_ms'],
+                    'after_ms': query['after_ms'],
+                }
+                for name, query in analysis.items()
+            },
+            'indexes': proposals,
+            'unused_existing_indexes': unused,
+        }
+        self.log_report(report)
+        return report
+
+    def log_report(self, report: dict):
+        """Log per-query timings and the index decisions"""
+        for name, query in report['queries'].items():
+            change = ''
+            if query['before_ms']:
+                change = f" ({(query['after_ms'] / query['before_ms'] - 1) * 100:+.1f}%)"
+            logger.info(f"  {name}: {query['before_ms']:.3f} ms -> {query['after_ms']:.3f} ms{change}")
+        for proposal in report['indexes']:
+            if proposal['kept']:
+                action = 'Created' if report['applied'] else 'Recommended'
+                logger.info(f"  {action} {proposal['name']} for {', '.join(proposal['improved'])}")
+            else:
+                logger.info(f"  Rejected {proposal['name']} (no improvement of {self.min_ratio:.0%} "
+                            f"and {self.min_ms:g} ms)")
+        if report['unused_existing_indexes']:
+            logger.info(f"  Existing indexes no query used: {', '.join(report['unused_existing_indexes'])}")
+
+
+def latest_quarter(conn: sqlite3.Connection):
+    """Most recent SUBMISSIONYEARQUARTER loaded"""
+    row = conn.execute("SELECT MAX(SUBMISSIONYEARQUARTER) FROM SDWA_PUB_WATER_SYSTEMS").fetchone()
+    return row[0] if row and row[0] else '2025Q1'
+
+
+def sample_parameters(conn: sqlite3.Connection, quarter: str):
+    """Pick representative parameter values from the loaded database"""
+    def first(sql, params=(), default=None):
+        row = conn.execute(sql, params).fetchone()
+        return row[0] if row else default
+
+    pwsid = first("""
+        SELECT PWSID FROM SDWA_VIOLATIONS_ENFORCEMENT
+        WHERE SUBMISSIONYEARQUARTER = ?
+        GROUP BY PWSID ORDER BY COUNT(*) DESC LIMIT 1
+    """, (quarter,)) or first("SELECT PWSID FROM SDWA_PUB_WATER_SYSTEMS LIMIT 1")
+    ref = conn.execute("SELECT VALUE_TYPE, VALUE_CODE FROM SDWA_REF_CODE_VALUES LIMIT 1").fetchone() or (None, None)
+    return {
+        'quarter': quarter,
+        'pwsid': pwsid,
+        'county': first("""
+            SELECT COUNTY_SERVED FROM SDWA_GEOGRAPHIC_AREAS WHERE COUNTY_SERVED IS NOT NULL
+            GROUP BY COUNTY_SERVED ORDER BY COUNT(*) DESC LIMIT 1
+        """),
+        'violation_id': first("""
+            SELECT VIOLATION_ID FROM SDWA_VIOLATIONS_ENFORCEMENT
+            WHERE PWSID = ? LIMIT 1
+        """, (pwsid,)),
+        'term': 'WATER',
+        'value_type': ref[0],
+        'value_code': ref[1],
+    }
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Recommend indexes for a workload of read queries')
+    parser.add_argument('--db-path', type=str, default='./sdwa_georgia.db',
+                        help='Path to SQLite database file (default: ./sdwa_georgia.db)')
+    parser.add_argument('--queries', type=str, default=str(Path(__file__).parent / 'canonical_queries.sql'),
+                        help='SQL file of named read queries (default: canonical_queries.sql)')
+    parser.add_argument('--quarter', type=str,
+                        help='SUBMISSIONYEARQUARTER for query parameters (default: latest loaded)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Executions per query timing (default: 5)')
+    parser.add_argument('--apply', action='store_true',
+                        help='Keep the indexes that improved the workload')
+    parser.add_argument('--output', type=str,
+                        help='Write the JSON report to this file')
+
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db_path)
+    try:
+        params = sample_parameters(conn, args.quarter or latest_quarter(conn))
+        advisor = IndexAdvisor(conn, read_query_file(Path(args.queries)), params, args.repeat)
+        report = advisor.run(apply=args.apply)
+    finally:
+        conn.close()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
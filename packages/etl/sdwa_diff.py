@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Change detection between two SDWA loads: two quarters of one database or
+two database generations are compared table by table with a sorted merge
+over each table's primary key, streaming inserted, deleted and updated rows
+(with column-level differences) into a change table and a per-table summary
+"""
+
+import argparse
+import json
+import logging
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from etl_sdwa_to_sqlite import CSV_FILES, LCR_ACTION_LEVELS, GenerationStore
+
+logger = logging.getLogger(__name__)
+
+# Tables compared, parents before children
+DIFF_TABLES = []
+for _, table_name in CSV_FILES:
+    DIFF_TABLES.append(table_name)
+    if table_name == 'SDWA_VIOLATIONS_ENFORCEMENT':
+        DIFF_TABLES.append('SDWA_ENFORCEMENT_ACTIONS')
+
+# Violation statuses that mean a violation is no longer open
+RESOLVED_STATUSES = {'Resolved', 'Archived'}
+
+# Rows fetched from each side, and changes written, per batch
+DEFAULT_BATCH_SIZE = 10000
+
+DIFF_SCHEMAS = [
+    """
+    CREATE TABLE IF NOT EXISTS ETL_DIFFS (
+        DIFF_ID TEXT NOT NULL,
+        OLD_DB TEXT NOT NULL,
+        OLD_QUARTER TEXT,
+        NEW_DB TEXT NOT NULL,
+        NEW_QUARTER TEXT,
+        STARTED_AT TEXT NOT NULL,
+        COMPLETED_AT TEXT,
+        PRIMARY KEY (DIFF_ID)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ETL_CHANGES (
+        CHANGE_ID INTEGER PRIMARY KEY,
+        DIFF_ID TEXT NOT NULL,
+        TABLE_NAME TEXT NOT NULL,
+        CHANGE_TYPE TEXT NOT NULL,
+        PWSID TEXT,
+        ROW_KEY TEXT NOT NULL,
+        CHANGED_COLUMNS TEXT,
+        ROW_DATA TEXT,
+        SIGNAL TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ETL_CHANGE_SUMMARY (
+        DIFF_ID TEXT NOT NULL,
+        TABLE_NAME TEXT NOT NULL,
+        OLD_ROWS INTEGER NOT NULL,
+        NEW_ROWS INTEGER NOT NULL,
+        INSERTED INTEGER NOT NULL,
+        DELETED INTEGER NOT NULL,
+        UPDATED INTEGER NOT NULL,
+        COLUMN_CHANGES TEXT,
+        SIGNALS TEXT,
+        PRIMARY KEY (DIFF_ID, TABLE_NAME)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS IDX_CHANGES_DIFF_TABLE ON ETL_CHANGES(DIFF_ID, TABLE_NAME, CHANGE_TYPE)",
+    "CREATE INDEX IF NOT EXISTS IDX_CHANGES_DIFF_SIGNAL ON ETL_CHANGES(DIFF_ID, SIGNAL)",
+    "CREATE INDEX IF NOT EXISTS IDX_CHANGES_PWSID ON ETL_CHANGES(PWSID, DIFF_ID)",
+]
+
+
+def sqlite_order(value):
+    """Sort key matching SQLite's ORDER BY: NULL, numbers, text, then blobs"""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (3, value)
+
+
+def open_read_only(db_path: str):
+    return sqlite3.connect(f"file:{Path(db_path).resolve()}?mode=ro", uri=True)
+
+
+def table_layout(conn: sqlite3.Connection, table_name: str):
+    """Return a table's columns and primary key columns (in key order), or None if it is missing"""
+    info = conn.execute(f"PRAGMA table_info({table_name})").fetchall()
+    if not info:
+        return None
+    columns = [row[1] for row in info]
+    key_columns = [row[1] for row in sorted((row for row in info if row[5]), key=lambda row: row[5])]
+    return columns, key_columns
+
+
+def iter_keyed_rows(conn: sqlite3.Connection, table_name: str, key_columns: list, columns: list,
+                    quarter: str = None, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Yield (sort key, row) for a table in key order, a batch at a time"""
+    sql = f"SELECT {', '.join(key_columns + columns)} FROM {table_name}"
+    params = ()
+    if quarter:
+        sql += " WHERE SUBMISSIONYEARQUARTER = ?"
+        params = (quarter,)
+    sql += f" ORDER BY {', '.join(key_columns)}"
+    key_count = len(key_columns)
+    cursor = conn.execute(sql, params)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for row in rows:
+            yield tuple(sqlite_order(value) for value in row[:key_count]), row
+
+
+def merge_rows(old_rows, new_rows):
+    """Sorted merge of two keyed row streams into (old row, new row) pairs
+
+    A key on one side only pairs with None; rows present on both sides are
+    paired even when equal, so callers can count unchanged rows.
+    """
+    old = next(old_rows, None)
+    new = next(new_rows, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and old[0] < new[0]):
+            yield old[1], None
+            old = next(old_rows, None)
+        elif old is None or new[0] < old[0]:
+            yield None, new[1]
+            new = next(new_rows, None)
+        else:
+            yield old[1], new[1]
+            old = next(old_rows, None)
+            new = next(new_rows, None)
+
+
+def change_signal(table_name: str, change_type: str, old: dict, new: dict, changed: dict):
+    """Name the alert a change raises, if any"""
+    if table_name == 'SDWA_VIOLATIONS_ENFORCEMENT':
+        if change_type == 'inserted':
+            return 'new_violation'
+        if 'VIOLATION_STATUS' in changed and new['VIOLATION_STATUS'] in RESOLVED_STATUSES \
+                and old['VIOLATION_STATUS'] not in RESOLVED_STATUSES:
+            return 'resolved_violation'
+    elif table_name == 'SDWA_PUB_WATER_SYSTEMS':
+        if 'POPULATION_SERVED_COUNT' in changed:
+            return 'population_change'
+    elif table_name == 'SDWA_LCR_SAMPLES' and change_type != 'deleted':
+        level = LCR_ACTION_LEVELS.get(new.get('CONTAMINANT_CODE'))
+        measure = new.get('SAMPLE_MEASURE')
+        if level is not None and isinstance(measure, (int, float)) and measure > level:
+            previous = old.get('SAMPLE_MEASURE') if old else None
+            if not isinstance(previous, (int, float)) or previous <= level:
+                return 'new_lcr_exceedance'
+    return None
+
+
+class ChangeDetector:
+    """Compare two loads and record what changed between them
+
+    Each side is a read-only connection plus an optional quarter. With
+    quarters, SUBMISSIONYEARQUARTER is left out of the comparison key so the
+    same system lines up across quarters; without, rows match on their full
+    primary key (e.g. one quarter across two generations). Both sides are
+    read in primary key order, which the tables' primary key indexes
+    provide, so memory stays bounded by the batch size.
+    """
+
+    def __init__(self, old_conn: sqlite3.Connection, new_conn: sqlite3.Connection, out_conn: sqlite3.Connection,
+                 old_quarter: str = None, new_quarter: str = None, batch_size: int = DEFAULT_BATCH_SIZE):
+        if bool(old_quarter) != bool(new_quarter):
+            raise ValueError("Give both quarters or neither")
+        self.old_conn = old_conn
+        self.new_conn = new_conn
+        self.out_conn = out_conn
+        self.old_quarter = old_quarter
+        self.new_quarter = new_quarter
+        self.batch_size = batch_size
+        for schema_sql in DIFF_SCHEMAS:
+            self.out_conn.execute(schema_sql)
+        self.out_conn.commit()
+
+    def run(self, diff_id: str, old_db: str, new_db: str, tables: list = None):
+        """Diff every table (or the given ones) and return the summary rows"""
+        with self.out_conn:
+            # A rerun of a diff replaces its earlier results
+            for table in ('ETL_CHANGES', 'ETL_CHANGE_SUMMARY', 'ETL_DIFFS'):
+                self.out_conn.execute(f"DELETE FROM {table} WHERE DIFF_ID = ?", (diff_id,))
+            self.out_conn.execute(
+                "INSERT INTO ETL_DIFFS VALUES (?, ?, ?, ?, ?, ?, NULL)",
+                (diff_id, str(old_db), self.old_quarter, str(new_db), self.new_quarter, datetime.now().isoformat())
+            )
+
+        summaries = []
+        for table_name in tables or DIFF_TABLES:
+            summary = self.diff_table(diff_id, table_name)
+            if summary:
+                summaries.append(summary)
+
+        with self.out_conn:
+            self.out_conn.execute("UPDATE ETL_DIFFS SET COMPLETED_AT = ? WHERE DIFF_ID = ?",
+                                  (datetime.now().isoformat(), diff_id))
+        return summaries
+
+    def diff_table(self, diff_id: str, table_name: str):
+        """Stream one table's changes into ETL_CHANGES and record its summary"""
+        old_layout = table_layout(self.old_conn, table_name)
+        new_layout = table_layout(self.new_conn, table_name)
+        if not old_layout or not new_layout:
+            logger.warning(f"Skipping {table_name}: not in both databases")
+            return None
+        if old_layout[1] != new_layout[1]:
+            raise ValueError(f"{table_name} primary keys differ: {old_layout[1]} vs {new_layout[1]}")
+
+        quarterly = 'SUBMISSIONYEARQUARTER' in new_layout[0]
+        key_columns = [column for column in new_layout[1]
+                       if not (self.new_quarter and column == 'SUBMISSIONYEARQUARTER')]
+        # Decoded descriptions follow their codes, so only the codes are compared
+        columns = [column for column in new_layout[0]
+                   if column in old_layout[0] and column not in new_layout[1] and not column.endswith('_DESC')]
+        one_sided = sorted(set(old_layout[0]) ^ set(new_layout[0]))
+        if one_sided:
+            logger.warning(f"  {table_name}: not comparing columns in one database only: {', '.join(one_sided)}")
+
+        logger.info(f"Diffing {table_name}...")
+        old_rows = iter_keyed_rows(self.old_conn, table_name, key_columns, columns,
+                                   self.old_quarter if quarterly else None, self.batch_size)
+        new_rows = iter_keyed_rows(self.new_conn, table_name, key_columns, columns,
+                                   self.new_quarter if quarterly else None, self.batch_size)
+
+        key_count = len(key_columns)
+        pwsid_index = key_columns.index('PWSID') if 'PWSID' in key_columns else None
+        counts = {'old': 0, 'new': 0, 'inserted': 0, 'deleted': 0, 'updated': 0}
+        column_changes = {}
+        signals = {}
+        pending = []
+
+        for old, new in merge_rows(old_rows, new_rows):
+            if old is not None:
+                counts['old'] += 1
+            if new is not None:
+                counts['new'] += 1
+            if old is not None and new is not None and old[key_count:] == new[key_count:]:
+                continue
+
+            row = new if new is not None else old
+            old_values = dict(zip(columns, old[key_count:])) if old is not None else None
+            new_values = dict(zip(columns, new[key_count:])) if new is not None else None
+            changed = {}
+            if old is None:
+                change_type = 'inserted'
+            elif new is None:
+                change_type = 'deleted'
+            else:
+                change_type = 'updated'
+                changed = {column: [old_values[column], new_values[column]]
+                           for column in columns if old_values[column] != new_values[column]}
+                for column in changed:
+                    column_changes[column] = column_changes.get(column, 0) + 1
+            counts[change_type] += 1
+
+            signal = change_signal(table_name, change_type, old_values, new_values, changed)
+            if signal:
+                signals[signal] = signals.get(signal, 0) + 1
+            pending.append((
+                diff_id, table_name, change_type,
+                row[pwsid_index] if pwsid_index is not None else None,
+                json.dumps(list(row[:key_count])),
+                json.dumps(changed) if changed else None,
+                json.dumps(new_values if change_type == 'inserted' else old_values) if change_type != 'updated' else None,
+                signal
+            ))
+            if len(pending) >= self.batch_size:
+                self.write_changes(pending)
+                pending = []
+
+        self.write_changes(pending)
+        with self.out_conn:
+            self.out_conn.execute(
+                "INSERT INTO ETL_CHANGE_SUMMARY VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (diff_id, table_name, counts['old'], counts['new'], counts['inserted'], counts['deleted'],
+                 counts['updated'], json.dumps(column_changes, sort_keys=True), json.dumps(signals, sort_keys=True))
+            )
+        logger.info(f"  {counts['inserted']:,} inserted, {counts['deleted']:,} deleted, {counts['updated']:,} updated "
+                    f"({counts['old']:,} -> {counts['new']:,} rows)")
+        for signal, count in sorted(signals.items()):
+            logger.info(f"  {signal}: {count:,}")
+        return {
+            'table': table_name,
+            **counts,
+            'column_changes': column_changes,
+            'signals': signals
+        }
+
+    def write_changes(self, changes: list):
+        if changes:
+            with self.out_conn:
+                self.out_conn.executemany(
+                    "INSERT INTO ETL_CHANGES (DIFF_ID, TABLE_NAME, CHANGE_TYPE, PWSID, ROW_KEY, CHANGED_COLUMNS, "
+                    "ROW_DATA, SIGNAL) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    changes
+                )
+
+
+def generation_label(conn: sqlite3.Connection, db_path: str):
+    """Return a database's ETL_GENERATION id, or its file name if it has none"""
+    try:
+        row = conn.execute("SELECT GENERATION_ID FROM ETL_GENERATION").fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    return row[0] if row else Path(db_path).name
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Record what changed between two quarters or two database generations')
+    parser.add_argument('--db-path', type=str, default='./sdwa_georgia.db',
+                        help='Database for both sides unless --old-db/--new-db are given (default: ./sdwa_georgia.db)')
+    parser.add_argument('--old-db', type=str,
+                        help='Database of the old side')
+    parser.add_argument('--new-db', type=str,
+                        help='Database of the new side')
+    parser.add_argument('--previous-generation', action='store_true',
+                        help='Compare the published --db-path with the generation published before it')
+    parser.add_argument('--old-quarter', type=str,
+                        help='SUBMISSIONYEARQUARTER of the old side')
+    parser.add_argument('--new-quarter', type=str,
+                        help='SUBMISSIONYEARQUARTER of the new side')
+    parser.add_argument('--quarter', type=str,
+                        help='SUBMISSIONYEARQUARTER of both sides, e.g. when comparing generations')
+    parser.add_argument('--out-db', type=str, default='./sdwa_changes.db',
+                        help='Database the changes and summary are written to (default: ./sdwa_changes.db)')
+    parser.add_argument('--diff-id', type=str,
+                        help='Id for this diff\'s rows (default: <old>..<new> quarters or generations)')
+    parser.add_argument('--tables', type=str,
+                        help='Comma-separated tables to compare (default: all)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Rows read and changes written per batch (default: {DEFAULT_BATCH_SIZE})')
+
+    args = parser.parse_args()
+
+    old_quarter = args.old_quarter or args.quarter
+    new_quarter = args.new_quarter or args.quarter
+    if bool(old_quarter) != bool(new_quarter):
+        logger.error("Give both --old-quarter and --new-quarter, or --quarter")
+        sys.exit(1)
+
+    new_db = args.new_db or args.db_path
+    old_db = args.old_db or args.db_path
+    if args.previous_generation:
+        try:
+            old_db = str(GenerationStore(Path(args.db_path)).previous())
+        except FileNotFoundError as e:
+            logger.error(str(e))
+            sys.exit(1)
+    if old_db == new_db and old_quarter == new_quarter:
+        logger.error("Both sides are the same: give two quarters, two databases or --previous-generation")
+        sys.exit(1)
+    for path in (old_db, new_db):
+        if not Path(path).exists():
+            logger.error(f"Database not found: {path}")
+            sys.exit(1)
+    if Path(args.out_db).resolve() in {Path(old_db).resolve(), Path(new_db).resolve()}:
+        logger.error("--out-db must be a separate database from the ones compared")
+        sys.exit(1)
+
+    old_conn = open_read_only(old_db)
+    new_conn = open_read_only(new_db)
+    out_conn = sqlite3.connect(args.out_db)
+    try:
+        diff_id = args.diff_id or (
+            f"{old_quarter}..{new_quarter}" if old_quarter != new_quarter
+            else f"{generation_label(old_conn, old_db)}..{generation_label(new_conn, new_db)}"
+        )
+        detector = ChangeDetector(old_conn, new_conn, out_conn, old_quarter, new_quarter, args.batch_size)
+        tables = [table.strip() for table in args.tables.split(',')] if args.tables else None
+        summaries = detector.run(diff_id, old_db, new_db, tables)
+    except (ValueError, sqlite3.Error) as e:
+        logger.error(f"Diff failed: {e}")
+        sys.exit(1)
+    finally:
+        old_conn.close()
+        new_conn.close()
+        out_conn.close()
+
+    changed = sum(summary['inserted'] + summary['deleted'] + summary['updated'] for summary in summaries)
+    logger.info(f"Diff {diff_id}: {changed:,} changed rows across {len(summaries)} tables written to {args.out_db}")
+
+
+if __name__ == "__main__":
+    main()
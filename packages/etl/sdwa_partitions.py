@@ -0,0 +1,610 @@
+#!/usr/bin/env python3
+"""
+Partitioned SDWA databases: the CSV inputs are split into one source
+directory per primacy agency and/or quarter, each shard is built into its
+own SQLite file by an independent writer process, and a catalog records
+which agencies and quarters every shard holds so queries ATTACH only the
+shards they need or fan out across them
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import json
+import logging
+import re
+import shutil
+import sqlite3
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from etl_sdwa_to_sqlite import CSV_FILES, GenerationStore, SDWAETLProcessor, find_csv_source
+
+logger = logging.getLogger(__name__)
+
+PARTITION_KEYS = ('agency', 'quarter')
+
+# Copied whole into every shard
+SHARED_FILES = {'SDWA_REF_CODE_VALUES.csv'}
+
+# Rows kept out of every shard are written to the catalog in batches this size
+QUARANTINE_BATCH_ROWS = 10000
+
+# Shard sources only live until their shard is built, so favour speed
+SOURCE_COMPRESSLEVEL = 1
+
+# Shard files kept open at once while splitting; others are reopened to append
+MAX_OPEN_SHARD_FILES = 128
+
+CATALOG_SCHEMAS = [
+    """
+    CREATE TABLE IF NOT EXISTS ETL_SHARDS (
+        SHARD_ID TEXT NOT NULL,
+        PARTITION_BY TEXT NOT NULL,
+        DB_PATH TEXT NOT NULL,
+        GENERATION_ID TEXT,
+        SOURCE_HASH TEXT,
+        ROW_COUNTS TEXT,
+        BUILT_AT TEXT,
+        PRIMARY KEY (SHARD_ID)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ETL_SHARD_KEYS (
+        SHARD_ID TEXT NOT NULL,
+        PRIMACY_AGENCY_CODE TEXT NOT NULL,
+        SUBMISSIONYEARQUARTER TEXT NOT NULL,
+        SYSTEM_COUNT INTEGER NOT NULL,
+        PRIMARY KEY (SHARD_ID, PRIMACY_AGENCY_CODE, SUBMISSIONYEARQUARTER)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS IDX_SHARD_KEYS_LOOKUP ON ETL_SHARD_KEYS(PRIMACY_AGENCY_CODE, SUBMISSIONYEARQUARTER)",
+    # Same columns as a database's ETL_QUARANTINE, for rows no shard can hold
+    """
+    CREATE TABLE IF NOT EXISTS ETL_QUARANTINE (
+        QUARANTINE_ID INTEGER PRIMARY KEY,
+        TABLE_NAME TEXT NOT NULL,
+        FILE_NAME TEXT NOT NULL,
+        RULE TEXT NOT NULL,
+        COLUMN_NAME TEXT,
+        VALUE TEXT,
+        ACTION TEXT NOT NULL,
+        ROW_DATA TEXT NOT NULL,
+        QUARANTINED_AT TEXT NOT NULL
+    )
+    """,
+]
+
+
+def parse_partition_by(value: str):
+    """Return the partition keys named in a comma-separated list, in canonical order"""
+    keys = {key.strip() for key in value.split(',') if key.strip()}
+    unknown = keys - set(PARTITION_KEYS)
+    if not keys or unknown:
+        raise ValueError(f"Partition by one or both of {', '.join(PARTITION_KEYS)}, got {value!r}")
+    return tuple(key for key in PARTITION_KEYS if key in keys)
+
+
+def shard_name(partition_by: tuple, agency: str, quarter: str):
+    """Return the shard id for an agency and quarter, safe for file and schema names"""
+    parts = []
+    if 'agency' in partition_by:
+        parts.append(agency or 'UNKNOWN')
+    if 'quarter' in partition_by:
+        parts.append(quarter or 'UNKNOWN')
+    return re.sub(r'[^A-Za-z0-9]+', '_', '_'.join(parts))
+
+
+class HashingWriter:
+    """A text sink that hashes what it writes, for csv.writer
+
+    Shard files are written in pieces as their writers are evicted and
+    reopened, so their content is hashed as it is written rather than by
+    reading the compressed files back.
+    """
+
+    def __init__(self):
+        self.handle = None
+        self.digest = hashlib.sha256()
+
+    def write(self, text: str):
+        self.digest.update(text.encode('utf-8'))
+        return self.handle.write(text)
+
+
+class ShardSplitter:
+    """Split the CSV inputs into one gzip-compressed source directory per shard
+
+    Every row except reference codes starts with SUBMISSIONYEARQUARTER and
+    PWSID. Only water system rows carry PRIMACY_AGENCY_CODE, so other rows
+    take the agency of their system. When partitioning by agency, rows of
+    systems missing from the water system file belong to no shard; split()
+    passes them to its quarantine callable instead, in batches of
+    ETL_QUARANTINE rows. Each shard's
+    source hash is taken over its uncompressed content while splitting, so
+    sources can be deleted once a shard is built and unchanged shards are
+    still recognised.
+    """
+
+    def __init__(self, data_dir: Path, sources_dir: Path, partition_by: tuple):
+        self.data_dir = Path(data_dir)
+        self.sources_dir = Path(sources_dir)
+        self.partition_by = partition_by
+        self.agencies = {}
+        self.quarantined = 0
+
+    def load_agencies(self, csv_source):
+        """Map (quarter, PWSID) and PWSID to PRIMACY_AGENCY_CODE"""
+        with csv_source.open() as f:
+            reader = csv.reader(f)
+            columns = next(reader)
+            agency_index = columns.index('PRIMACY_AGENCY_CODE')
+            for row in reader:
+                self.agencies[(row[0], row[1])] = row[agency_index]
+                self.agencies.setdefault(row[1], row[agency_index])
+
+    def shard_of(self, quarter: str, pwsid: str):
+        """Return a row's shard id, or None if its system's agency is unknown"""
+        agency = None
+        if 'agency' in self.partition_by:
+            agency = self.agencies.get((quarter, pwsid))
+            if agency is None:
+                agency = self.agencies.get(pwsid)
+            if agency is None:
+                return None
+        return shard_name(self.partition_by, agency, quarter)
+
+    def split(self, quarantine=None):
+        """Write every shard's compressed CSV files; return {shard_id: source hash}"""
+        sources = []
+        for csv_filename, table_name in CSV_FILES:
+            csv_source = find_csv_source(self.data_dir, csv_filename)
+            if csv_source:
+                sources.append((csv_filename, csv_source))
+            else:
+                logger.warning(f"CSV file not found: {csv_filename}")
+
+        if 'agency' in self.partition_by:
+            for csv_filename, csv_source in sources:
+                if csv_filename == 'SDWA_PUB_WATER_SYSTEMS.csv':
+                    self.load_agencies(csv_source)
+                    break
+            else:
+                raise ValueError("Partitioning by agency needs SDWA_PUB_WATER_SYSTEMS.csv")
+
+        # Sources left by an earlier run are rewritten from scratch
+        shutil.rmtree(self.sources_dir, ignore_errors=True)
+
+        headers = {}
+        digests = {}
+        table_names = dict(CSV_FILES)
+        self.quarantined = 0
+        for csv_filename, csv_source in sources:
+            if csv_filename in SHARED_FILES:
+                continue
+            logger.info(f"Splitting {csv_source.name}...")
+            writers = OrderedDict()
+            orphans = []
+            with csv_source.open() as f:
+                reader = csv.reader(f)
+                headers[csv_filename] = next(reader)
+                try:
+                    for row in reader:
+                        shard_id = self.shard_of(row[0], row[1])
+                        if shard_id is None:
+                            orphans.append(self.orphan(table_names[csv_filename], csv_source,
+                                                       headers[csv_filename], row))
+                            if len(orphans) >= QUARANTINE_BATCH_ROWS:
+                                self.flush_orphans(orphans, quarantine)
+                                orphans = []
+                            continue
+                        writer = writers.get(shard_id)
+                        if writer is None:
+                            if len(writers) >= MAX_OPEN_SHARD_FILES:
+                                writers.popitem(last=False)[1][0].handle.close()
+                            sink = digests.setdefault(shard_id, {}).get(csv_filename)
+                            writer = writers[shard_id] = self.open_writer(
+                                shard_id, csv_filename, sink, None if sink else headers[csv_filename])
+                            digests[shard_id][csv_filename] = writer[0]
+                        else:
+                            writers.move_to_end(shard_id)
+                        writer[1].writerow(row)
+                finally:
+                    for sink, _ in writers.values():
+                        sink.handle.close()
+            self.flush_orphans(orphans, quarantine)
+        if self.quarantined:
+            logger.warning(f"{self.quarantined:,} row(s) of systems missing from the water system file "
+                           f"quarantined instead of sharded")
+
+        # Every shard gets every file, header-only where it has no rows, so
+        # an incremental shard build sees emptied tables as changes
+        hashes = {}
+        for shard_id, sinks in digests.items():
+            for csv_filename, csv_source in sources:
+                if csv_filename in SHARED_FILES:
+                    sink = sinks[csv_filename] = HashingWriter()
+                    with csv_source.open_binary() as raw, self.open_source(shard_id, csv_filename, 'wb') as out:
+                        for block in iter(lambda: raw.read(1024 * 1024), b''):
+                            sink.digest.update(block)
+                            out.write(block)
+                elif csv_filename not in sinks:
+                    sink, _ = self.open_writer(shard_id, csv_filename, header=headers[csv_filename])
+                    sink.handle.close()
+                    sinks[csv_filename] = sink
+            digest = hashlib.sha256()
+            for csv_filename, _ in CSV_FILES:
+                if csv_filename in sinks:
+                    digest.update(f"{csv_filename}:{sinks[csv_filename].digest.hexdigest()}\n".encode())
+            hashes[shard_id] = digest.hexdigest()
+        return hashes
+
+    def orphan(self, table_name: str, csv_source, header: list, row: list):
+        """Return the ETL_QUARANTINE row for a row whose system has no agency"""
+        return (table_name, csv_source.name, 'unknown_pwsid', 'PWSID', row[1], 'rejected',
+                json.dumps(dict(zip(header, row))), datetime.now().isoformat())
+
+    def flush_orphans(self, orphans: list, quarantine):
+        if orphans:
+            self.quarantined += len(orphans)
+            if quarantine:
+                quarantine(orphans)
+
+    def shard_dir(self, shard_id: str):
+        return self.sources_dir / shard_id
+
+    def open_source(self, shard_id: str, csv_filename: str, mode: str):
+        """Open a shard's compressed source file, creating its directory"""
+        self.shard_dir(shard_id).mkdir(parents=True, exist_ok=True)
+        path = self.shard_dir(shard_id) / f"{csv_filename}.gz"
+        if 't' in mode:
+            return gzip.open(path, mode, compresslevel=SOURCE_COMPRESSLEVEL, encoding='utf-8', newline='')
+        return gzip.open(path, mode, compresslevel=SOURCE_COMPRESSLEVEL)
+
+    def open_writer(self, shard_id: str, csv_filename: str, sink: HashingWriter = None, header: list = None):
+        """Start a shard's file with header, or reopen it to append to sink when header is None"""
+        sink = sink or HashingWriter()
+        sink.handle = self.open_source(shard_id, csv_filename, 'at' if header is None else 'wt')
+        writer = csv.writer(sink)
+        if header is not None:
+            writer.writerow(header)
+        return sink, writer
+
+    def remove_sources(self, shard_id: str):
+        """Delete a shard's split sources once they are no longer needed"""
+        shutil.rmtree(self.shard_dir(shard_id), ignore_errors=True)
+
+
+def build_shard(shard_id: str, data_dir: str, db_path: str, options: dict):
+    """Build and publish one shard database; runs in its own process
+
+    Each shard is its own generation store, so a shard rebuild is swapped in
+    atomically while the other shards keep serving.
+    """
+    store = GenerationStore(Path(db_path), keep=options.get('keep_generations', 3))
+    generation_id = store.new_generation_id()
+    build_path = store.prepare_build(copy_current=options.get('incremental', False))
+    processor = SDWAETLProcessor(
+        data_dir,
+        str(build_path),
+        workers=options.get('workers', 1),
+        bulk=options.get('bulk', False),
+        batch_size=options.get('batch_size', 0),
+        incremental=options.get('incremental', False),
+        convert_types=options.get('convert_types', True),
+        generation_id=generation_id,
+        vacuum=options.get('vacuum', False),
+        journal_mode=options.get('journal_mode', 'wal')
+    )
+    processor.run_etl()
+    store.publish(generation_id)
+    return generation_id
+
+
+def shard_contents(db_path: Path):
+    """Return a shard's table row counts and its (agency, quarter, systems) keys"""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        row_counts = {}
+        for table_name in shard_tables(conn):
+            row_counts[table_name] = conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+        keys = conn.execute("""
+            SELECT COALESCE(PRIMACY_AGENCY_CODE, ''), SUBMISSIONYEARQUARTER, COUNT(*)
+            FROM SDWA_PUB_WATER_SYSTEMS GROUP BY 1, 2
+        """).fetchall()
+        return row_counts, keys
+    finally:
+        conn.close()
+
+
+def shard_tables(conn: sqlite3.Connection, schema: str = 'main'):
+    """Return a shard's per-water-system tables: those with a PWSID column (not search indexes)"""
+    tables = []
+    for (table_name,) in conn.execute(f"""
+            SELECT name FROM {schema}.sqlite_master
+            WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND sql NOT LIKE 'CREATE VIRTUAL TABLE%'
+            ORDER BY name
+            """):
+        columns = [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table_name})")]
+        if 'PWSID' in columns:
+            tables.append(table_name)
+    return tables
+
+
+class PartitionedBuild:
+    """Split the source data and build changed shards in parallel
+
+    Shard databases are <out_dir>/<shard id>.db and the catalog is
+    <out_dir>/catalog.db. Split sources are written under <out_dir>/sources
+    and deleted once their shard is built (or found unchanged); a failed
+    shard's sources are kept. Rows no shard can hold are quarantined in the
+    catalog while splitting. Only the parent process writes the catalog,
+    once per finished shard.
+    """
+
+    def __init__(self, data_dir: str, out_dir: str, partition_by: tuple, jobs: int = 1, options: dict = None):
+        self.data_dir = Path(data_dir)
+        self.out_dir = Path(out_dir)
+        self.partition_by = partition_by
+        self.jobs = jobs
+        self.options = options or {}
+        self.splitter = ShardSplitter(self.data_dir, self.out_dir / 'sources', partition_by)
+        self.catalog_path = self.out_dir / 'catalog.db'
+
+    def connect_catalog(self):
+        conn = sqlite3.connect(self.catalog_path)
+        for schema_sql in CATALOG_SCHEMAS:
+            conn.execute(schema_sql)
+        conn.commit()
+        return conn
+
+    def run(self, only: list = None, force: bool = False):
+        """Build the shards whose sources changed (or only/all of them); return failed shard ids"""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        catalog = self.connect_catalog()
+        try:
+            partitions = {row[0] for row in catalog.execute("SELECT DISTINCT PARTITION_BY FROM ETL_SHARDS")}
+            if partitions - {','.join(self.partition_by)}:
+                raise ValueError(f"{self.out_dir} is partitioned by {', '.join(sorted(partitions))}; "
+                                 f"use a new output directory to partition by {','.join(self.partition_by)}")
+
+            # Each split replaces the catalog's quarantined rows, in one transaction
+            with catalog:
+                catalog.execute("DELETE FROM ETL_QUARANTINE")
+                source_hashes = self.splitter.split(quarantine=lambda rows: catalog.executemany(
+                    """INSERT INTO ETL_QUARANTINE
+                       (TABLE_NAME, FILE_NAME, RULE, COLUMN_NAME, VALUE, ACTION, ROW_DATA, QUARANTINED_AT)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                    rows
+                ))
+            built = {row[0]: row[1] for row in catalog.execute("SELECT SHARD_ID, SOURCE_HASH FROM ETL_SHARDS")}
+            for shard_id in sorted(set(built) - set(source_hashes)):
+                logger.warning(f"Shard {shard_id} has no source rows any more; removed from the catalog")
+                self.remove_from_catalog(catalog, shard_id)
+
+            if only:
+                unknown = set(only) - set(source_hashes)
+                if unknown:
+                    raise ValueError(f"Unknown shard(s): {', '.join(sorted(unknown))}")
+                targets = sorted(only)
+            else:
+                targets = sorted(
+                    shard_id for shard_id in source_hashes
+                    if force or not self.db_path(shard_id).exists() or built.get(shard_id) != source_hashes[shard_id]
+                )
+            for shard_id in set(source_hashes) - set(targets):
+                self.splitter.remove_sources(shard_id)
+            logger.info(f"{len(source_hashes)} shard(s), {len(targets)} to build with {self.jobs} writer(s)")
+
+            failed = []
+            with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                futures = {
+                    executor.submit(build_shard, shard_id, str(self.splitter.shard_dir(shard_id)),
+                                    str(self.db_path(shard_id)), self.options): shard_id
+                    for shard_id in targets
+                }
+                for future in as_completed(futures):
+                    shard_id = futures[future]
+                    try:
+                        generation_id = future.result()
+                    except Exception as e:
+                        logger.error(f"Shard {shard_id} failed: {e}; its sources are kept in "
+                                     f"{self.splitter.shard_dir(shard_id)}")
+                        failed.append(shard_id)
+                        continue
+                    self.record_shard(catalog, shard_id, generation_id, source_hashes[shard_id])
+                    self.splitter.remove_sources(shard_id)
+                    logger.info(f"Shard {shard_id} published as generation {generation_id}")
+            return sorted(failed)
+        finally:
+            catalog.close()
+
+    def db_path(self, shard_id: str):
+        return self.out_dir / f"{shard_id}.db"
+
+    def record_shard(self, catalog: sqlite3.Connection, shard_id: str, generation_id: str, source_hash: str):
+        row_counts, keys = shard_contents(self.db_path(shard_id))
+        with catalog:
+            catalog.execute("DELETE FROM ETL_SHARD_KEYS WHERE SHARD_ID = ?", (shard_id,))
+            catalog.execute(
+                "INSERT OR REPLACE INTO ETL_SHARDS VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (shard_id, ','.join(self.partition_by), self.db_path(shard_id).name, generation_id,
+                 source_hash, json.dumps(row_counts), datetime.now().isoformat())
+            )
+            catalog.executemany(
+                "INSERT INTO ETL_SHARD_KEYS VALUES (?, ?, ?, ?)",
+                [(shard_id, agency, quarter, systems) for agency, quarter, systems in keys]
+            )
+
+    def remove_from_catalog(self, catalog: sqlite3.Connection, shard_id: str):
+        with catalog:
+            catalog.execute("DELETE FROM ETL_SHARD_KEYS WHERE SHARD_ID = ?", (shard_id,))
+            catalog.execute("DELETE FROM ETL_SHARDS WHERE SHARD_ID = ?", (shard_id,))
+
+
+class ShardedSDWA:
+    """Query helper over a partitioned build's catalog
+
+    attach() opens one connection with the selected shards ATTACHed
+    read-only and a TEMP view per water-system table that UNIONs them, so
+    the single-database SQL runs unchanged. fan_out() runs a query on each
+    selected shard in parallel instead, for more shards than SQLite can
+    attach or for per-shard results. Shard selection only prunes files:
+    queries still filter their own rows.
+    """
+
+    def __init__(self, out_dir: str):
+        self.out_dir = Path(out_dir)
+        self.catalog_path = self.out_dir / 'catalog.db'
+        if not self.catalog_path.exists():
+            raise FileNotFoundError(f"No shard catalog at {self.catalog_path}")
+
+    def shards(self, agency: str = None, quarter: str = None):
+        """Return [(shard_id, db_path)] of the shards holding an agency and/or quarter"""
+        conn = sqlite3.connect(f"file:{self.catalog_path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute("""
+                SELECT DISTINCT s.SHARD_ID, s.DB_PATH
+                FROM ETL_SHARDS s
+                JOIN ETL_SHARD_KEYS k ON k.SHARD_ID = s.SHARD_ID
+                WHERE (?1 IS NULL OR k.PRIMACY_AGENCY_CODE = ?1)
+                    AND (?2 IS NULL OR k.SUBMISSIONYEARQUARTER = ?2)
+                ORDER BY s.SHARD_ID
+            """, (agency, quarter)).fetchall()
+        finally:
+            conn.close()
+        return [(shard_id, self.out_dir / db_name) for shard_id, db_name in rows]
+
+    @contextmanager
+    def attach(self, agency: str = None, quarter: str = None):
+        """Yield a read-only connection over the matching shards"""
+        shards = self.shards(agency, quarter)
+        if not shards:
+            raise LookupError(f"No shard holds agency={agency} quarter={quarter}")
+
+        conn = sqlite3.connect(':memory:', uri=True)
+        try:
+            limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+            if len(shards) > limit:
+                raise ValueError(f"{len(shards)} shards match but SQLite attaches at most {limit}; "
+                                 f"narrow the agency/quarter or use fan_out()")
+            conn.row_factory = sqlite3.Row
+            schemas = []
+            for shard_id, db_path in shards:
+                schema = f"shard_{shard_id}"
+                conn.execute("ATTACH DATABASE ? AS " + schema, (f"file:{db_path}?mode=ro",))
+                schemas.append(schema)
+
+            # Columns are listed explicitly: a shard migrated from an older
+            # schema can have the same columns in a different order
+            for table_name in shard_tables(conn, schemas[0]):
+                columns = ', '.join(row[1] for row in conn.execute(f"PRAGMA {schemas[0]}.table_info({table_name})"))
+                union = ' UNION ALL '.join(f"SELECT {columns} FROM {schema}.{table_name}" for schema in schemas)
+                conn.execute(f"CREATE TEMP VIEW {table_name} AS {union}")
+            # Reference codes are the same in every shard
+            conn.execute(f"CREATE TEMP VIEW SDWA_REF_CODE_VALUES AS SELECT * FROM {schemas[0]}.SDWA_REF_CODE_VALUES")
+            yield conn
+        finally:
+            conn.close()
+
+    def fan_out(self, sql: str, params=(), agency: str = None, quarter: str = None, threads: int = 4):
+        """Run a query on every matching shard in parallel; return [(shard_id, rows)] in shard order"""
+        def run(shard):
+            shard_id, db_path = shard
+            conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+            try:
+                conn.row_factory = sqlite3.Row
+                return shard_id, conn.execute(sql, params).fetchall()
+            finally:
+                conn.close()
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            return list(executor.map(run, self.shards(agency, quarter)))
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Build and query SDWA databases partitioned by agency and/or quarter')
+    parser.add_argument('--out-dir', type=str, default='./sdwa_shards',
+                        help='Directory for shard databases and the catalog (default: ./sdwa_shards)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='Split the CSV files and build changed shards')
+    build.add_argument('--data-dir', type=str, default='./data',
+                       help='Directory containing CSV files (default: ./data)')
+    build.add_argument('--partition-by', type=str, default='agency,quarter',
+                       help='agency, quarter or agency,quarter (default: agency,quarter)')
+    build.add_argument('--jobs', type=int, default=4,
+                       help='Shards built in parallel (default: 4)')
+    build.add_argument('--shard', action='append',
+                       help='Rebuild only this shard; may be repeated')
+    build.add_argument('--force', action='store_true',
+                       help='Rebuild every shard, changed or not')
+    build.add_argument('--workers', type=int, default=1,
+                       help='CSV parser processes per shard (default: 1)')
+    build.add_argument('--bulk', action='store_true',
+                       help='Bulk-load mode for each shard')
+    build.add_argument('--incremental', action='store_true',
+                       help='Apply row-level changes to a copy of each shard instead of rebuilding it')
+    build.add_argument('--vacuum', action='store_true',
+                       help='VACUUM each shard before publishing it')
+    build.add_argument('--keep-generations', type=int, default=3,
+                       help='Published generations to keep per shard (default: 3)')
+
+    shards = subparsers.add_parser('shards', help='List the shards holding an agency and/or quarter')
+    shards.add_argument('--agency', type=str)
+    shards.add_argument('--quarter', type=str)
+
+    query = subparsers.add_parser('query', help='Run SQL over the matching shards')
+    query.add_argument('sql', type=str)
+    query.add_argument('--agency', type=str)
+    query.add_argument('--quarter', type=str)
+    query.add_argument('--fan-out', action='store_true',
+                       help='Run the query on each shard separately instead of over UNION views')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        if not Path(args.data_dir).exists():
+            logger.error(f"Data directory not found: {args.data_dir}")
+            sys.exit(1)
+        options = {
+            'workers': args.workers,
+            'bulk': args.bulk,
+            'incremental': args.incremental,
+            'vacuum': args.vacuum,
+            'keep_generations': args.keep_generations,
+        }
+        try:
+            builder = PartitionedBuild(args.data_dir, args.out_dir, parse_partition_by(args.partition_by),
+                                       jobs=args.jobs, options=options)
+            failed = builder.run(only=args.shard, force=args.force)
+        except ValueError as e:
+            logger.error(str(e))
+            sys.exit(1)
+        if failed:
+            logger.error(f"Failed shards (previous generations still published): {', '.join(failed)}")
+            sys.exit(1)
+        return
+
+    sharded = ShardedSDWA(args.out_dir)
+    if args.command == 'shards':
+        for shard_id, db_path in sharded.shards(args.agency, args.quarter):
+            print(f"{shard_id}\t{db_path}")
+    elif args.fan_out:
+        for shard_id, rows in sharded.fan_out(args.sql, agency=args.agency, quarter=args.quarter):
+            for row in rows:
+                print('\t'.join([shard_id] + [str(value) for value in row]))
+    else:
+        with sharded.attach(args.agency, args.quarter) as conn:
+            for row in conn.execute(args.sql):
+                print('\t'.join(str(value) for value in row))
+
+
+if __name__ == "__main__":
+    main()
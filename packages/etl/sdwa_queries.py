@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Read API over the loaded SDWA database: typed accessors matching the web
+app's queries, run on a pool of read-only connections with a result cache
+that is dropped whenever a new database generation appears
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+from etl_sdwa_to_sqlite import CodeDecoder, read_map_document, read_system_document, search_water_systems
+
+logger = logging.getLogger(__name__)
+
+# Quarter the web app defaults to
+DEFAULT_QUARTER = '2025Q1'
+
+WATER_SYSTEM_BY_ID = """
+    SELECT * FROM SDWA_PUB_WATER_SYSTEMS
+    WHERE PWSID = ? AND SUBMISSIONYEARQUARTER = ?
+"""
+
+VIOLATIONS_BY_PWSID = """
+    SELECT * FROM SDWA_VIOLATIONS_ENFORCEMENT
+    WHERE PWSID = ? AND SUBMISSIONYEARQUARTER = ?
+    ORDER BY NON_COMPL_PER_BEGIN_DATE DESC
+"""
+
+LCR_SAMPLES_BY_PWSID = """
+    SELECT * FROM SDWA_LCR_SAMPLES
+    WHERE PWSID = ? AND SUBMISSIONYEARQUARTER = ?
+    ORDER BY SAMPLING_END_DATE DESC
+"""
+
+LCR_SERIES_BY_PWSID = """
+    SELECT * FROM AGG_LCR_SERIES
+    WHERE PWSID = ? AND CONTAMINANT_CODE = ? AND SUBMISSIONYEARQUARTER = ?
+    ORDER BY SEQUENCE
+"""
+
+LCR_STATS_BY_PWSID = """
+    SELECT * FROM AGG_LCR_SYSTEM_STATS
+    WHERE PWSID = ? AND SUBMISSIONYEARQUARTER = ?
+    ORDER BY CONTAMINANT_CODE
+"""
+
+GEOGRAPHIC_AREAS_BY_PWSID = """
+    SELECT * FROM SDWA_GEOGRAPHIC_AREAS
+    WHERE PWSID = ? AND SUBMISSIONYEARQUARTER = ?
+"""
+
+# Filters are optional: a NULL parameter matches every row, so one prepared
+# statement serves every combination of filters
+VIOLATIONS = """
+    SELECT v.VIOLATION_ID, v.PWSID, p.PWS_NAME, v.VIOLATION_CODE, v.VIOLATION_CODE_DESC,
+           v.VIOLATION_CATEGORY_CODE, v.CONTAMINANT_CODE, v.CONTAMINANT_CODE_DESC,
+           v.IS_HEALTH_BASED_IND, v.VIOLATION_STATUS,
+           v.COMPL_PER_BEGIN_DATE, v.COMPL_PER_END_DATE, v.NON_COMPL_PER_BEGIN_DATE,
+           (SELECT e.ENFORCEMENT_DATE FROM SDWA_ENFORCEMENT_ACTIONS e
+            WHERE e.SUBMISSIONYEARQUARTER = v.SUBMISSIONYEARQUARTER AND e.PWSID = v.PWSID
+                AND e.VIOLATION_ID = v.VIOLATION_ID
+            ORDER BY e.ENFORCEMENT_DATE DESC, e.ENFORCEMENT_ID DESC LIMIT 1) AS ENFORCEMENT_DATE,
+           (SELECT e.ENFORCEMENT_ACTION_TYPE_CODE FROM SDWA_ENFORCEMENT_ACTIONS e
+            WHERE e.SUBMISSIONYEARQUARTER = v.SUBMISSIONYEARQUARTER AND e.PWSID = v.PWSID
+                AND e.VIOLATION_ID = v.VIOLATION_ID
+            ORDER BY e.ENFORCEMENT_DATE DESC, e.ENFORCEMENT_ID DESC LIMIT 1) AS ENFORCEMENT_ACTION_TYPE_CODE
+    FROM SDWA_VIOLATIONS_ENFORCEMENT v
+    LEFT JOIN SDWA_PUB_WATER_SYSTEMS p
+        ON v.PWSID = p.PWSID AND v.SUBMISSIONYEARQUARTER = p.SUBMISSIONYEARQUARTER
+    WHERE v.SUBMISSIONYEARQUARTER = ?1
+        AND (?2 IS NULL OR v.VIOLATION_STATUS = ?2)
+        AND (?3 IS NULL OR v.IS_HEALTH_BASED_IND = ?3)
+        AND (?4 IS NULL OR v.CONTAMINANT_CODE = ?4)
+    ORDER BY v.NON_COMPL_PER_BEGIN_DATE DESC
+"""
+
+
+def generation_signature(db_path: str):
+    """Identify the database file a path currently resolves to
+
+    A published generation swaps the path's symlink to a new file (new
+    inode); an in-place or incremental load changes the file or its WAL.
+    An empty WAL is ignored: readers create one when they open the file.
+    """
+    try:
+        stat = os.stat(db_path)
+    except FileNotFoundError:
+        return None
+    signature = (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    try:
+        wal = os.stat(os.path.realpath(db_path) + '-wal')
+    except FileNotFoundError:
+        return signature
+    if wal.st_size:
+        signature += (wal.st_mtime_ns, wal.st_size)
+    return signature
+
+
+class ResultCache:
+    """Thread-safe LRU cache of query results with a time-to-live
+
+    Holds at most max_entries results; the least recently used is evicted
+    first and entries older than ttl seconds are treated as missing.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return (True, value) for a live entry, else (False, None)"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self.entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def info(self):
+        with self.lock:
+            return {'entries': len(self.entries), 'max_entries': self.max_entries,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+class ConnectionPool:
+    """Fixed-size pool of read-only connections shared between threads
+
+    Each connection is used by one thread at a time and keeps its own
+    prepared statement cache, so the accessors' fixed SQL is compiled once
+    per connection. reset() retires every connection: idle ones are closed
+    at once and checked-out ones when they are returned, so later queries
+    open the file the database path resolves to now.
+    """
+
+    def __init__(self, db_path: str, size: int = 4, timeout: float = 30.0,
+                 cached_statements: int = 64):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.idle = []
+        self.available = threading.Condition()
+        self.created = 0
+        self.epoch = 0
+        self.closed = False
+
+    def open_connection(self):
+        uri = f"file:{os.path.abspath(self.db_path)}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def acquire(self):
+        """Return (epoch, connection), waiting while all size connections are in use"""
+        deadline = time.monotonic() + self.timeout
+        with self.available:
+            while True:
+                if self.closed:
+                    raise sqlite3.ProgrammingError("Connection pool is closed")
+                if self.idle:
+                    return self.idle.pop()
+                if self.created < self.size:
+                    self.created += 1
+                    epoch = self.epoch
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No database connection free after {self.timeout}s")
+                self.available.wait(remaining)
+        try:
+            return epoch, self.open_connection()
+        except sqlite3.Error:
+            with self.available:
+                self.created -= 1
+                self.available.notify()
+            raise
+
+    def release(self, epoch: int, conn: sqlite3.Connection):
+        with self.available:
+            if self.closed or epoch != self.epoch:
+                self.created -= 1
+                conn.close()
+            else:
+                self.idle.append((epoch, conn))
+            self.available.notify()
+
+    @contextmanager
+    def connection(self):
+        epoch, conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(epoch, conn)
+
+    def reset(self):
+        """Retire every connection opened so far"""
+        with self.available:
+            self.epoch += 1
+            for _, conn in self.idle:
+                conn.close()
+            self.created -= len(self.idle)
+            self.idle = []
+            self.available.notify_all()
+
+    def close(self):
+        self.reset()
+        with self.available:
+            self.closed = True
+            self.available.notify_all()
+
+
+class SDWAQueries:
+    """Cached read accessors for the SDWA database
+
+    Mirrors the web app's queries (packages/web/src/db/queries.ts). Results
+    are sqlite3.Row objects, or tuples of them, shared between callers
+    through the cache. Every call checks the database file's signature;
+    when it changes (a generation was published, rolled back or updated in
+    place) the cache is dropped and the pool reopens its connections.
+    """
+
+    def __init__(self, db_path: str, pool_size: int = 4, cache_size: int = 1024,
+                 cache_ttl: float = 300.0):
+        self.db_path = db_path
+        self.pool = ConnectionPool(db_path, pool_size)
+        self.cache = ResultCache(cache_size, cache_ttl)
+        self.lock = threading.Lock()
+        self.signature = generation_signature(db_path)
+        # Bumped on every change; part of each cache key, so a result read
+        # from the old file is never served for the new one
+        self.generation = 0
+        self.generation_id = self.read_generation_id() if self.signature else None
+
+    def close(self):
+        self.pool.close()
+        self.cache.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def check_generation(self):
+        """Return the current generation, invalidating if the file changed"""
+        signature = generation_signature(self.db_path)
+        if signature == self.signature:
+            return self.generation
+        with self.lock:
+            if signature != self.signature:
+                self.signature = signature
+                self.generation += 1
+                self.cache.clear()
+                self.pool.reset()
+                self.generation_id = self.read_generation_id()
+                logger.info(f"Database changed (generation {self.generation_id or 'unpublished'}); cache cleared")
+        return self.generation
+
+    def read_generation_id(self):
+        """Most recent ETL_GENERATION row of the database, if it was published"""
+        try:
+            with self.pool.connection() as conn:
+                row = conn.execute(
+                    "SELECT GENERATION_ID FROM ETL_GENERATION ORDER BY BUILT_AT DESC LIMIT 1"
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def code_decoder(self) -> CodeDecoder:
+        """The reference code descriptions of the current generation, read once"""
+        return self.fetch_with('code_decoder', CodeDecoder.from_connection, ())
+
+    def decode_codes(self, items) -> dict:
+        """Describe many (column or VALUE_TYPE, code) pairs without a query per code
+
+        e.g. decode_codes([('VIOLATION_CODE', '71'), ('PWS_TYPE_CODE', 'CWS')])
+        """
+        return self.code_decoder().decode_batch(items)
+
+    def fetch_with(self, name: str, reader, params: tuple):
+        """Run a reader function taking (conn, *params) through the cache"""
+        key = (self.check_generation(), name, params)
+        found, value = self.cache.get(key)
+        if found:
+            return value
+        with self.pool.connection() as conn:
+            value = reader(conn, *params)
+        self.cache.put(key, value)
+        return value
+
+    def fetch(self, name: str, sql: str, params: tuple, one: bool = False):
+        """Run a named query through the cache"""
+        def reader(conn, *params):
+            cursor = conn.execute(sql, params)
+            return cursor.fetchone() if one else tuple(cursor.fetchall())
+        return self.fetch_with(name, reader, params)
+
+    def water_system_by_id(self, pwsid: str, quarter: str = DEFAULT_QUARTER) -> Optional[sqlite3.Row]:
+        """Water system row for a PWSID in a quarter, or None"""
+        return self.fetch('water_system_by_id', WATER_SYSTEM_BY_ID, (pwsid, quarter), one=True)
+
+    def violations_by_pwsid(self, pwsid: str, quarter: str = DEFAULT_QUARTER) -> Tuple[sqlite3.Row, ...]:
+        """A water system's violations, most recent non-compliance first"""
+        return self.fetch('violations_by_pwsid', VIOLATIONS_BY_PWSID, (pwsid, quarter))
+
+    def lcr_samples_by_pwsid(self, pwsid: str, quarter: str = DEFAULT_QUARTER) -> Tuple[sqlite3.Row, ...]:
+        """A water system's lead and copper samples, most recent first"""
+        return self.fetch('lcr_samples_by_pwsid', LCR_SAMPLES_BY_PWSID, (pwsid, quarter))
+
+    def lcr_series(self, pwsid: str, contaminant_code: str = 'PB90',
+                   quarter: str = DEFAULT_QUARTER) -> Tuple[sqlite3.Row, ...]:
+        """A water system's PB90 or CU90 results in sampling order, with rolling statistics"""
+        return self.fetch('lcr_series', LCR_SERIES_BY_PWSID, (pwsid, contaminant_code, quarter))
+
+    def lcr_stats(self, pwsid: str, quarter: str = DEFAULT_QUARTER) -> Tuple[sqlite3.Row, ...]:
+        """A water system's PB90/CU90 summary statistics, one row per contaminant"""
+        return self.fetch('lcr_stats', LCR_STATS_BY_PWSID, (pwsid, quarter))
+
+    def geographic_areas_by_pwsid(self, pwsid: str, quarter: str = DEFAULT_QUARTER) -> Tuple[sqlite3.Row, ...]:
+        """Counties, cities and zip codes a water system serves"""
+        return self.fetch('geographic_areas_by_pwsid', GEOGRAPHIC_AREAS_BY_PWSID, (pwsid, quarter))
+
+    def violations(self, quarter: str = DEFAULT_QUARTER, status: str = None,
+                   is_health_based: str = None, contaminant_code: str = None) -> Tuple[sqlite3.Row, ...]:
+        """Violations in a quarter with their system names, optionally filtered
+
+        status is a VIOLATION_STATUS ('Unaddressed', 'Resolved', ...) and
+        is_health_based an IS_HEALTH_BASED_IND ('Y' or 'N').
+        """
+        return self.fetch('violations', VIOLATIONS, (quarter, status, is_health_based, contaminant_code))
+
+    def system_document(self, pwsid: str, quarter: str = DEFAULT_QUARTER) -> Optional[dict]:
+        """Everything the system detail page shows, from one SDWA_SYSTEM_DOCUMENTS lookup
+
+        The system row, its facilities, violations (with enforcement
+        actions), LCR samples, geographic areas and site visits, plus the
+        descriptions of the codes they use. The dict is shared through the
+        cache; callers must not modify it.
+        """
+        return self.fetch_with('system_document', read_system_document, (pwsid, quarter))
+
+    def map_document(self, level: str = 'county', quarter: str = DEFAULT_QUARTER) -> Optional[dict]:
+        """Per-area map measures for a level ('county', 'city' or 'zip'), from one AGG_MAP_DOCUMENTS lookup
+
+        The dict is shared through the cache; callers must not modify it.
+        """
+        return self.fetch_with('map_document', read_map_document, (level, quarter))
+
+    def search(self, term: str, quarter: str = None, limit: int = 50) -> Tuple[dict, ...]:
+        """Full-text water system search (needs the SDWA_SEARCH index)"""
+        return self.fetch_with('search', lambda conn, *params: tuple(search_water_systems(conn, *params)),
+                               (term, quarter, limit))
+
+    def cache_info(self):
+        info = self.cache.info()
+        info.update(generation=self.generation, generation_id=self.generation_id)
+        return info
+
+
+def time_lookups(api: SDWAQueries, pwsids: list, quarter: str, threads: int):
+    """Time each lookup once uncached and once cached, across threads"""
+    def lookup(pwsid):
+        started = time.perf_counter()
+        api.water_system_by_id(pwsid, quarter)
+        api.violations_by_pwsid(pwsid, quarter)
+        api.lcr_samples_by_pwsid(pwsid, quarter)
+        api.geographic_areas_by_pwsid(pwsid, quarter)
+        return (time.perf_counter() - started) / 4
+
+    timings = {}
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for label in ('cold', 'cached'):
+            seconds = list(executor.map(lookup, pwsids))
+            timings[label] = {
+                'median_ms': round(statistics.median(seconds) * 1000, 4),
+                'max_ms': round(max(seconds) * 1000, 4),
+            }
+    return timings
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Time cached lookups through the SDWA read API')
+    parser.add_argument('--db-path', type=str, default='./sdwa_georgia.db',
+                        help='Path to SQLite database file (default: ./sdwa_georgia.db)')
+    parser.add_argument('--quarter', type=str, default=DEFAULT_QUARTER,
+                        help=f'SUBMISSIONYEARQUARTER to query (default: {DEFAULT_QUARTER})')
+    parser.add_argument('--systems', type=int, default=500,
+                        help='Water systems to look up (default: 500)')
+    parser.add_argument('--threads', type=int, default=8,
+                        help='Concurrent lookup threads (default: 8)')
+    parser.add_argument('--pool-size', type=int, default=4,
+                        help='Read-only connections in the pool (default: 4)')
+
+    args = parser.parse_args()
+
+    with SDWAQueries(args.db_path, pool_size=args.pool_size, cache_size=args.systems * 4) as api:
+        with api.pool.connection() as conn:
+            pwsids = [row[0] for row in conn.execute(
+                "SELECT PWSID FROM SDWA_PUB_WATER_SYSTEMS WHERE SUBMISSIONYEARQUARTER = ? LIMIT ?",
+                (args.quarter, args.systems)
+            )]
+        timings = time_lookups(api, pwsids, args.quarter, args.threads)
+        for label, timing in timings.items():
+            logger.info(f"{label}: median {timing['median_ms']} ms, max {timing['max_ms']} ms per lookup")
+        logger.info(f"Cache: {api.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Shared fixtures for the ETL tests: tiny SDWA CSV files in a temp directory
+"""
+
+import csv
+import logging
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+ENFORCEMENT_COLUMNS = [
+    'ENFORCEMENT_ID', 'ENFORCEMENT_DATE', 'ENFORCEMENT_ACTION_TYPE_CODE', 'ENF_ACTION_CATEGORY',
+    'ENF_ORIGINATOR_CODE', 'ENF_FIRST_REPORTED_DATE', 'ENF_LAST_REPORTED_DATE',
+]
+
+
+def write_csv(path: Path, columns: list, rows: list):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows(rows)
+
+
+class ETLTestCase(unittest.TestCase):
+    """A temp data directory and database path, with ETL logging silenced"""
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self.tmp.name) / 'data'
+        self.data_dir.mkdir()
+        self.db_path = str(Path(self.tmp.name) / 'sdwa.db')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        logging.disable(logging.NOTSET)
+
+    def write_csv(self, file_name: str, columns: list, rows: list):
+        write_csv(self.data_dir / file_name, columns, rows)
+
+    def query(self, sql: str, params=(), db_path: str = None):
+        conn = sqlite3.connect(db_path or self.db_path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
@@ -0,0 +1,92 @@
+"""
+Aggregate tables: county and map summaries, LCR statistics
+"""
+
+import math
+import unittest
+
+from support import ENFORCEMENT_COLUMNS, ETLTestCase
+
+from etl_sdwa_to_sqlite import SDWAETLProcessor, lcr_statistics_numpy, lcr_statistics_python
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class CountySummaryTest(ETLTestCase):
+    """AGG_COUNTY_SUMMARY has the map's county rows, plus violation totals"""
+
+    def setUp(self):
+        super().setUp()
+        self.write_csv('SDWA_PUB_WATER_SYSTEMS.csv',
+                       ['SUBMISSIONYEARQUARTER', 'PWSID', 'PWS_NAME', 'PWS_ACTIVITY_CODE', 'POPULATION_SERVED_COUNT'],
+                       [['2025Q1', 'GA0010000', 'CITY OF MACON', 'A', '1000'],
+                        ['2025Q1', 'GA0020000', 'BIBB COUNTY WATER', 'I', '300']])
+        # GA0010000 serves two counties (and one area with no county);
+        # GA0020000 lists Bibb twice, once per area type
+        self.write_csv('SDWA_GEOGRAPHIC_AREAS.csv',
+                       ['SUBMISSIONYEARQUARTER', 'PWSID', 'GEO_ID', 'AREA_TYPE_CODE', 'COUNTY_SERVED'],
+                       [['2025Q1', 'GA0010000', '1', 'CN', 'Bibb'],
+                        ['2025Q1', 'GA0010000', '2', 'CN', 'Jones'],
+                        ['2025Q1', 'GA0010000', '3', 'CT', ''],
+                        ['2025Q1', 'GA0020000', '4', 'CN', 'Bibb'],
+                        ['2025Q1', 'GA0020000', '5', 'CT', 'Bibb']])
+        self.write_csv('SDWA_VIOLATIONS_ENFORCEMENT.csv',
+                       ['SUBMISSIONYEARQUARTER', 'PWSID', 'VIOLATION_ID', 'IS_HEALTH_BASED_IND', 'VIOLATION_STATUS']
+                       + ENFORCEMENT_COLUMNS,
+                       [['2025Q1', 'GA0010000', '1', 'Y', 'Unaddressed'] + [''] * 7,
+                        ['2025Q1', 'GA0010000', '2', 'N', 'Resolved'] + [''] * 7,
+                        ['2025Q1', 'GA0020000', '3', 'Y', 'Addressed'] + [''] * 7])
+        SDWAETLProcessor(str(self.data_dir), self.db_path).run_etl()
+
+    def test_county_rows(self):
+        self.assertEqual(self.query("SELECT * FROM AGG_COUNTY_SUMMARY ORDER BY COUNTY_SERVED"), [
+            # quarter, county, systems, active, population, violations, health based, unaddressed, systems with
+            ('2025Q1', 'Bibb', 2, 1, 800, 3, 2, 1, 2),
+            ('2025Q1', 'Jones', 1, 1, 500, 2, 1, 1, 1),
+        ])
+
+    def test_matches_map_county_rows(self):
+        self.assertEqual(
+            self.query("""
+                SELECT SUBMISSIONYEARQUARTER, COUNTY_SERVED, SYSTEM_COUNT, ACTIVE_SYSTEM_COUNT, POPULATION_SERVED
+                FROM AGG_COUNTY_SUMMARY ORDER BY 2
+            """),
+            self.query("""
+                SELECT SUBMISSIONYEARQUARTER, AREA_NAME, SYSTEM_COUNT, ACTIVE_SYSTEM_COUNT, POPULATION_SERVED
+                FROM AGG_GEO_SUMMARY WHERE AREA_LEVEL = 'county' ORDER BY 2
+            """))
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class LCRStatisticsTest(unittest.TestCase):
+    """The NumPy backend computes what the pure Python one does"""
+
+    def test_backends_agree(self):
+        series = [
+            ('a', 0.015, [0.004, 0.02, 0.03, 0.001, 0.016]),
+            ('b', 1.3, [1.5]),
+            ('c', 0.015, [0.01, 0.012, 0.014, 0.009]),
+        ]
+        expected_points, expected_totals = lcr_statistics_python(series, 3)
+        points, totals = lcr_statistics_numpy(series, 3)
+        for name, values in list(expected_points.items()) + list(expected_totals.items()):
+            actual = points[name] if name in points else totals[name]
+            with self.subTest(name=name):
+                self.assertEqual(len(actual), len(values))
+                for value, expected in zip(actual, values):
+                    if expected is None:
+                        self.assertIsNone(value)
+                    else:
+                        self.assertTrue(math.isclose(value, expected, rel_tol=1e-9, abs_tol=1e-12),
+                                        f"{value!r} != {expected!r}")
+
+        self.assertEqual(expected_totals['exceedances'], [3, 1, 0])
+        self.assertEqual(expected_totals['last_exceedance'], [4, 0, -1])
+        self.assertEqual(expected_points['streak'][:5], [0, 1, 2, 0, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+"""
+Change detection between two quarters or two databases (sdwa_diff)
+"""
+
+import json
+import sqlite3
+import unittest
+
+from support import ENFORCEMENT_COLUMNS, ETLTestCase
+
+from etl_sdwa_to_sqlite import SDWAETLProcessor
+from sdwa_diff import ChangeDetector, change_signal, iter_keyed_rows, merge_rows
+
+
+class MergeRowsTest(unittest.TestCase):
+    """The merge pairs rows by key in SQLite's own ORDER BY order"""
+
+    def setUp(self):
+        self.old_conn = sqlite3.connect(':memory:')
+        self.new_conn = sqlite3.connect(':memory:')
+        self.out_conn = sqlite3.connect(':memory:')
+        # An untyped key column holds integers, reals and text side by side,
+        # which SQLite sorts numbers first and Python cannot compare at all
+        for conn in (self.old_conn, self.new_conn):
+            conn.execute("CREATE TABLE T (K, NAME TEXT, PRIMARY KEY (K))")
+        self.old_conn.executemany("INSERT INTO T VALUES (?, ?)",
+                                  [(2, 'two'), (10, 'ten'), (2.5, 'two and a half'), ('10', 'text ten'),
+                                   ('b', 'bee')])
+        self.new_conn.executemany("INSERT INTO T VALUES (?, ?)",
+                                  [(2, 'two'), (10, 'TEN'), (3, 'three'), ('10', 'text ten'), ('a', 'ay')])
+
+    def tearDown(self):
+        for conn in (self.old_conn, self.new_conn, self.out_conn):
+            conn.close()
+
+    def test_pairs_follow_key_order_across_types(self):
+        pairs = list(merge_rows(iter_keyed_rows(self.old_conn, 'T', ['K'], ['NAME'], batch_size=2),
+                                iter_keyed_rows(self.new_conn, 'T', ['K'], ['NAME'], batch_size=2)))
+        self.assertEqual(pairs, [
+            ((2, 'two'), (2, 'two')),
+            ((2.5, 'two and a half'), None),
+            (None, (3, 'three')),
+            ((10, 'ten'), (10, 'TEN')),
+            (('10', 'text ten'), ('10', 'text ten')),
+            (None, ('a', 'ay')),
+            (('b', 'bee'), None),
+        ])
+
+    def test_changes_and_summary(self):
+        summary, = ChangeDetector(self.old_conn, self.new_conn, self.out_conn, batch_size=2).run(
+            'old..new', 'old.db', 'new.db', tables=['T'])
+        self.assertEqual((summary['old'], summary['new']), (5, 5))
+        self.assertEqual((summary['inserted'], summary['deleted'], summary['updated']), (2, 2, 1))
+        self.assertEqual(summary['column_changes'], {'NAME': 1})
+        changes = self.out_conn.execute(
+            "SELECT CHANGE_TYPE, ROW_KEY, CHANGED_COLUMNS FROM ETL_CHANGES ORDER BY CHANGE_ID").fetchall()
+        self.assertEqual(changes, [
+            ('deleted', '[2.5]', None),
+            ('inserted', '[3]', None),
+            ('updated', '[10]', json.dumps({'NAME': ['ten', 'TEN']})),
+            ('inserted', '["a"]', None),
+            ('deleted', '["b"]', None),
+        ])
+
+
+class ChangeSignalTest(unittest.TestCase):
+    """Signals name the changes worth an alert"""
+
+    def test_resolved_violation(self):
+        old = {'VIOLATION_STATUS': 'Unaddressed'}
+        new = {'VIOLATION_STATUS': 'Resolved'}
+        changed = {'VIOLATION_STATUS': ['Unaddressed', 'Resolved']}
+        self.assertEqual(change_signal('SDWA_VIOLATIONS_ENFORCEMENT', 'updated', old, new, changed),
+                         'resolved_violation')
+        # Already closed: archiving a resolved violation is not a new resolution
+        self.assertIsNone(change_signal('SDWA_VIOLATIONS_ENFORCEMENT', 'updated',
+                                        {'VIOLATION_STATUS': 'Resolved'}, {'VIOLATION_STATUS': 'Archived'},
+                                        {'VIOLATION_STATUS': ['Resolved', 'Archived']}))
+
+    def test_population_change(self):
+        self.assertEqual(change_signal('SDWA_PUB_WATER_SYSTEMS', 'updated',
+                                       {'POPULATION_SERVED_COUNT': 1200}, {'POPULATION_SERVED_COUNT': 1500},
+                                       {'POPULATION_SERVED_COUNT': [1200, 1500]}),
+                         'population_change')
+        self.assertIsNone(change_signal('SDWA_PUB_WATER_SYSTEMS', 'updated',
+                                        {'PWS_NAME': 'A'}, {'PWS_NAME': 'B'}, {'PWS_NAME': ['A', 'B']}))
+
+    def test_new_lcr_exceedance(self):
+        above = {'CONTAMINANT_CODE': 'PB90', 'SAMPLE_MEASURE': 0.02}
+        below = {'CONTAMINANT_CODE': 'PB90', 'SAMPLE_MEASURE': 0.01}
+        self.assertEqual(change_signal('SDWA_LCR_SAMPLES', 'inserted', None, above, {}), 'new_lcr_exceedance')
+        self.assertEqual(change_signal('SDWA_LCR_SAMPLES', 'updated', below, above,
+                                       {'SAMPLE_MEASURE': [0.01, 0.02]}), 'new_lcr_exceedance')
+        # Still above the action level, or a raw text measure: not new
+        self.assertIsNone(change_signal('SDWA_LCR_SAMPLES', 'updated', above,
+                                        {'CONTAMINANT_CODE': 'PB90', 'SAMPLE_MEASURE': 0.03},
+                                        {'SAMPLE_MEASURE': [0.02, 0.03]}))
+        self.assertIsNone(change_signal('SDWA_LCR_SAMPLES', 'inserted', None,
+                                        {'CONTAMINANT_CODE': 'PB90', 'SAMPLE_MEASURE': '0.02'}, {}))
+
+
+class QuarterDiffTest(ETLTestCase):
+    """Two quarters of one loaded database line up by key without the quarter"""
+
+    def setUp(self):
+        super().setUp()
+        self.write_csv('SDWA_PUB_WATER_SYSTEMS.csv',
+                       ['SUBMISSIONYEARQUARTER', 'PWSID', 'PWS_NAME', 'POPULATION_SERVED_COUNT'],
+                       [['2025Q1', 'GA0010000', 'CITY OF MACON', '1200'],
+                        ['2025Q1', 'GA0020000', 'BIBB COUNTY WATER', '800'],
+                        ['2025Q2', 'GA0010000', 'CITY OF MACON', '1500'],
+                        ['2025Q2', 'GA0020000', 'BIBB COUNTY WATER', '800']])
+        self.write_csv('SDWA_VIOLATIONS_ENFORCEMENT.csv',
+                       ['SUBMISSIONYEARQUARTER', 'PWSID', 'VIOLATION_ID', 'IS_HEALTH_BASED_IND', 'VIOLATION_STATUS']
+                       + ENFORCEMENT_COLUMNS,
+                       [['2025Q1', 'GA0010000', '1', 'Y', 'Unaddressed'] + [''] * 7,
+                        ['2025Q2', 'GA0010000', '1', 'Y', 'Resolved'] + [''] * 7,
+                        ['2025Q2', 'GA0020000', '2', 'N', 'Unaddressed'] + [''] * 7])
+        self.write_csv('SDWA_LCR_SAMPLES.csv',
+                       ['SUBMISSIONYEARQUARTER', 'PWSID', 'SAMPLE_ID', 'SAR_ID', 'CONTAMINANT_CODE', 'SAMPLE_MEASURE'],
+                       [['2025Q1', 'GA0020000', 'S1', '1', 'PB90', '0.004'],
+                        ['2025Q2', 'GA0020000', 'S1', '1', 'PB90', '0.004'],
+                        ['2025Q2', 'GA0020000', 'S2', '2', 'PB90', '0.021']])
+        SDWAETLProcessor(str(self.data_dir), self.db_path).run_etl()
+
+    def test_signals(self):
+        conn = sqlite3.connect(self.db_path)
+        out_conn = sqlite3.connect(':memory:')
+        try:
+            ChangeDetector(conn, conn, out_conn, '2025Q1', '2025Q2').run(
+                '2025Q1..2025Q2', self.db_path, self.db_path,
+                tables=['SDWA_PUB_WATER_SYSTEMS', 'SDWA_VIOLATIONS_ENFORCEMENT', 'SDWA_LCR_SAMPLES'])
+            signals = out_conn.execute("""
+                SELECT TABLE_NAME, CHANGE_TYPE, PWSID, SIGNAL FROM ETL_CHANGES
+                WHERE SIGNAL IS NOT NULL ORDER BY TABLE_NAME, SIGNAL
+            """).fetchall()
+        finally:
+            conn.close()
+            out_conn.close()
+        self.assertEqual(signals, [
+            ('SDWA_LCR_SAMPLES', 'inserted', 'GA0020000', 'new_lcr_exceedance'),
+            ('SDWA_PUB_WATER_SYSTEMS', 'updated', 'GA0010000', 'population_change'),
+            ('SDWA_VIOLATIONS_ENFORCEMENT', 'inserted', 'GA0020000', 'new_violation'),
+            ('SDWA_VIOLATIONS_ENFORCEMENT', 'updated', 'GA0010000', 'resolved_violation'),
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+Published database generations (--publish) and rollback
+"""
+
+import unittest
+from pathlib import Path
+
+from support import ETLTestCase
+
+from etl_sdwa_to_sqlite import GenerationStore, SDWAETLProcessor
+
+
+class PublishRollbackTest(ETLTestCase):
+    """Rollback points the database path back at the previous generation"""
+
+    def build_and_publish(self, store: GenerationStore, pws_name: str):
+        self.write_csv('SDWA_PUB_WATER_SYSTEMS.csv',
+                       ['SUBMISSIONYEARQUARTER', 'PWSID', 'PWS_NAME'],
+                       [['2025Q1', 'GA0010000', pws_name]])
+        generation_id = store.new_generation_id()
+        build_path = store.prepare_build()
+        SDWAETLProcessor(str(self.data_dir), str(build_path), generation_id=generation_id).run_etl()
+        return generation_id, store.publish(generation_id)
+
+    def current_state(self):
+        return (self.query("SELECT GENERATION_ID FROM ETL_GENERATION")[0][0],
+                self.query("SELECT PWS_NAME FROM SDWA_PUB_WATER_SYSTEMS")[0][0])
+
+    def test_publish_then_rollback(self):
+        store = GenerationStore(Path(self.db_path))
+        first_id, first = self.build_and_publish(store, 'CITY OF MACON')
+        second_id, second = self.build_and_publish(store, 'MACON WATER AUTHORITY')
+        self.assertEqual(store.current(), second.resolve())
+        self.assertEqual(self.current_state(), (second_id, 'MACON WATER AUTHORITY'))
+
+        self.assertEqual(store.rollback(), first)
+        self.assertTrue(Path(self.db_path).is_symlink())
+        self.assertEqual(store.current(), first.resolve())
+        self.assertEqual(self.current_state(), (first_id, 'CITY OF MACON'))
+        # The rolled-back generation is kept, and nothing older is left to roll back to
+        self.assertEqual(store.generations(), [first, second])
+        with self.assertRaises(FileNotFoundError):
+            store.rollback()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Incremental loads (--incremental) after a full build
+"""
+
+import os
+import unittest
+from unittest import mock
+
+from support import ETLTestCase
+
+from etl_sdwa_to_sqlite import SDWAETLProcessor
+
+
+class IncrementalAfterFullLoadTest(ETLTestCase):
+    """Every load path records ETL_MANIFEST, so unchanged files are not diffed"""
+
+    def setUp(self):
+        super().setUp()
+        self.write_water_systems('CITY OF MACON')
+        self.write_csv('SDWA_FACILITIES.csv',
+                       ['SUBMISSIONYEARQUARTER', 'PWSID', 'FACILITY_ID', 'FACILITY_NAME'],
+                       [['2025Q1', 'GA0010000', '1', 'WELL 1'],
+                        ['2025Q1', 'GA0020000', '2', 'INTAKE']])
+
+    def write_water_systems(self, first_name: str):
+        self.write_csv('SDWA_PUB_WATER_SYSTEMS.csv',
+                       ['SUBMISSIONYEARQUARTER', 'PWSID', 'PWS_NAME'],
+                       [['2025Q1', 'GA0010000', first_name],
+                        ['2025Q1', 'GA0020000', 'BIBB COUNTY WATER']])
+
+    def run_incremental(self):
+        processor = SDWAETLProcessor(str(self.data_dir), self.db_path, incremental=True)
+        with mock.patch.object(processor, 'apply_csv_delta', wraps=processor.apply_csv_delta) as delta:
+            processor.run_etl()
+        return sorted(call.args[1] for call in delta.call_args_list)
+
+    def test_full_load_paths_record_the_manifest(self):
+        for options in ({}, {'bulk': True}, {'workers': 2}):
+            with self.subTest(**options):
+                if os.path.exists(self.db_path):
+                    os.remove(self.db_path)
+                SDWAETLProcessor(str(self.data_dir), self.db_path, **options).run_etl()
+                self.assertEqual(self.query("SELECT FILE_NAME, ROW_COUNT FROM ETL_MANIFEST ORDER BY 1"),
+                                 [('SDWA_FACILITIES.csv', 2), ('SDWA_PUB_WATER_SYSTEMS.csv', 2)])
+                self.assertEqual(self.run_incremental(), [])
+
+    def test_only_changed_files_are_diffed(self):
+        SDWAETLProcessor(str(self.data_dir), self.db_path).run_etl()
+        # Rewritten with identical content: the hash matches, nothing is staged
+        self.write_csv('SDWA_FACILITIES.csv',
+                       ['SUBMISSIONYEARQUARTER', 'PWSID', 'FACILITY_ID', 'FACILITY_NAME'],
+                       [['2025Q1', 'GA0010000', '1', 'WELL 1'],
+                        ['2025Q1', 'GA0020000', '2', 'INTAKE']])
+        self.write_water_systems('MACON WATER AUTHORITY')
+        os.utime(self.data_dir / 'SDWA_FACILITIES.csv', (0, 0))
+        self.assertEqual(self.run_incremental(), ['SDWA_PUB_WATER_SYSTEMS'])
+        self.assertEqual(self.query("SELECT PWS_NAME FROM SDWA_PUB_WATER_SYSTEMS WHERE PWSID = 'GA0010000'"),
+                         [('MACON WATER AUTHORITY',)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+Sample query parameters for the index advisor
+"""
+
+import sqlite3
+import unittest
+
+from support import ENFORCEMENT_COLUMNS, ETLTestCase
+
+from etl_sdwa_to_sqlite import SDWAETLProcessor
+from index_advisor import sample_parameters
+
+
+class SampleParametersTest(ETLTestCase):
+    """Values are bound as parameters, never spliced into the SQL"""
+
+    def setUp(self):
+        super().setUp()
+        self.write_csv('SDWA_PUB_WATER_SYSTEMS.csv',
+                       ['SUBMISSIONYEARQUARTER', 'PWSID', 'PWS_NAME'],
+                       [['2025Q1', "GA'0010000", 'CITY OF MACON'],
+                        ['2025Q1', 'GA0020000', 'BIBB COUNTY WATER']])
+        self.write_csv('SDWA_VIOLATIONS_ENFORCEMENT.csv',
+                       ['SUBMISSIONYEARQUARTER', 'PWSID', 'VIOLATION_ID', 'IS_HEALTH_BASED_IND', 'VIOLATION_STATUS']
+                       + ENFORCEMENT_COLUMNS,
+                       [['2025Q1', "GA'0010000", '1', 'Y', 'Resolved'] + [''] * 7,
+                        ['2025Q1', "GA'0010000", '2', 'N', 'Unaddressed'] + [''] * 7,
+                        ['2025Q1', 'GA0020000', '3', 'Y', 'Addressed'] + [''] * 7])
+        SDWAETLProcessor(str(self.data_dir), self.db_path).run_etl()
+        self.conn = sqlite3.connect(self.db_path)
+
+    def tearDown(self):
+        self.conn.close()
+        super().tearDown()
+
+    def test_quoted_values(self):
+        params = sample_parameters(self.conn, '2025Q1')
+        self.assertEqual(params['pwsid'], "GA'0010000")
+        self.assertIn(params['violation_id'], ('1', '2'))
+
+    def test_quarter_is_not_interpreted_as_sql(self):
+        params = sample_parameters(self.conn, "2025Q0' OR '1' = '1")
+        # No violations in that quarter: the first water system is used instead
+        self.assertEqual(params['quarter'], "2025Q0' OR '1' = '1")
+        self.assertEqual(params['pwsid'], self.conn.execute(
+            "SELECT PWSID FROM SDWA_PUB_WATER_SYSTEMS LIMIT 1").fetchone()[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
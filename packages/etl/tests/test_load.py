@@ -0,0 +1,59 @@
+"""
+Load-time conversion: ISO dates and typed INTEGER/REAL values
+"""
+
+import unittest
+
+from support import ETLTestCase
+
+from etl_sdwa_to_sqlite import SDWAETLProcessor
+
+
+class ConvertedValuesTest(ETLTestCase):
+    """Dates load as ISO-8601 and numeric columns as numbers, unless --raw-values"""
+
+    def setUp(self):
+        super().setUp()
+        self.write_csv('SDWA_PUB_WATER_SYSTEMS.csv',
+                       ['SUBMISSIONYEARQUARTER', 'PWSID', 'PWS_NAME', 'POPULATION_SERVED_COUNT',
+                        'FIRST_REPORTED_DATE', 'PWS_DEACTIVATION_DATE'],
+                       [['2025Q1', 'GA0010000', 'CITY OF MACON', '1200', '01/15/2025', '--->'],
+                        ['2025Q1', 'GA0020000', 'BIBB COUNTY WATER', 'n/a', '13/01/2025', '']])
+        self.write_csv('SDWA_LCR_SAMPLES.csv',
+                       ['SUBMISSIONYEARQUARTER', 'PWSID', 'SAMPLE_ID', 'SAR_ID', 'CONTAMINANT_CODE',
+                        'SAMPLE_MEASURE', 'SAMPLING_END_DATE'],
+                       [['2025Q1', 'GA0010000', 'S1', '7', 'PB90', '0.0042', '12/31/2024']])
+
+    def test_iso_dates_and_typed_numbers(self):
+        SDWAETLProcessor(str(self.data_dir), self.db_path).run_etl()
+        self.assertEqual(self.query("""
+            SELECT FIRST_REPORTED_DATE, PWS_DEACTIVATION_DATE,
+                   POPULATION_SERVED_COUNT, typeof(POPULATION_SERVED_COUNT)
+            FROM SDWA_PUB_WATER_SYSTEMS WHERE PWSID = 'GA0010000'
+        """), [('2025-01-15', '--->', 1200, 'integer')])
+        self.assertEqual(self.query("""
+            SELECT SAMPLING_END_DATE, SAR_ID, typeof(SAR_ID), SAMPLE_MEASURE, typeof(SAMPLE_MEASURE)
+            FROM SDWA_LCR_SAMPLES
+        """), [('2024-12-31', 7, 'integer', 0.0042, 'real')])
+
+    def test_invalid_values_are_kept_and_flagged(self):
+        SDWAETLProcessor(str(self.data_dir), self.db_path).run_etl()
+        self.assertEqual(self.query("""
+            SELECT FIRST_REPORTED_DATE, POPULATION_SERVED_COUNT, typeof(POPULATION_SERVED_COUNT)
+            FROM SDWA_PUB_WATER_SYSTEMS WHERE PWSID = 'GA0020000'
+        """), [('13/01/2025', 'n/a', 'text')])
+        self.assertEqual(self.query("""
+            SELECT RULE, COLUMN_NAME, VALUE, ACTION FROM ETL_QUARANTINE
+            WHERE TABLE_NAME = 'SDWA_PUB_WATER_SYSTEMS' ORDER BY COLUMN_NAME
+        """), [('invalid_date', 'FIRST_REPORTED_DATE', '13/01/2025', 'flagged'),
+               ('invalid_integer', 'POPULATION_SERVED_COUNT', 'n/a', 'flagged')])
+
+    def test_raw_values_keep_the_source_dates(self):
+        SDWAETLProcessor(str(self.data_dir), self.db_path, convert_types=False).run_etl()
+        self.assertEqual(self.query("SELECT FIRST_REPORTED_DATE FROM SDWA_PUB_WATER_SYSTEMS ORDER BY PWSID"),
+                         [('01/15/2025',), ('13/01/2025',)])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM ETL_QUARANTINE"), [(0,)])
+
+
+if __name__ == '__main__':
+    unittest.main()
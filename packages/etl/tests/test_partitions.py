@@ -0,0 +1,47 @@
+"""
+Partitioned builds: splitting rows into agency shards
+"""
+
+import unittest
+from pathlib import Path
+
+from support import ETLTestCase
+
+from sdwa_partitions import PartitionedBuild, ShardedSDWA
+
+
+class AgencyShardTest(ETLTestCase):
+    """Rows of systems missing from the water system file are quarantined in the catalog"""
+
+    def setUp(self):
+        super().setUp()
+        self.out_dir = Path(self.tmp.name) / 'shards'
+        self.write_csv('SDWA_PUB_WATER_SYSTEMS.csv',
+                       ['SUBMISSIONYEARQUARTER', 'PWSID', 'PWS_NAME', 'PRIMACY_AGENCY_CODE'],
+                       [['2025Q1', 'GA0010000', 'CITY OF MACON', 'GA'],
+                        ['2025Q1', 'AL0020000', 'CITY OF MOBILE', 'AL']])
+        self.write_csv('SDWA_FACILITIES.csv',
+                       ['SUBMISSIONYEARQUARTER', 'PWSID', 'FACILITY_ID', 'FACILITY_NAME'],
+                       [['2025Q1', 'GA0010000', '1', 'WELL 1'],
+                        ['2025Q1', 'AL0020000', '2', 'INTAKE'],
+                        ['2025Q1', 'ZZ9999999', '3', 'ORPHAN WELL']])
+
+    def test_orphan_rows_are_quarantined_not_sharded(self):
+        failed = PartitionedBuild(str(self.data_dir), str(self.out_dir), ('agency',)).run()
+        self.assertEqual(failed, [])
+        catalog = str(self.out_dir / 'catalog.db')
+        self.assertEqual(self.query("SELECT SHARD_ID FROM ETL_SHARDS ORDER BY 1", db_path=catalog),
+                         [('AL',), ('GA',)])
+        self.assertEqual(self.query("SELECT TABLE_NAME, RULE, VALUE, ACTION FROM ETL_QUARANTINE", db_path=catalog),
+                         [('SDWA_FACILITIES', 'unknown_pwsid', 'ZZ9999999', 'rejected')])
+        self.assertEqual([shard_id for shard_id, _ in ShardedSDWA(str(self.out_dir)).shards()], ['AL', 'GA'])
+        self.assertEqual(self.query("SELECT FACILITY_NAME FROM SDWA_FACILITIES",
+                                    db_path=str(self.out_dir / 'GA.db')), [('WELL 1',)])
+
+        # A rebuild replaces the quarantined rows instead of adding to them
+        PartitionedBuild(str(self.data_dir), str(self.out_dir), ('agency',)).run()
+        self.assertEqual(self.query("SELECT COUNT(*) FROM ETL_QUARANTINE", db_path=catalog), [(1,)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Resumed loads (--resume) when a source file changed after its checkpoint
+"""
+
+import hashlib
+import sqlite3
+import unittest
+from unittest import mock
+
+from support import ENFORCEMENT_COLUMNS, ETLTestCase
+
+from etl_sdwa_to_sqlite import CSVSource, SDWAETLProcessor
+
+
+class ResumeAfterSourceChangeTest(ETLTestCase):
+    """A changed parent file is reloaded without breaking its children's foreign keys"""
+
+    def setUp(self):
+        super().setUp()
+        self.write_csv('SDWA_REF_CODE_VALUES.csv',
+                       ['VALUE_TYPE', 'VALUE_CODE', 'VALUE_DESCRIPTION'],
+                       [['PWS_TYPE_CODE', 'CWS', 'Community water system']])
+        self.write_water_systems('CITY OF MACON')
+        self.write_csv('SDWA_VIOLATIONS_ENFORCEMENT.csv',
+                       ['SUBMISSIONYEARQUARTER', 'PWSID', 'VIOLATION_ID', 'IS_HEALTH_BASED_IND', 'VIOLATION_STATUS']
+                       + ENFORCEMENT_COLUMNS,
+                       [['2025Q1', 'GA0010000', '1', 'Y', 'Resolved', '101', '01/15/2025', 'SFJ', 'Formal', '', '', ''],
+                        ['2025Q1', 'GA0010000', '1', 'Y', 'Resolved', '102', '02/15/2025', 'SIA', 'Informal', '', '', ''],
+                        ['2025Q1', 'GA0020000', '2', 'N', 'Unaddressed', '', '', '', '', '', '', '']])
+
+    def write_water_systems(self, first_name: str):
+        self.write_csv('SDWA_PUB_WATER_SYSTEMS.csv',
+                       ['SUBMISSIONYEARQUARTER', 'PWSID', 'PWS_NAME', 'PWS_TYPE_CODE'],
+                       [['2025Q1', 'GA0010000', first_name, 'CWS'],
+                        ['2025Q1', 'GA0020000', 'BIBB COUNTY WATER', 'CWS']])
+
+    def run_etl(self, **options):
+        SDWAETLProcessor(str(self.data_dir), self.db_path, resume=True, **options).run_etl()
+
+    def assert_reloaded(self):
+        self.assertEqual(self.query("SELECT PWS_NAME FROM SDWA_PUB_WATER_SYSTEMS WHERE PWSID = 'GA0010000'"),
+                         [('MACON WATER AUTHORITY',)])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM SDWA_VIOLATIONS_ENFORCEMENT"), [(2,)])
+        self.assertEqual(self.query("SELECT ENFORCEMENT_ID FROM SDWA_ENFORCEMENT_ACTIONS ORDER BY 1"),
+                         [('101',), ('102',)])
+        self.assertEqual(self.query("PRAGMA foreign_key_check"), [])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM ETL_CHECKPOINTS WHERE COMPLETED = 0"), [(0,)])
+
+    def test_changed_parent_file_with_foreign_keys_enforced(self):
+        self.run_etl()
+        self.write_water_systems('MACON WATER AUTHORITY')
+        self.run_etl()
+        self.assert_reloaded()
+
+    def test_changed_parent_file_in_bulk_mode(self):
+        self.run_etl(bulk=True)
+        self.write_water_systems('MACON WATER AUTHORITY')
+        self.run_etl(bulk=True)
+        self.assert_reloaded()
+
+
+class ResumeFromOffsetTest(ETLTestCase):
+    """Checkpoints hash the bytes loaded so far, so only resume reads a file to check it"""
+
+    def setUp(self):
+        super().setUp()
+        self.write_csv('SDWA_PUB_WATER_SYSTEMS.csv',
+                       ['SUBMISSIONYEARQUARTER', 'PWSID', 'PWS_NAME'],
+                       [['2025Q1', 'GA0010000', 'CITY OF MACON'],
+                        ['2025Q1', 'GA0020000', 'BIBB COUNTY WATER'],
+                        ['2025Q1', 'GA0030000', 'CITY OF WARNER ROBINS']])
+        self.csv_path = self.data_dir / 'SDWA_PUB_WATER_SYSTEMS.csv'
+
+    def interrupt_after(self, records: int):
+        """Rewind the table and its checkpoint as if the load stopped after records rows"""
+        data = self.csv_path.read_bytes()
+        offset = len(b''.join(data.splitlines(keepends=True)[:records + 1]))
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            conn.execute("DELETE FROM SDWA_PUB_WATER_SYSTEMS WHERE PWSID > 'GA0010000'")
+            # Marks the committed row, which a resumed load does not rewrite
+            conn.execute("UPDATE SDWA_PUB_WATER_SYSTEMS SET PWS_NAME = 'COMMITTED'")
+            conn.execute("UPDATE ETL_CHECKPOINTS SET CONTENT_HASH = ?, ROWS_COMMITTED = ?, BYTE_OFFSET = ?, "
+                         "COMPLETED = 0 WHERE TABLE_NAME = 'SDWA_PUB_WATER_SYSTEMS'",
+                         (hashlib.sha256(data[:offset]).hexdigest(), records, offset))
+        conn.close()
+
+    def checkpoint(self):
+        return self.query("SELECT CONTENT_HASH, ROWS_COMMITTED, COMPLETED FROM ETL_CHECKPOINTS "
+                          "WHERE TABLE_NAME = 'SDWA_PUB_WATER_SYSTEMS'")
+
+    def test_load_without_resume_does_not_rehash_inputs(self):
+        with mock.patch.object(CSVSource, 'stream_digest', side_effect=AssertionError('extra pass')):
+            SDWAETLProcessor(str(self.data_dir), self.db_path).run_etl()
+        self.assertEqual(self.checkpoint(),
+                         [(hashlib.sha256(self.csv_path.read_bytes()).hexdigest(), 3, 1)])
+
+    def test_resume_continues_after_the_checkpoint(self):
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                SDWAETLProcessor(str(self.data_dir), self.db_path, resume=True, workers=workers).run_etl()
+                self.interrupt_after(1)
+                SDWAETLProcessor(str(self.data_dir), self.db_path, resume=True, workers=workers).run_etl()
+                self.assertEqual(self.query("SELECT PWSID, PWS_NAME FROM SDWA_PUB_WATER_SYSTEMS ORDER BY 1"),
+                                 [('GA0010000', 'COMMITTED'), ('GA0020000', 'BIBB COUNTY WATER'),
+                                  ('GA0030000', 'CITY OF WARNER ROBINS')])
+                self.assertEqual(self.checkpoint(),
+                                 [(hashlib.sha256(self.csv_path.read_bytes()).hexdigest(), 3, 1)])
+
+    def test_rows_appended_to_a_completed_file_reload_it(self):
+        SDWAETLProcessor(str(self.data_dir), self.db_path, resume=True).run_etl()
+        with open(self.csv_path, 'a', encoding='utf-8', newline='') as f:
+            f.write('2025Q1,GA0040000,CITY OF PERRY\r\n')
+        SDWAETLProcessor(str(self.data_dir), self.db_path, resume=True).run_etl()
+        self.assertEqual(self.query("SELECT COUNT(*) FROM SDWA_PUB_WATER_SYSTEMS"), [(4,)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Splitting the violations file into violations and enforcement actions
+"""
+
+import unittest
+
+from support import ENFORCEMENT_COLUMNS, ETLTestCase
+
+from etl_sdwa_to_sqlite import SDWAETLProcessor
+
+VIOLATION_COLUMNS = ['SUBMISSIONYEARQUARTER', 'PWSID', 'VIOLATION_ID', 'IS_HEALTH_BASED_IND', 'VIOLATION_STATUS']
+
+
+class EnforcementSplitTest(ETLTestCase):
+    """One violation row per key and one action row per enforcement action"""
+
+    def setUp(self):
+        super().setUp()
+        self.write_csv('SDWA_PUB_WATER_SYSTEMS.csv',
+                       ['SUBMISSIONYEARQUARTER', 'PWSID', 'PWS_NAME'],
+                       [['2025Q1', 'GA0010000', 'CITY OF MACON'],
+                        ['2025Q1', 'GA0020000', 'BIBB COUNTY WATER']])
+        # Violation 1's actions are not consecutive in the file
+        self.write_csv('SDWA_VIOLATIONS_ENFORCEMENT.csv', VIOLATION_COLUMNS + ENFORCEMENT_COLUMNS,
+                       [['2025Q1', 'GA0010000', '1', 'Y', 'Resolved',
+                         '101', '01/15/2025', 'SFJ', 'Formal', 'R', '01/20/2025', '03/01/2025'],
+                        ['2025Q1', 'GA0020000', '2', 'N', 'Unaddressed', '', '', '', '', '', '', ''],
+                        ['2025Q1', 'GA0010000', '1', 'Y', 'Resolved',
+                         '102', '02/05/2019', 'SIA', 'Informal', 'S', '', ''],
+                        ['2025Q1', 'GA0020000', '3', 'Y', 'Addressed',
+                         '103', '12/31/2024', 'SFL', 'Formal', 'R', '', '']])
+
+    def assert_split(self):
+        self.assertEqual(self.query("SELECT VIOLATION_ID, VIOLATION_STATUS FROM SDWA_VIOLATIONS_ENFORCEMENT "
+                                    "ORDER BY VIOLATION_ID"),
+                         [('1', 'Resolved'), ('2', 'Unaddressed'), ('3', 'Addressed')])
+        self.assertEqual(self.query("SELECT VIOLATION_ID, ENFORCEMENT_ID, ENFORCEMENT_DATE, "
+                                    "ENF_FIRST_REPORTED_DATE, ENF_LAST_REPORTED_DATE "
+                                    "FROM SDWA_ENFORCEMENT_ACTIONS ORDER BY ENFORCEMENT_ID"),
+                         [('1', '101', '2025-01-15', '2025-01-20', '2025-03-01'),
+                          ('1', '102', '2019-02-05', None, None),
+                          ('3', '103', '2024-12-31', None, None)])
+        # Latest-first ordering is chronological, not by month
+        self.assertEqual(self.query("SELECT ENFORCEMENT_ID FROM SDWA_ENFORCEMENT_ACTIONS "
+                                    "ORDER BY ENFORCEMENT_DATE DESC"),
+                         [('101',), ('103',), ('102',)])
+
+    def test_sequential_load(self):
+        SDWAETLProcessor(str(self.data_dir), self.db_path).run_etl()
+        self.assert_split()
+
+    def test_bulk_load(self):
+        SDWAETLProcessor(str(self.data_dir), self.db_path, bulk=True).run_etl()
+        self.assert_split()
+
+    def test_parallel_load(self):
+        SDWAETLProcessor(str(self.data_dir), self.db_path, workers=2).run_etl()
+        self.assert_split()
+
+
+if __name__ == '__main__':
+    unittest.main()
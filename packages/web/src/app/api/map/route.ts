@@ -0,0 +1,21 @@
+import { NextResponse } from 'next/server';
+import { getMapDocument } from '@/db/queries';
+
+// The document is stored as JSON text, so it is sent without re-serializing
+export async function GET(request: Request) {
+  try {
+    const url = new URL(request.url);
+    const level = url.searchParams.get('level') || 'county';
+    // Without a quarter the latest built one is served
+    const quarter = url.searchParams.get('quarter') || undefined;
+
+    const document = await getMapDocument(level, quarter);
+    if (!document) {
+      return NextResponse.json({ error: 'Map data not found' }, { status: 404 });
+    }
+    return new NextResponse(document, { headers: { 'Content-Type': 'application/json' } });
+  } catch (error) {
+    console.error('Error fetching map data:', error);
+    return NextResponse.json({ error: 'Failed to fetch map data' }, { status: 500 });
+  }
+}
@@ -109,10 +109,14 @@ export async function getRecentSiteVisits(limit: number = 100) {
     .limit(limit);
 }
 
-// Get water systems by county
-export async function getWaterSystemsByCounty(county: string) {
+// The most recent quarter the ETL built map aggregates for
+const latestMapQuarter = sql`(SELECT MAX(SUBMISSIONYEARQUARTER) FROM AGG_MAP_DOCUMENTS)`;
+
+// Get water systems by county (the latest quarter by default). A semi-join
+// rather than DISTINCT over a join, so nothing is aggregated per request
+export async function getWaterSystemsByCounty(county: string, quarter?: string) {
   return await db
-    .selectDistinct({
+    .select({
       pwsid: pubWaterSystems.pwsid,
       pwsName: pubWaterSystems.pwsName,
       populationServed: pubWaterSystems.populationServedCount,
@@ -120,21 +124,58 @@ export async function getWaterSystemsByCounty(county: string) {
       activityCode: pubWaterSystems.pwsActivityCode,
     })
     .from(pubWaterSystems)
-    .innerJoin(
-      geographicAreas,
-      and(
-        eq(pubWaterSystems.pwsid, geographicAreas.pwsid),
-        eq(pubWaterSystems.submissionYearQuarter, geographicAreas.submissionYearQuarter)
-      )
-    )
     .where(
       and(
-        eq(geographicAreas.countyServed, county),
-        eq(pubWaterSystems.submissionYearQuarter, '2025Q1')
+        eq(pubWaterSystems.submissionYearQuarter, quarter ?? latestMapQuarter),
+        sql`EXISTS (
+          SELECT 1 FROM SDWA_GEOGRAPHIC_AREAS g
+          WHERE g.SUBMISSIONYEARQUARTER = ${pubWaterSystems.submissionYearQuarter}
+            AND g.PWSID = ${pubWaterSystems.pwsid}
+            AND g.COUNTY_SERVED = ${county}
+        )`
       )
     );
 }
 
+// Get a county's pre-built totals (the latest quarter by default)
+export async function getCountySummary(county: string, quarter?: string) {
+  const result = await db.all<{
+    systemCount: number;
+    activeSystemCount: number;
+    populationServed: number;
+    totalViolations: number;
+    healthBasedViolations: number;
+    unaddressedViolations: number;
+    systemsWithViolations: number;
+  }>(sql`
+    SELECT SYSTEM_COUNT as systemCount,
+      ACTIVE_SYSTEM_COUNT as activeSystemCount,
+      POPULATION_SERVED as populationServed,
+      TOTAL_VIOLATIONS as totalViolations,
+      HEALTH_BASED_VIOLATIONS as healthBasedViolations,
+      UNADDRESSED_VIOLATIONS as unaddressedViolations,
+      SYSTEMS_WITH_VIOLATIONS as systemsWithViolations
+    FROM AGG_COUNTY_SUMMARY
+    WHERE SUBMISSIONYEARQUARTER = ${quarter ?? latestMapQuarter}
+      AND COUNTY_SERVED = ${county}
+  `);
+
+  return result[0] ?? null;
+}
+
+// Get the pre-serialized per-area map measures for a level ('county', 'city' or 'zip'),
+// for the latest quarter unless one is given
+export async function getMapDocument(level: string = 'county', quarter?: string) {
+  const result = await db.all<{ document: string }>(sql`
+    SELECT DOCUMENT as document
+    FROM AGG_MAP_DOCUMENTS
+    WHERE SUBMISSIONYEARQUARTER = ${quarter ?? latestMapQuarter}
+      AND AREA_LEVEL = ${level}
+  `);
+
+  return result[0]?.document ?? null;
+}
+
 // Get reference code description
 export async function getCodeDescription(valueType: string, valueCode: string) {
   const result = await db
@@ -174,6 +215,18 @@ export async function searchWaterSystems(searchTerm: string) {
     .limit(50);
 }
 
+// A column of a violation's most recent enforcement action
+function latestEnforcement(column: string) {
+  return sql<string | null>`(
+    SELECT e.${sql.raw(column)} FROM SDWA_ENFORCEMENT_ACTIONS e
+    WHERE e.SUBMISSIONYEARQUARTER = ${violationsEnforcement.submissionYearQuarter}
+      AND e.PWSID = ${violationsEnforcement.pwsid}
+      AND e.VIOLATION_ID = ${violationsEnforcement.violationId}
+    ORDER BY e.ENFORCEMENT_DATE DESC, e.ENFORCEMENT_ID DESC
+    LIMIT 1
+  )`;
+}
+
 // Get all violations with optional filters
 export async function getAllViolations(filters?: {
   status?: string;
@@ -186,16 +239,18 @@ export async function getAllViolations(filters?: {
       pwsid: violationsEnforcement.pwsid,
       pwsName: pubWaterSystems.pwsName,
       violationTypeCode: violationsEnforcement.violationCode,
+      violationTypeDesc: violationsEnforcement.violationCodeDesc,
       violationCategoryCode: violationsEnforcement.violationCategoryCode,
       contaminantCode: violationsEnforcement.contaminantCode,
+      contaminantDesc: violationsEnforcement.contaminantCodeDesc,
       isHealthBasedInd: violationsEnforcement.isHealthBasedInd,
       violationStatus: violationsEnforcement.violationStatus,
       complBeginDate: violationsEnforcement.complPerBeginDate,
       complEndDate: violationsEnforcement.complPerEndDate,
       nonComplBeginDate: violationsEnforcement.nonComplPerBeginDate,
       complPerEndDate: violationsEnforcement.complPerEndDate,
-      enforcementDate: violationsEnforcement.enforcementDate,
-      enforcementActionType: violationsEnforcement.enforcementActionTypeCode,
+      enforcementDate: latestEnforcement('ENFORCEMENT_DATE'),
+      enforcementActionType: latestEnforcement('ENFORCEMENT_ACTION_TYPE_CODE'),
     })
     .from(violationsEnforcement)
     .leftJoin(
@@ -283,11 +338,11 @@ export async function getEnforcementsByViolation(
       ENFORCEMENT_ACTION_TYPE_CODE as enforcementActionTypeCode,
       ENF_ACTION_CATEGORY as enfActionCategory,
       ENF_ORIGINATOR_CODE as enfOriginatorCode
-    FROM SDWA_VIOLATIONS_ENFORCEMENT
+    FROM SDWA_ENFORCEMENT_ACTIONS
     WHERE PWSID = ${pwsid}
       AND VIOLATION_ID = ${violationId}
       AND SUBMISSIONYEARQUARTER = ${quarter}
-      AND ENFORCEMENT_ID IS NOT NULL
+    ORDER BY ENFORCEMENT_DATE
   `);
 
   return result;
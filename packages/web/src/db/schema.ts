@@ -27,6 +27,7 @@ export const pubWaterSystems = sqliteTable(
     pwsActivityCode: text('PWS_ACTIVITY_CODE'),
     pwsDeactivationDate: text('PWS_DEACTIVATION_DATE'),
     pwsTypeCode: text('PWS_TYPE_CODE'),
+    pwsTypeCodeDesc: text('PWS_TYPE_CODE_DESC'),
     dbprScheduleCatCode: text('DBPR_SCHEDULE_CAT_CODE'),
     cdsId: text('CDS_ID'),
     gwSwCode: text('GW_SW_CODE'),
@@ -121,9 +122,11 @@ export const violationsEnforcement = sqliteTable(
     nonComplPerEndDate: text('NON_COMPL_PER_END_DATE'),
     pwsDeactivationDate: text('PWS_DEACTIVATION_DATE'),
     violationCode: text('VIOLATION_CODE'),
+    violationCodeDesc: text('VIOLATION_CODE_DESC'),
     violationCategoryCode: text('VIOLATION_CATEGORY_CODE'),
     isHealthBasedInd: text('IS_HEALTH_BASED_IND'),
     contaminantCode: text('CONTAMINANT_CODE'),
+    contaminantCodeDesc: text('CONTAMINANT_CODE_DESC'),
     violMeasure: real('VIOL_MEASURE'),
     unitOfMeasure: text('UNIT_OF_MEASURE'),
     federalMcl: text('FEDERAL_MCL'),
@@ -140,9 +143,27 @@ export const violationsEnforcement = sqliteTable(
     ruleCode: text('RULE_CODE'),
     ruleGroupCode: text('RULE_GROUP_CODE'),
     ruleFamilyCode: text('RULE_FAMILY_CODE'),
+    ruleFamilyCodeDesc: text('RULE_FAMILY_CODE_DESC'),
     violFirstReportedDate: text('VIOL_FIRST_REPORTED_DATE'),
     violLastReportedDate: text('VIOL_LAST_REPORTED_DATE'),
-    enforcementId: text('ENFORCEMENT_ID'),
+  },
+  (table) => ({
+    pk: primaryKey({ columns: [table.submissionYearQuarter, table.pwsid, table.violationId] }),
+    fkPws: foreignKey({
+      columns: [table.submissionYearQuarter, table.pwsid],
+      foreignColumns: [pubWaterSystems.submissionYearQuarter, pubWaterSystems.pwsid],
+    }),
+  })
+);
+
+// Enforcement actions, one row per action taken on a violation
+export const enforcementActions = sqliteTable(
+  'SDWA_ENFORCEMENT_ACTIONS',
+  {
+    submissionYearQuarter: text('SUBMISSIONYEARQUARTER').notNull(),
+    pwsid: text('PWSID').notNull(),
+    violationId: text('VIOLATION_ID').notNull(),
+    enforcementId: text('ENFORCEMENT_ID').notNull(),
     enforcementDate: text('ENFORCEMENT_DATE'),
     enforcementActionTypeCode: text('ENFORCEMENT_ACTION_TYPE_CODE'),
     enfActionCategory: text('ENF_ACTION_CATEGORY'),
@@ -151,10 +172,16 @@ export const violationsEnforcement = sqliteTable(
     enfLastReportedDate: text('ENF_LAST_REPORTED_DATE'),
   },
   (table) => ({
-    pk: primaryKey({ columns: [table.submissionYearQuarter, table.pwsid, table.violationId] }),
-    fkPws: foreignKey({
-      columns: [table.submissionYearQuarter, table.pwsid],
-      foreignColumns: [pubWaterSystems.submissionYearQuarter, pubWaterSystems.pwsid],
+    pk: primaryKey({
+      columns: [table.submissionYearQuarter, table.pwsid, table.violationId, table.enforcementId],
+    }),
+    fkViolation: foreignKey({
+      columns: [table.submissionYearQuarter, table.pwsid, table.violationId],
+      foreignColumns: [
+        violationsEnforcement.submissionYearQuarter,
+        violationsEnforcement.pwsid,
+        violationsEnforcement.violationId,
+      ],
     }),
   })
 );
@@ -173,6 +200,7 @@ export const lcrSamples = sqliteTable(
     sampleLastReportedDate: text('SAMPLE_LAST_REPORTED_DATE'),
     sarId: integer('SAR_ID').notNull(),
     contaminantCode: text('CONTAMINANT_CODE'),
+    contaminantCodeDesc: text('CONTAMINANT_CODE_DESC'),
     resultSignCode: text('RESULT_SIGN_CODE'),
     sampleMeasure: real('SAMPLE_MEASURE'),
     unitOfMeasure: text('UNIT_OF_MEASURE'),
@@ -200,6 +228,7 @@ export const siteVisits = sqliteTable(
     visitDate: text('VISIT_DATE'),
     agencyTypeCode: text('AGENCY_TYPE_CODE'),
     visitReasonCode: text('VISIT_REASON_CODE'),
+    visitReasonCodeDesc: text('VISIT_REASON_CODE_DESC'),
     managementOpsEvalCode: text('MANAGEMENT_OPS_EVAL_CODE'),
     sourceWaterEvalCode: text('SOURCE_WATER_EVAL_CODE'),
     securityEvalCode: text('SECURITY_EVAL_CODE'),
@@ -308,7 +337,9 @@ export const pnViolationAssoc = sqliteTable(
     nonComplPerBeginDate: text('NON_COMPL_PER_BEGIN_DATE'),
     nonComplPerEndDate: text('NON_COMPL_PER_END_DATE'),
     violationCode: text('VIOLATION_CODE'),
+    violationCodeDesc: text('VIOLATION_CODE_DESC'),
     contaminationCode: text('CONTAMINANT_CODE'),
+    contaminationCodeDesc: text('CONTAMINANT_CODE_DESC'),
     firstReportedDate: text('FIRST_REPORTED_DATE'),
     lastReportedDate: text('LAST_REPORTED_DATE'),
   },